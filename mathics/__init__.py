@@ -7,9 +7,8 @@ from __future__ import absolute_import
 
 import sys
 import platform
-import sympy
-import mpmath
-import django
+import importlib
+import pkg_resources
 import six
 
 from mathics.version import __version__
@@ -25,12 +24,20 @@ if six.PY2:
     sys.stdout = writer(sys.stdout)
 
 
+def get_version(package):
+    # from the installed distribution, so that the package isn't imported
+    try:
+        return pkg_resources.get_distribution(package).version
+    except pkg_resources.DistributionNotFound:
+        return importlib.import_module(package).__version__
+
+
 version_info = {
     'mathics': __version__,
-    'sympy': sympy.__version__,
-    'mpmath': mpmath.__version__,
+    'sympy': get_version('sympy'),
+    'mpmath': get_version('mpmath'),
     'python': platform.python_implementation() + " " + sys.version.split('\n')[0],
-    'django': django.__version__,
+    'django': get_version('django'),
 }
 
 
@@ -8,7 +8,9 @@ from itertools import chain, islice
 import bisect
 import math
 
-from mpmath import fsum
+from mathics.core.util import LazyModule
+
+mpmath = LazyModule('mpmath')
 
 # publications used for this file:
 
@@ -312,7 +314,7 @@ class ApproximateSilhouetteSplitCriterion(SplitCriterion):
         if len(clusters) <= 1:
             return -1.
         else:
-            return fsum(self._approximate_mean_silhouette_widths(clusters, distance)) / len(clusters)
+            return mpmath.fsum(self._approximate_mean_silhouette_widths(clusters, distance)) / len(clusters)
 
     def _approximate_mean_silhouette_widths(self, clusters, distance):
         d_in = self._approximate_within_distances(clusters, distance)
@@ -365,7 +367,7 @@ class _Cluster:
         if self._within is None:
             # s_w is the sum of within-cluster (point to its medoid) distances.
             m = self.medoid
-            s_w = fsum(distance(i, m) for i in self.members if i != m)
+            s_w = mpmath.fsum(distance(i, m) for i in self.members if i != m)
             n_w = len(self.members)
             self._within = (s_w, n_w)
 
@@ -386,7 +388,7 @@ class _Medoids:
         self._selected.sort()
 
         self._clusters = [None] * n
-        self._cost = fsum(self._update_clusters(self._unselected))
+        self._cost = mpmath.fsum(self._update_clusters(self._unselected))
         self._debug = clusterer.debug
 
     def clusters(self):
@@ -498,7 +500,7 @@ class _Medoids:
                         yield dh - d2
                         fast_updates.append((j, h))
 
-        t = fsum(calculate_t())
+        t = mpmath.fsum(calculate_t())
 
         if t < 0:  # swap is an improvement?
             self._debug('ACCEPT swap t:%f' % t, i, h)
@@ -1081,7 +1083,7 @@ class _KMeans:
                 return a, -1.  # no good config
             within[j] /= q[j] - 1
 
-        silhouette = fsum(_silhouette(a, b) for a, b in zip(within, s)) / len(c)
+        silhouette = mpmath.fsum(_silhouette(a, b) for a, b in zip(within, s)) / len(c)
         return a, silhouette
 
     def _optimize(self, solutions):
@@ -6,6 +6,12 @@ from __future__ import print_function
 from __future__ import absolute_import
 from __future__ import division
 
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
 import time
 from argparse import ArgumentParser
 
@@ -22,6 +28,12 @@ import mathics
 from mathics.core.parser import parse, MultiLineFeeder, SingleLineFeeder
 from mathics.core.definitions import Definitions
 from mathics.core.evaluation import Evaluation
+from mathics.core.expression import Expression
+from mathics.core.rules import rule_statistics
+from mathics.core.serialize import serialize, deserialize
+from mathics import daemon
+
+import six.moves.cPickle as pickle
 
 from six.moves import map
 from six.moves import range
@@ -29,6 +41,21 @@ from six.moves import range
 # Default number of times to repeat each benchmark. None -> Automatic
 TESTS_PER_BENCHMARK = None
 
+# Whether to also report the number of Expressions constructed
+COUNT_EXPRESSIONS = False
+
+# Sections that report the number of Expressions constructed even without
+# COUNT_EXPRESSIONS
+COUNTED_SECTIONS = ('Replace',)
+
+# Whether to also report how many rule applications were tried, rejected
+# by the quick prefilter and matched
+RULE_STATISTICS = False
+
+
+# Cases of a Switch stepping through the states 1, 2, ..., 200, 1, ...
+STATE_MACHINE = ', '.join(
+    '{0}, {1}'.format(state, state % 200 + 1) for state in range(1, 201))
 
 # Mathics expressions to benchmark
 BENCHMARKS = {
@@ -60,8 +87,94 @@ BENCHMARKS = {
     'Matrix': [
         'RandomInteger[{0,1}, {10,10}] . RandomInteger[{0,1}, {10,10}]',
         'RandomInteger[{0,10}, {10,10}] + RandomInteger[{0,10}, {10,10}]'],
+    'Recursion': [
+        'Block[{f}, f[0] = 0; f[n_] := 1 + f[n - 1]; f[60]]',
+        'Block[{f}, f[n_] := If[n == 0, 0, f[n - 1]]; f[60]]',
+        'ReleaseHold[Nest[Hold[1 + #]&, 0, 60]]',
+        'Block[{f}, f[0, a_] := a; f[n_, a_] := f[n - 1, a + n]; f[1000, 0]]'],
+    'List': [
+        'Length[Range[10^5]]', 'Length[Reverse[Range[10^5]]]',
+        'Length[Table[{i, i}, {i, 10^4}]]'],
+    'Part': [
+        'Length[Range[10^4][[2 ;; -2]]]',
+        'Length[ReplacePart[Range[10^4], {5 -> x, -5 -> y}]]',
+        'Length[Position[Range[10^4], 5000]]',
+        'Length[MapIndexed[f, Range[10^3]]]'],
+    'Sort': [
+        'Length[Plus @@ (x /@ RandomInteger[10^6, 10^4])]',
+        'Length[Sort[x /@ RandomInteger[10^6, 10^4]]]',
+        'Length[Plus @@ (y ^ RandomInteger[10^6, 10^3])]'],
+    'Pattern': [
+        'Length[Cases[Thread[f[Range[10^3], g /@ Range[10^3]]], f[_, ___, g[y_]] :> y]]',
+        'Length[Cases[Thread[f[Range[10^3], g /@ Range[10^3]]], f[x_Integer, g[y_]] /; y == x]]',
+        'Length[Cases[Thread[f[Range[10^3], g /@ Range[10^3]]], f[_Integer, g[_] | h[_]]]]',
+        'Length[Sign /@ Range[10^3]]', 'Length[Abs /@ Range[10^3]]',
+        'Module[{f}, Scan[(f[#] = #^2) &, Range[300]]; f[x_, y_] := x + y; '
+        'Length[f @@@ Tuples[Range[15], 2]]]'],
+    'Orderless': [
+        'MatchQ[Plus @@ Array[x, 10], a_ + b_ /; False]',
+        'MatchQ[Times @@ Array[x, 7], a_ b_ c_ /; False]',
+        'MatchQ[Plus @@ Array[x, 30], x[1] + x[2] + c_ /; False]',
+        'Length[ReplaceList[Plus @@ Array[x, 6], a_ + b_ + c_ :> {a, b, c}]]'],
+    'Sequence': [
+        'MatchQ[f @@ Range[10^3], f[x___, y_Symbol, z___]]',
+        'MatchQ[f @@ Range[10^3], f[x__, 500, y_, z__]]',
+        'MatchQ[f @@ Range[10^3], f[x__, y_, z__] /; y == 500]'],
+    'Replace': [
+        'Module[{t = Table[i -> i^2, {i, 10^3}]}, Total[Range[10^3] /. t]]',
+        'Module[{t = Dispatch[Table[i -> i^2, {i, 10^3}]]}, '
+        'Total[Range[10^3] /. t]]',
+        'Module[{t = Table[i -> i^2, {i, 50}]}, '
+        'Total[Table[i /. t, {i, 10^3}]]]',
+        'Length[Partition[Range[10^4], 2] /. 5 -> x]',
+        'Length[Nest[f[#, #] &, x, 16] /. y -> z]',
+        'Length[Nest[f[#, g[#]] &, x, 12] /. g[x] -> y]'],
+    'Association': [
+        'Total[keys /. rules]',
+        'Total[Lookup[rules, keys]]',
+        'Total[Lookup[assoc, keys]]',
+        'Total[Lookup[assoc, #] & /@ keys]',
+        'Module[{a = assoc}, Scan[AssociateTo[a, # -> 0] &, keys]; Length[a]]'],
+    'Set': [
+        'Length[Union[a, b]]', 'Length[Intersection[a, b]]',
+        'Length[Complement[a, b]]', 'Length[DeleteDuplicates[Join[a, b]]]',
+        'Length[Union[r, SameTest -> Equal]]',
+        'Length[DeleteDuplicates[r, Equal]]'],
+    'Switch': [
+        'Module[{s = 1}, Do[s = Switch[s, %s], {300}]; s]' % STATE_MACHINE,
+        'Module[{step, s = 1}, step[n_] := Switch[n, %s]; '
+        'Do[s = step[s], {300}]; s]' % STATE_MACHINE,
+        'Module[{s = 1}, Do[s = Switch[s, _?Negative, 1, %s], {300}]; s]'
+        % STATE_MACHINE.replace('100, 101,', '100, 101, _?(# > 200 &), 1,')],
+}
+
+# Definitions made once before the benchmarks of a section are run
+SETUP = {
+    'Association': 'rules = Thread[Range[10^5] -> Range[10^5]]; '
+                   'assoc = Association[rules]; keys = Range[1, 10^5, 1000];',
+    'Set': 'a = Range[10^5]; b = Range[5 10^4, 15 10^4]; '
+           'r = RandomReal[1, 5 10^4]; r = Join[r, r (1 + 10^-15)];',
 }
 
+# Mathics expressions to evaluate in a new process, from starting Python on
+STARTUP_BENCHMARKS = [
+    'StringJoin["a", "b"]',
+    '1 + 2',
+    'Integrate[x ^ 2, x]',
+]
+
+# Libraries that should only be imported once something needs them
+HEAVY_MODULES = ['sympy', 'mpmath', 'numpy', 'PIL', 'skimage', 'django']
+
+STARTUP_SCRIPT = '''
+import sys
+from mathics.core.definitions import Definitions
+from mathics.core.evaluation import Evaluation
+
+Evaluation(Definitions(add_builtin=True)).parse_evaluate(sys.argv[1])
+print(' '.join(name for name in sys.argv[2:] if name in sys.modules))
+'''
+
 DEPTH = 300
 
 PARSING_BENCHMARKS = [
@@ -75,6 +188,15 @@ PARSING_BENCHMARKS = [
     "Sin[" * DEPTH + '0.5' + "]" * DEPTH,
 ]
 
+# Mathics expressions to write and read back with BinarySerialize's
+# format, pickle and as FullForm text
+SERIALIZATION_BENCHMARKS = [
+    'RandomReal[1, 10^4]',
+    'Range[10^4]',
+    'RandomInteger[{-10^30, 10^30}, 10^4]',
+    'Table[f[i, x ^ i, "i"], {i, 10^3}]',
+]
+
 definitions = Definitions(add_builtin=True)
 evaluation = Evaluation(definitions=definitions, catch_interrupt=False)
 
@@ -90,7 +212,7 @@ def format_time_units(seconds):
         return "{0:4.3g} s ".format(seconds)
 
 
-def timeit(func, repeats=None):
+def timeit(func, repeats=None, clock=time.clock):
     if repeats is None:
         global TESTS_PER_BENCHMARK
         repeats = TESTS_PER_BENCHMARK
@@ -99,20 +221,20 @@ def timeit(func, repeats=None):
     if repeats is not None:
         # Fixed number of repeats
         for i in range(repeats):
-            times.append(time.clock())
+            times.append(clock())
             func()
     else:
         # Automatic number of repeats
         repeats = 10000
         for i in range(repeats):
-            times.append(time.clock())
+            times.append(clock())
             func()
             if (i + 1) in (5, 10, 100, 1000, 5000):
                 if times[-1] > times[0] + 1:
                     repeats = i + 1
                     break
 
-    times.append(time.clock())
+    times.append(clock())
 
     times = [times[i+1] - times[i] for i in range(repeats)]
 
@@ -124,6 +246,43 @@ def timeit(func, repeats=None):
         repeats, average_time, best_time, median_time))
 
 
+class ExpressionCounter(object):
+    '''
+    Counts the Expression objects constructed while it is active:
+
+        with ExpressionCounter() as counter:
+            expr.evaluate(evaluation)
+        print(counter.count)
+    '''
+
+    def __enter__(self):
+        self.count = 0
+        self.new = Expression.__dict__['__new__']
+
+        def counting_new(cls, *args, **kwargs):
+            self.count += 1
+            return self.new.__func__(cls, *args, **kwargs)
+        Expression.__new__ = staticmethod(counting_new)
+        return self
+
+    def __exit__(self, *exc_info):
+        Expression.__new__ = self.new
+
+
+def count_expressions(func):
+    with ExpressionCounter() as counter:
+        func()
+    print("    {0} Expressions constructed".format(counter.count))
+
+
+def count_rule_applications(func):
+    for key in rule_statistics:
+        rule_statistics[key] = 0
+    func()
+    print("    {attempted} rules tried, {prefiltered} prefiltered, "
+          "{matched} matched".format(**rule_statistics))
+
+
 def truncate_line(string):
     if len(string) > 70:
         return string[:70] + "..."
@@ -166,16 +325,116 @@ def benchmark_format(expression_string):
     timeit(lambda: expr.default_format(evaluation, "FullForm"))
 
 
-def benchmark_expression(expression_string):
-    print("  '{0}'".format(expression_string))
+def benchmark_expression(expression_string, count=False):
+    print("  '{0}'".format(truncate_line(expression_string)))
     expr = parse(definitions, SingleLineFeeder(expression_string))
     timeit(lambda: expr.evaluate(evaluation))
+    if COUNT_EXPRESSIONS or count:
+        count_expressions(lambda: expr.evaluate(evaluation))
+    if RULE_STATISTICS:
+        count_rule_applications(lambda: expr.evaluate(evaluation))
 
 
 def benchmark_section(section_name):
     print(section_name)
+    if section_name in SETUP:
+        parse(definitions, SingleLineFeeder(SETUP[section_name])).evaluate(
+            evaluation)
     for benchmark in BENCHMARKS.get(section_name):
-        benchmark_expression(benchmark)
+        benchmark_expression(
+            benchmark, count=section_name in COUNTED_SECTIONS)
+    print()
+
+
+def get_process_environment():
+    # Mathics from the same place as this module
+    path = os.path.dirname(os.path.dirname(os.path.abspath(mathics.__file__)))
+    return dict(os.environ, PYTHONPATH=os.pathsep.join(
+        [path] + os.environ.get('PYTHONPATH', '').split(os.pathsep)))
+
+
+def benchmark_startup_expression(expression_string):
+    print("  '{0}'".format(truncate_line(expression_string)))
+    command = [sys.executable, '-c', STARTUP_SCRIPT,
+               expression_string] + HEAVY_MODULES
+    env = get_process_environment()
+
+    def run():
+        return subprocess.check_output(command, env=env).decode('ascii')
+
+    # the time of the whole process, so not time.clock()
+    timeit(run, clock=time.time)
+    print("    imports {0}".format(', '.join(run().split()) or 'none of ' +
+                                   ', '.join(HEAVY_MODULES)))
+
+
+def benchmark_startup():
+    print("STARTUP BENCHMARKS:")
+    for expression_string in STARTUP_BENCHMARKS:
+        benchmark_startup_expression(expression_string)
+    print()
+
+
+def benchmark_daemon():
+    print("DAEMON BENCHMARKS:")
+    if not daemon.supported:
+        print("  skipped, as there are no Unix sockets or this is Python 2")
+        print()
+        return
+
+    command = [sys.executable, '-m', 'mathics.main', '--quiet']
+    env = get_process_environment()
+    directory = tempfile.mkdtemp()
+    socket_path = os.path.join(directory, 'kernel.sock')
+    kernel = subprocess.Popen(
+        command + ['--daemon', '--socket', socket_path], env=env)
+    try:
+        while not os.path.exists(socket_path):
+            if kernel.poll() is not None:
+                raise RuntimeError('the kernel did not start')
+            time.sleep(0.1)
+
+        for expression_string in STARTUP_BENCHMARKS:
+            print("  '{0}'".format(truncate_line(expression_string)))
+            for title, options in (
+                    ('new process', []),
+                    ('--connect', ['--connect', '--socket', socket_path])):
+                print("   ", title)
+                timeit(lambda: subprocess.check_output(
+                    command + options + ['-e', expression_string], env=env),
+                    clock=time.time)
+    finally:
+        kernel.send_signal(signal.SIGINT)
+        kernel.wait()
+        shutil.rmtree(directory)
+    print()
+
+
+def benchmark_serialization():
+    print("SERIALIZATION BENCHMARKS:")
+
+    def to_text(expr):
+        text = expr.format(evaluation, 'System`FullForm')
+        return text.boxes_to_text(
+            evaluation=evaluation, show_string_characters=True)
+
+    formats = [
+        ('binary', serialize, deserialize),
+        ('pickle', lambda expr: pickle.dumps(expr, -1), pickle.loads),
+        ('text', to_text,
+         lambda text: parse(definitions, SingleLineFeeder(text))),
+    ]
+    for expression_string in SERIALIZATION_BENCHMARKS:
+        print("  '{0}'".format(truncate_line(expression_string)))
+        expr = parse(definitions, SingleLineFeeder(expression_string))
+        expr = expr.evaluate(evaluation)
+        for title, write, read in formats:
+            data = write(expr)
+            print("   ", title, len(data), "bytes")
+            print("    write")
+            timeit(lambda: write(expr))
+            print("    read")
+            timeit(lambda: read(data))
     print()
 
 
@@ -186,7 +445,7 @@ def benchmark_all_sections():
 
 
 def main():
-    global evaluation, TESTS_PER_BENCHMARK
+    global evaluation, TESTS_PER_BENCHMARK, COUNT_EXPRESSIONS, RULE_STATISTICS
     parser = ArgumentParser(
         description="Mathics benchmark suite.", add_help=False)
 
@@ -204,6 +463,20 @@ def main():
     parser.add_argument(
         '-p', '--parser', action='store_true', help="only test parser")
 
+    parser.add_argument(
+        '--startup', action='store_true',
+        help="only test starting Mathics in a new process")
+
+    parser.add_argument(
+        '--daemon', action='store_true',
+        help="only compare running mathics -e in a new process and in the "
+        "kernel of mathics --daemon")
+
+    parser.add_argument(
+        '--serialization', action='store_true',
+        help="only compare the size and speed of serializing expressions "
+        "with BinarySerialize, pickle and as text")
+
     parser.add_argument(
         '--expression', '-e', dest="expression", metavar="EXPRESSION",
         help="benchmark a valid Mathics expression")
@@ -212,10 +485,26 @@ def main():
         '--number', '-n', dest="repeat", metavar="REPEAT",
         help="loop REPEAT number of times")
 
+    parser.add_argument(
+        '--stack-evaluator', action='store_true',
+        help="evaluate with the explicit stack instead of Python recursion")
+
+    parser.add_argument(
+        '--count-expressions', '-c', action='store_true',
+        help="also report the number of Expressions constructed")
+
+    parser.add_argument(
+        '--rule-statistics', '-r', action='store_true',
+        help="also report the number of rules tried, prefiltered and matched")
+
     args = parser.parse_args()
 
     if args.repeat is not None:
         TESTS_PER_BENCHMARK = int(args.repeat)
+    COUNT_EXPRESSIONS = args.count_expressions
+    RULE_STATISTICS = args.rule_statistics
+
+    evaluation.use_stack_evaluator = args.stack_evaluator
 
     if args.expression:
         benchmark_expression(args.expression)
@@ -223,9 +512,18 @@ def main():
         benchmark_section(args.section)
     elif args.parser:
         benchmark_parser()
+    elif args.startup:
+        benchmark_startup()
+    elif args.daemon:
+        benchmark_daemon()
+    elif args.serialization:
+        benchmark_serialization()
     else:
         benchmark_all_sections()
         benchmark_parser()
+        benchmark_serialization()
+        benchmark_startup()
+        benchmark_daemon()
 
 if __name__ == '__main__':
     main()
@@ -5,7 +5,7 @@ from __future__ import unicode_literals
 from __future__ import absolute_import
 
 from mathics.builtin import (
-    algebra, arithmetic, assignment, attributes, calculus, combinatorial,
+    algebra, arithmetic, assignment, associations, attributes, calculus, combinatorial,
     comparison, control, datentime, diffeqns, evaluation, exptrig, functional,
     graphics, graphics3d, image, inout, integer, linalg, lists, logic, manipulate, numbertheory,
     numeric, options, patterns, plot, physchemdata, randomnumbers, recurrence,
@@ -17,7 +17,7 @@ from mathics.builtin.base import (
 from mathics.settings import ENABLE_FILES_MODULE
 
 modules = [
-    algebra, arithmetic, assignment, attributes, calculus, combinatorial,
+    algebra, arithmetic, assignment, associations, attributes, calculus, combinatorial,
     comparison, control, datentime, diffeqns, evaluation, exptrig, functional,
     graphics, graphics3d, image, inout, integer, linalg, lists, logic, manipulate, numbertheory,
     numeric, options, patterns, plot, physchemdata, randomnumbers, recurrence,
@@ -103,12 +103,15 @@ def get_module_doc(module):
     return title, text
 
 
-def contribute(definitions):
+def contribute(definitions, lazy=False):
     # let MakeBoxes contribute first
     builtins['System`MakeBoxes'].contribute(definitions)
     for name, item in builtins.items():
         if name != 'System`MakeBoxes':
-            item.contribute(definitions)
+            if lazy:
+                item.contribute_lazily(definitions)
+            else:
+                item.contribute(definitions)
 
     from mathics.core.expression import ensure_context
     from mathics.core.parser import all_operator_names
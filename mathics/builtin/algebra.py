@@ -8,9 +8,11 @@ from mathics.builtin.base import Builtin
 from mathics.core.expression import Expression, Integer, Symbol
 from mathics.core.convert import from_sympy, sympy_symbol_prefix
 
-import sympy
-import mpmath
 from six.moves import range
+from mathics.core.util import LazyModule
+
+sympy = LazyModule('sympy')
+mpmath = LazyModule('mpmath')
 
 
 def sympy_factor(expr_sympy):
@@ -10,20 +10,23 @@ Basic arithmetic functions, including complex number arithmetic.
 from __future__ import unicode_literals
 from __future__ import absolute_import
 
-import sympy
-import mpmath
 
 from mathics.builtin.base import (
     Builtin, Predefined, BinaryOperator, PrefixOperator, PostfixOperator, Test,
     SympyFunction, SympyConstant)
 
 from mathics.core.expression import (
-    Expression, Number, Integer, Rational, Real, Symbol, Complex, String)
+    Expression, Number, Integer, Rational, Real, Symbol, Complex, String,
+    sort_key)
 from mathics.core.numbers import (
     min_prec, dps, SpecialValueError)
 
 from mathics.builtin.lists import _IterationFunction
 from mathics.core.convert import from_sympy
+from mathics.core.util import LazyModule
+
+sympy = LazyModule('sympy')
+mpmath = LazyModule('mpmath')
 
 
 class _MPMathFunction(SympyFunction):
@@ -286,7 +289,7 @@ class Plus(BinaryOperator, SympyFunction):
                             if len(rest) == 1:
                                 rest = rest[0]
                             else:
-                                rest.sort()
+                                rest.sort(key=sort_key)
                                 rest = Expression('Times', *rest)
                             break
                 if count is None:
@@ -311,6 +314,9 @@ class Plus(BinaryOperator, SympyFunction):
                         numbers = [item.to_mpmath() for item in numbers]
                         number = mpmath.fsum(numbers)
                         number = Number.from_mpmath(number, dps(prec))
+            elif all(isinstance(item, Integer) for item in numbers):
+                # without SymPy
+                number = Integer(sum(item.value for item in numbers))
             else:
                 number = from_sympy(sum(item.to_sympy() for item in numbers))
         else:
@@ -324,7 +330,7 @@ class Plus(BinaryOperator, SympyFunction):
         elif len(leaves) == 1:
             return leaves[0]
         else:
-            leaves.sort()
+            leaves.sort(key=sort_key)
             return Expression('Plus', *leaves)
 
 
@@ -590,8 +596,9 @@ class Times(BinaryOperator, SympyFunction):
             elif (leaves and item.has_form('Power', 2) and
                   leaves[-1].has_form('Power', 2) and
                   item.leaves[0].same(leaves[-1].leaves[0])):
-                leaves[-1].leaves[1] = Expression(
-                    'Plus', item.leaves[1], leaves[-1].leaves[1])
+                leaves[-1] = Expression(
+                    'Power', leaves[-1].leaves[0],
+                    Expression('Plus', item.leaves[1], leaves[-1].leaves[1]))
             elif (leaves and item.has_form('Power', 2) and
                   item.leaves[0].same(leaves[-1])):
                 leaves[-1] = Expression(
@@ -626,8 +633,9 @@ class Times(BinaryOperator, SympyFunction):
         elif number.is_zero:
             return number
         elif number.same(Integer(-1)) and leaves and leaves[0].has_form('Plus', None):
-            leaves[0].leaves = [Expression('Times', Integer(-1), leaf)
-                                for leaf in leaves[0].leaves]
+            leaves[0] = Expression(
+                leaves[0].head, *[Expression('Times', Integer(-1), leaf)
+                                  for leaf in leaves[0].leaves])
             number = None
 
         if number is not None:
@@ -804,8 +812,6 @@ class Power(BinaryOperator, _MPMathFunction):
     }
 
     formats = {
-        Expression('Power', Expression('Pattern', Symbol('x'),
-                   Expression('Blank')), Rational(1, 2)): 'HoldForm[Sqrt[x]]',
         (('InputForm', 'OutputForm'), 'x_ ^ y_'): (
             'Infix[{HoldForm[x], HoldForm[y]}, "^", 590, Right]'),
         ('', 'x_ ^ y_'): (
@@ -821,6 +827,15 @@ class Power(BinaryOperator, _MPMathFunction):
         'Power[x_]': 'x',
     }
 
+    def contribute(self, definitions):
+        # Rational(1, 2) needs SymPy, which shouldn't be imported along with
+        # this module
+        self.formats = dict(self.formats)
+        self.formats[Expression(
+            'Power', Expression('Pattern', Symbol('x'), Expression('Blank')),
+            Rational(1, 2))] = 'HoldForm[Sqrt[x]]'
+        super(Power, self).contribute(definitions)
+
     def apply_check(self, x, y, evaluation):
         'Power[x_, y_]'
 
@@ -0,0 +1,570 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Associations
+
+An association maps keys to values, like a list of rules, but it keeps
+its entries in a hash table, so that looking up a key takes the same time
+however many keys there are.
+"""
+
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+from collections import OrderedDict
+
+from mathics.builtin.base import Builtin, AtomBuiltin
+from mathics.core.expression import Atom, Expression, String, Symbol
+
+
+class HashKey(object):
+    """
+    Wraps an expression to be used as a dict key: keys are compared with
+    same(), and the hash of the expression is only computed once.
+    """
+
+    __slots__ = ('expr', 'hash')
+
+    def __init__(self, expr):
+        self.expr = expr
+        self.hash = hash(expr)
+
+    def __hash__(self):
+        return self.hash
+
+    def __eq__(self, other):
+        return self.expr.same(other.expr)
+
+    def __ne__(self, other):
+        return not self.expr.same(other.expr)
+
+
+def get_key(expr):
+    " Strips Key[...] from a key given to Lookup, Part etc. "
+
+    if expr.has_form('Key', 1):
+        return expr.leaves[0]
+    return expr
+
+
+def get_association_rules(expr):
+    """
+    Returns the rules given by expr, which can be a rule, an Association
+    or a (nested) list of these, or None if expr is none of these.
+    """
+
+    if isinstance(expr, Association):
+        return expr.get_rules()
+    if expr.has_form(('Rule', 'RuleDelayed'), 2):
+        return [expr]
+    if expr.has_form('List', None):
+        rules = []
+        for leaf in expr.leaves:
+            leaf_rules = get_association_rules(leaf)
+            if leaf_rules is None:
+                return None
+            rules.extend(leaf_rules)
+        return rules
+    return None
+
+
+class Association(Atom):
+    """
+    The entries are kept in an OrderedDict mapping HashKey(key) to the rule
+    key -> value (or key :> value) that gave the entry.
+
+    An Association never changes its value, but updated() moves the dict
+    into the new Association it returns instead of copying it: adding
+    entries to an association with AssociateTo or AppendTo, which leave
+    the old one behind, takes constant time. The old Association then
+    only records which entries were changed, and takes a copy of the dict
+    back only if it is used again.
+    """
+
+    def __init__(self, items, **kwargs):
+        super(Association, self).__init__(**kwargs)
+        self._items = items
+        # (newer Association, [(key, rule before the change or None)])
+        self._changes = None
+
+    @staticmethod
+    def from_rules(rules):
+        items = OrderedDict()
+        for rule in rules:
+            items[HashKey(rule.leaves[0])] = rule
+        return Association(items)
+
+    def get_items(self):
+        items = self._items
+        if items is None:
+            # undo the changes made since, newest first
+            changes = []
+            assoc = self
+            while assoc._items is None:
+                assoc, assoc_changes = assoc._changes
+                changes.append(assoc_changes)
+            items = assoc._items.copy()
+            for assoc_changes in reversed(changes):
+                for key, rule in reversed(assoc_changes):
+                    if rule is None:
+                        del items[key]
+                    else:
+                        items[key] = rule
+            self._items = items
+            self._changes = None
+        return items
+
+    def get_rules(self):
+        return list(self.get_items().values())
+
+    def get_rule(self, key):
+        return self.get_items().get(HashKey(key))
+
+    def updated(self, rules):
+        " Returns a new Association with the given rules added. "
+
+        items = self.get_items()
+        changes = []
+        for rule in rules:
+            key = HashKey(rule.leaves[0])
+            changes.append((key, items.get(key)))
+            items[key] = rule
+        new = Association(items)
+        self._items = None
+        self._changes = (new, changes)
+        return new
+
+    def dropped(self, keys):
+        " Returns a new Association without the given keys. "
+
+        items = self.get_items().copy()
+        for key in keys:
+            items.pop(HashKey(key), None)
+        return Association(items)
+
+    def __str__(self):
+        return 'Association[%s]' % ', '.join(
+            str(rule) for rule in self.get_rules())
+
+    def atom_to_boxes(self, f, evaluation):
+        form = f.get_name()
+        rules = self.get_rules()
+        if form == 'System`FullForm':
+            return Expression('Association', *rules).format(evaluation, form)
+        if form in ('System`OutputForm', 'System`InputForm'):
+            sep = ', '
+        else:
+            sep = ','
+        items = []
+        for rule in rules:
+            if items:
+                items.append(String(sep))
+            items.append(rule.format(evaluation, form))
+        if len(items) > 1:
+            items = [Expression('RowBox', Expression('List', *items))]
+        return Expression('RowBox', Expression(
+            'List', String('<|'), *(items + [String('|>')])))
+
+    def do_copy(self):
+        return Association(self.get_items().copy())
+
+    def compute_sort_key(self):
+        return Expression('Association', *self.get_rules()).get_sort_key()
+
+    def same(self, other):
+        if not isinstance(other, Association):
+            return False
+        if self is other:
+            return True
+        rules, other_rules = self.get_rules(), other.get_rules()
+        return len(rules) == len(other_rules) and all(
+            rule.same(other_rule)
+            for rule, other_rule in zip(rules, other_rules))
+
+    def __hash__(self):
+        return hash(('Association',) + tuple(self.get_rules()))
+
+    def user_hash(self, update):
+        update(b'System`Association>')
+        for rule in self.get_rules():
+            rule.user_hash(update)
+
+    def __getstate__(self):
+        return {'rules': self.get_rules()}
+
+    def __setstate__(self, state):
+        self._items = Association.from_rules(state['rules']).get_items()
+        self._changes = None
+
+
+class AssociationAtom(AtomBuiltin):
+    """
+    <dl>
+    <dt>'Association[$key1$ -> $val1$, $key2$ -> $val2$, ...]'
+    <dt>'<|$key1$ -> $val1$, $key2$ -> $val2$, ...|>'
+        <dd>represents an association between keys and values.
+    </dl>
+
+    >> assoc = <|x -> 1, y :> 1 + 1, 3 -> z|>
+     = <|x -> 1, y :> 1 + 1, 3 -> z|>
+    >> Lookup[assoc, 3]
+     = z
+    >> Head[assoc]
+     = Association
+
+    Later rules for a key replace earlier ones, but keep their position:
+    >> <|x -> 1, y -> 2, x -> 3|>
+     = <|x -> 3, y -> 2|>
+
+    Lists of rules and associations are merged:
+    >> Association[{x -> 1}, <|y -> 2|>, z -> 3]
+     = <|x -> 1, y -> 2, z -> 3|>
+    >> Association[x -> 1] === <|x -> 1|>
+     = True
+    >> <|x -> 1, y -> 2|> === <|y -> 2, x -> 1|>
+     = False
+
+    #> <||>
+     = <||>
+    #> <|a -> 1|> // FullForm
+     = Association[Rule[a, 1]]
+    #> Association[x]
+     = Association[x]
+    """
+
+    def apply_create(self, rules, evaluation):
+        'Association[rules___]'
+
+        rules = get_association_rules(Expression('List', *rules.get_sequence()))
+        if rules is not None:
+            return Association.from_rules(rules)
+
+
+class Key(Builtin):
+    """
+    <dl>
+    <dt>'Key[$key$]'
+        <dd>represents $key$ in 'Lookup', 'Part' and 'KeyDrop', for keys
+        that would otherwise be taken as something else, like lists or
+        integers.
+    </dl>
+
+    >> Lookup[<|{1, 2} -> a|>, Key[{1, 2}]]
+     = a
+    >> <|1 -> a, 2 -> b|>[[Key[2]]]
+     = b
+    """
+
+
+class Lookup(Builtin):
+    """
+    <dl>
+    <dt>'Lookup[$assoc$, $key$]'
+        <dd>gives the value of $key$ in the association or list of
+        rules $assoc$, or 'Missing["KeyAbsent", $key$]' if there is
+        none.
+    <dt>'Lookup[$assoc$, $key$, $default$]'
+        <dd>gives $default$ if there is no $key$ in $assoc$.
+    <dt>'Lookup[$assoc$, {$key1$, $key2$, ...}]'
+        <dd>gives a list of the values of the keys.
+    </dl>
+
+    >> Lookup[<|a -> 1, b -> 2|>, b]
+     = 2
+    >> Lookup[<|a -> 1, b -> 2|>, c]
+     = Missing[KeyAbsent, c]
+    >> Lookup[<|a -> 1, b -> 2|>, {a, c, b}, 0]
+     = {1, 0, 2}
+    >> Lookup[<|a -> 1|>, {a, b}] // InputForm
+     = {1, Missing["KeyAbsent", b]}
+
+    'Lookup' also works on lists of rules and on lists of associations:
+    >> Lookup[{a -> 1, b -> 2}, a]
+     = 1
+    >> Lookup[{<|a -> 1|>, <|a -> 2, b -> 3|>}, a]
+     = {1, 2}
+
+    #> Lookup[x, a]
+     : x is not a valid Association or a list of rules.
+     = Lookup[x, a]
+    """
+
+    messages = {
+        'invrl': "`1` is not a valid Association or a list of rules.",
+    }
+
+    def apply(self, assoc, key, evaluation):
+        'Lookup[assoc_, key_]'
+
+        return self.apply_default(assoc, key, None, evaluation)
+
+    def apply_default(self, assoc, key, default, evaluation):
+        'Lookup[assoc_, key_, default_]'
+
+        assocs = None
+        if assoc.has_form('List', 1, None) and all(
+                isinstance(leaf, Association) for leaf in assoc.leaves):
+            assocs = assoc.leaves
+        elif not isinstance(assoc, Association):
+            rules = get_association_rules(assoc)
+            if rules is None:
+                return evaluation.message('Lookup', 'invrl', assoc)
+            assoc = Association.from_rules(rules)
+
+        if key.has_form('List', None):
+            keys = key.leaves
+        else:
+            keys = None
+
+        def lookup(assoc):
+            def value(key):
+                key = get_key(key)
+                rule = assoc.get_rule(key)
+                if rule is not None:
+                    return rule.leaves[1]
+                elif default is None:
+                    return Expression('Missing', String('KeyAbsent'), key)
+                return default
+
+            if keys is None:
+                return value(key)
+            return Expression('List', *[value(key) for key in keys])
+
+        if assocs is None:
+            return lookup(assoc)
+        return Expression('List', *[lookup(assoc) for assoc in assocs])
+
+
+class KeyExistsQ(Builtin):
+    """
+    <dl>
+    <dt>'KeyExistsQ[$assoc$, $key$]'
+        <dd>tests whether the association or list of rules $assoc$ has
+        an entry for $key$.
+    </dl>
+
+    >> KeyExistsQ[<|a -> 1, b -> 2|>, b]
+     = True
+    >> KeyExistsQ[<|a -> 1, b -> 2|>, c]
+     = False
+    >> KeyExistsQ[{a -> 1}, a]
+     = True
+    """
+
+    messages = {
+        'invrl': "`1` is not a valid Association or a list of rules.",
+    }
+
+    def apply(self, assoc, key, evaluation):
+        'KeyExistsQ[assoc_, key_]'
+
+        if not isinstance(assoc, Association):
+            rules = get_association_rules(assoc)
+            if rules is None:
+                return evaluation.message('KeyExistsQ', 'invrl', assoc)
+            assoc = Association.from_rules(rules)
+        if assoc.get_rule(get_key(key)) is None:
+            return Symbol('False')
+        return Symbol('True')
+
+
+class Keys(Builtin):
+    """
+    <dl>
+    <dt>'Keys[$assoc$]'
+        <dd>gives a list of the keys of the association or list of rules
+        $assoc$.
+    </dl>
+
+    >> Keys[<|a -> 1, b -> 2|>]
+     = {a, b}
+    >> Keys[{a -> 1, b :> 2}]
+     = {a, b}
+    """
+
+    messages = {
+        'invrl': "`1` is not a valid Association or a list of rules.",
+    }
+
+    def apply(self, assoc, evaluation):
+        'Keys[assoc_]'
+
+        rules = get_association_rules(assoc)
+        if rules is None:
+            return evaluation.message('Keys', 'invrl', assoc)
+        if not isinstance(assoc, Association):
+            # the last rule for a key wins, but the first one gives its
+            # position
+            rules = Association.from_rules(rules).get_rules()
+        return Expression('List', *[rule.leaves[0] for rule in rules])
+
+
+class Values(Builtin):
+    """
+    <dl>
+    <dt>'Values[$assoc$]'
+        <dd>gives a list of the values of the association or list of
+        rules $assoc$.
+    </dl>
+
+    >> Values[<|a -> 1, b -> 2|>]
+     = {1, 2}
+    >> Values[{a -> 1, b -> 2, a -> 3}]
+     = {3, 2}
+    """
+
+    messages = {
+        'invrl': "`1` is not a valid Association or a list of rules.",
+    }
+
+    def apply(self, assoc, evaluation):
+        'Values[assoc_]'
+
+        rules = get_association_rules(assoc)
+        if rules is None:
+            return evaluation.message('Values', 'invrl', assoc)
+        if not isinstance(assoc, Association):
+            rules = Association.from_rules(rules).get_rules()
+        return Expression('List', *[rule.leaves[1] for rule in rules])
+
+
+class AssociateTo(Builtin):
+    """
+    <dl>
+    <dt>'AssociateTo[$a$, $key$ -> $value$]'
+        <dd>adds or replaces the entry for $key$ in the association
+        that is the value of $a$.
+    <dt>'AssociateTo[$a$, {$rule1$, $rule2$, ...}]'
+        <dd>adds several entries.
+    </dl>
+
+    >> a = <|x -> 1|>;
+    >> AssociateTo[a, y -> 2]
+     = <|x -> 1, y -> 2|>
+    >> AssociateTo[a, {x -> 3, z -> 4}];
+    >> a
+     = <|x -> 3, y -> 2, z -> 4|>
+
+    Other values of the association are not changed:
+    >> b = a; AssociateTo[a, w -> 5];
+    >> {b, a}
+     = {<|x -> 3, y -> 2, z -> 4|>, <|x -> 3, y -> 2, z -> 4, w -> 5|>}
+
+    Adding entries one at a time takes constant time each:
+    >> c = <||>; Do[AssociateTo[c, i -> i ^ 2], {i, 1000}]; Lookup[c, 99]
+     = 9801
+    #> Clear[a, b, c]
+
+    #> AssociateTo[x, y -> 2]
+     : x is not a variable with an Association value.
+     = AssociateTo[x, y -> 2]
+    """
+
+    attributes = ('HoldFirst',)
+
+    messages = {
+        'rvalue': "`1` is not a variable with an Association value.",
+    }
+
+    def apply(self, s, rules, evaluation):
+        'AssociateTo[s_, rules_]'
+
+        if isinstance(s, Symbol):
+            assoc = s.evaluate(evaluation)
+            if isinstance(assoc, Association):
+                return Expression(
+                    'Set', s, Expression('Append', assoc, rules)).evaluate(
+                        evaluation)
+        return evaluation.message('AssociateTo', 'rvalue', s)
+
+
+class KeyDrop(Builtin):
+    """
+    <dl>
+    <dt>'KeyDrop[$assoc$, {$key1$, $key2$, ...}]'
+        <dd>gives $assoc$ without the entries for the keys.
+    <dt>'KeyDrop[$assoc$, $key$]'
+        <dd>drops a single key.
+    </dl>
+
+    >> KeyDrop[<|a -> 1, b -> 2, c -> 3|>, {a, c, d}]
+     = <|b -> 2|>
+    >> KeyDrop[<|a -> 1, b -> 2|>, b]
+     = <|a -> 1|>
+    """
+
+    def apply(self, assoc, keys, evaluation):
+        'KeyDrop[assoc_Association, keys_]'
+
+        if keys.has_form('List', None):
+            keys = keys.leaves
+        else:
+            keys = [keys]
+        return assoc.dropped([get_key(key) for key in keys])
+
+
+class KeyDropFrom(Builtin):
+    """
+    <dl>
+    <dt>'KeyDropFrom[$a$, $keys$]'
+        <dd>drops the entries for $keys$ from the association that is the
+        value of $a$.
+    </dl>
+
+    >> a = <|x -> 1, y -> 2, z -> 3|>;
+    >> KeyDropFrom[a, y]
+     = <|x -> 1, z -> 3|>
+    >> a
+     = <|x -> 1, z -> 3|>
+    #> Clear[a]
+
+    #> KeyDropFrom[x, y]
+     : x is not a variable with an Association value.
+     = KeyDropFrom[x, y]
+    """
+
+    attributes = ('HoldFirst',)
+
+    messages = {
+        'rvalue': "`1` is not a variable with an Association value.",
+    }
+
+    def apply(self, s, keys, evaluation):
+        'KeyDropFrom[s_, keys_]'
+
+        if isinstance(s, Symbol):
+            assoc = s.evaluate(evaluation)
+            if isinstance(assoc, Association):
+                return Expression(
+                    'Set', s, Expression('KeyDrop', assoc, keys)).evaluate(
+                        evaluation)
+        return evaluation.message('KeyDropFrom', 'rvalue', s)
+
+
+class Normal(Builtin):
+    """
+    <dl>
+    <dt>'Normal[$expr$]'
+        <dd>converts special objects in $expr$, like associations and
+        'Dispatch' tables, to lists of rules.
+    </dl>
+
+    >> Normal[<|a -> 1, b :> 2|>]
+     = {a -> 1, b :> 2}
+    >> Normal[Dispatch[{a -> 1}]]
+     = {a -> 1}
+    >> Normal[f[x]]
+     = f[x]
+    """
+
+    def apply(self, expr, evaluation):
+        'Normal[expr_]'
+
+        from mathics.builtin.patterns import Dispatch
+
+        if isinstance(expr, Association):
+            return Expression('List', *expr.get_rules())
+        elif isinstance(expr, Dispatch):
+            return expr.src
+        return expr
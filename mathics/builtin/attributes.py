@@ -287,12 +287,13 @@ class Flat(Predefined):
      = u[]
     #> u[a]
      = {a}
-    #> u[a, b]
-     : Recursion depth of 200 exceeded.
-     = $Aborted
-    #> u[a, b, c]
-     : Recursion depth of 200 exceeded.
-     = $Aborted
+    #> Block[{$IterationLimit = 20}, u[a, b]]
+     : Iteration limit of 20 exceeded.
+     = Hold[u[{{{{{{{{{{{{{{{{{{{{{a}}}}}}}}}}}}}}}}}}}}}, b]]
+    #> Block[{$IterationLimit = 20}, u[a, b, c]]
+     : Iteration limit of 20 exceeded.
+     : Iteration limit of 20 exceeded.
+     = Hold[u[{{{{{{{{{{{{{{{{{{{{{Hold[u[{{{{{{{{{{{{{{{{{{{{{a}}}}}}}}}}}}}}}}}}}}}, b]]}}}}}}}}}}}}}}}}}}}}}, c]]
     #> v[x_] := x
     #> v[]
      = v[]
@@ -300,9 +301,9 @@ class Flat(Predefined):
      = a
     #> v[a, b] (* in Mathematica: Iteration limit of 4096 exceeded. *)
      = v[a, b]
-    #> v[a, b, c] (* in Mathematica: Iteration limit of 4096 exceeded. *)
-     : Recursion depth of 200 exceeded.
-     = $Aborted
+    #> v[a, b, c]
+     : Iteration limit of 4096 exceeded.
+     = Hold[v[v[a, b], c]]
     """
 
 
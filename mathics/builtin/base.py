@@ -5,7 +5,6 @@ from __future__ import unicode_literals
 from __future__ import absolute_import
 
 import re
-import sympy
 from functools import total_ordering
 import importlib
 
@@ -13,8 +12,16 @@ from mathics.core.definitions import Definition
 from mathics.core.rules import Rule, BuiltinRule, Pattern
 from mathics.core.expression import (BaseExpression, Expression, Symbol,
                                      String, Integer, ensure_context,
-                                     strip_context)
+                                     strip_context, sort_key)
 import six
+from mathics.core.util import LazyModule
+
+sympy = LazyModule('sympy')
+
+
+# the pattern of a rule for MakeBoxes, possibly after the attributes of an
+# apply function (see Builtin.get_functions)
+_box_rule_pattern = re.compile(r'\s*([\w,]+\:)?\s*(System`)?MakeBoxes\[')
 
 
 class Builtin(object):
@@ -106,28 +113,17 @@ class Builtin(object):
                 formatvalues[form].append(Rule(
                     pattern, parse_builtin_rule(replace), system=True))
         for form, formatrules in formatvalues.items():
-            formatrules.sort()
+            formatrules.sort(key=sort_key)
 
         messages = [Rule(Expression('MessageName', Symbol(name), String(msg)),
                          String(value), system=True)
                     for msg, value in self.messages.items()]
 
-        if name == 'System`MakeBoxes':
-            attributes = []
-        else:
-            attributes = ['System`Protected']
-        attributes += list(ensure_context(a) for a in self.attributes)
+        attributes = self.get_builtin_attributes()
         options = {}
         for option, value in six.iteritems(self.options):
-            option = ensure_context(option)
-            options[option] = parse_builtin_rule(value)
-            if option.startswith('System`'):
-                # Create a definition for the option's symbol.
-                # Otherwise it'll be created in Global` when it's
-                # used, so it won't work.
-                if option not in definitions.builtin:
-                    definitions.builtin[option] = Definition(
-                        name=name, attributes=set())
+            options[ensure_context(option)] = parse_builtin_rule(value)
+        self._contribute_option_names(definitions)
         defaults = []
         for spec, value in six.iteritems(self.defaults):
             value = parse_builtin_rule(value)
@@ -148,6 +144,60 @@ class Builtin(object):
         for rule in box_rules:
             makeboxes_def.add_rule(rule)
 
+    def contribute_lazily(self, definitions):
+        """
+        Like contribute(), but only the name and the attributes are
+        registered: the rest of the definition is made by contribute() when
+        the definitions first look it up (see Definitions.get_definition).
+        Builtins with rules for MakeBoxes, which are needed as soon as
+        anything is formatted, are contributed right away.
+        """
+
+        if self.has_box_rules():
+            self.contribute(definitions)
+            return
+        name = self.get_name()
+        definitions.builtin[name] = Definition(
+            name=name, attributes=self.get_builtin_attributes())
+        definitions.pending_builtin.add(name)
+        self._contribute_option_names(definitions)
+
+    def _contribute_option_names(self, definitions):
+        for option in self.options:
+            option = ensure_context(option)
+            if option.startswith('System`'):
+                # Create a definition for the option's symbol.
+                # Otherwise it'll be created in Global` when it's
+                # used, so it won't work.
+                if option not in definitions.builtin:
+                    definitions.builtin[option] = Definition(
+                        name=self.get_name(), attributes=set())
+
+    def get_builtin_attributes(self):
+        if self.get_name() == 'System`MakeBoxes':
+            attributes = []
+        else:
+            attributes = ['System`Protected']
+        attributes += list(ensure_context(a) for a in self.attributes)
+        return attributes
+
+    def has_box_rules(self):
+        "Whether contribute() adds rules to the definition of MakeBoxes."
+
+        patterns = list(self.rules)
+        for name in dir(self):
+            if name.startswith('apply'):
+                pattern = getattr(self, name).__doc__
+                if pattern is not None:
+                    patterns.append(pattern)
+        for pattern in patterns:
+            if isinstance(pattern, BaseExpression):
+                if pattern.get_head_name() == 'System`MakeBoxes':
+                    return True
+            elif _box_rule_pattern.match(pattern):
+                return True
+        return False
+
     @classmethod
     def get_name(cls, short=False):
         if cls.name is None:
@@ -198,22 +248,29 @@ class Builtin(object):
         else:
             return None
 
-    def _get_unavailable_function(self):
+    def _get_missing_package(self):
         requires = getattr(self, 'requires', [])
 
         for package in requires:
             try:
                 importlib.import_module(package)
             except ImportError:
-                def apply(**kwargs):  # will override apply method
-                    kwargs['evaluation'].message(
-                        'General', 'pyimport',  # see inout.py
-                        strip_context(self.get_name()), package)
+                return package
 
-                return apply
+        return None
 
+    def _get_unavailable_function(self):
+        if self._get_missing_package() is not None:
+            # a method rather than a closure, so that the rules using it
+            # can be pickled (see BuiltinRule.__getstate__)
+            return self._apply_unavailable
         return None
 
+    def _apply_unavailable(self, **kwargs):  # will override apply method
+        kwargs['evaluation'].message(
+            'General', 'pyimport',  # see inout.py
+            strip_context(self.get_name()), self._get_missing_package())
+
     def get_option_string(self, *params):
         s = self.get_option(*params)
         if isinstance(s, String):
@@ -14,13 +14,14 @@ from six.moves import zip
 
 from mathics.builtin.base import Builtin, PostfixOperator, SympyFunction
 from mathics.core.expression import Expression, Integer, Number
-from mathics.core.convert import (
-    sympy_symbol_prefix, SympyExpression, from_sympy)
+from mathics.core.convert import sympy_symbol_prefix, from_sympy
 from mathics.core.rules import Pattern
 from mathics.core.numbers import dps
 from mathics.builtin.scoping import dynamic_scoping
 
-import sympy
+from mathics.core.util import LazyModule
+
+sympy = LazyModule('sympy')
 
 
 class D(SympyFunction):
@@ -462,6 +463,8 @@ class Integrate(SympyFunction):
     def apply(self, f, xs, evaluation):
         'Integrate[f_, xs__]'
 
+        from mathics.core.sympy_expression import SympyExpression
+
         f_sympy = f.to_sympy()
         if f_sympy is None or isinstance(f_sympy, SympyExpression):
             return
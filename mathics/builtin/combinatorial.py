@@ -4,11 +4,13 @@
 from __future__ import unicode_literals
 from __future__ import absolute_import
 
-import sympy
 
 from mathics.builtin.base import Builtin
 from mathics.core.expression import Expression, Integer, Symbol
 from mathics.builtin.arithmetic import _MPMathFunction
+from mathics.core.util import LazyModule
+
+sympy = LazyModule('sympy')
 
 
 class Fibonacci(Builtin):
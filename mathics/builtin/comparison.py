@@ -4,7 +4,6 @@
 from __future__ import unicode_literals
 from __future__ import absolute_import
 
-import sympy
 import itertools
 
 from mathics.builtin.base import Builtin, BinaryOperator, Test, SympyFunction
@@ -13,6 +12,9 @@ from mathics.core.expression import (Expression, Number, Integer, Rational,
 from mathics.core.numbers import get_type, dps
 from six.moves import range
 from six.moves import zip
+from mathics.core.util import LazyModule
+
+sympy = LazyModule('sympy')
 
 
 class SameQ(BinaryOperator):
@@ -286,17 +288,15 @@ class Inequality(Builtin):
 
 
 def do_cmp(x1, x2):
-    inf1 = inf2 = real1 = real2 = None
-    if isinstance(x1, (Real, Integer, Rational)):
-        real1 = x1.to_sympy()
-    if isinstance(x2, (Real, Integer, Rational)):
-        real2 = x2.to_sympy()
+    inf1 = inf2 = None
+    real1 = isinstance(x1, (Real, Integer, Rational))
+    real2 = isinstance(x2, (Real, Integer, Rational))
     if x1.has_form('DirectedInfinity', 1):
         inf1 = x1.leaves[0].get_int_value()
     if x2.has_form('DirectedInfinity', 1):
         inf2 = x2.leaves[0].get_int_value()
 
-    if real1 is not None and real2 is not None:
+    if real1 and real2:
         if x1 == x2:
             return 0
         elif x1 < x2:
@@ -310,9 +310,9 @@ def do_cmp(x1, x2):
             return -1
         else:
             return 1
-    elif inf1 is not None and real2 is not None:
+    elif inf1 is not None and real2:
         return inf1
-    elif real1 is not None and inf2 is not None:
+    elif real1 and inf2 is not None:
         return -inf2
     else:
         return None
@@ -13,10 +13,11 @@ from six.moves import zip
 
 from mathics.builtin.base import Builtin, BinaryOperator
 from mathics.core.expression import Expression, Symbol, from_python
+from mathics.core.rules import RuleIndex
 from mathics.core.evaluation import (
     AbortInterrupt, BreakInterrupt, ContinueInterrupt, ReturnInterrupt)
 from mathics.builtin.lists import _IterationFunction
-from mathics.builtin.patterns import match
+from mathics.builtin.patterns import Matcher
 
 
 class CompoundExpression(BinaryOperator):
@@ -118,13 +119,17 @@ class If(Builtin):
 
     attributes = ('HoldRest',)
 
+    # The chosen branch is returned unevaluated: it is evaluated as the
+    # result of the rule, which doesn't need another level of Python
+    # recursion (see Expression.evaluate).
+
     def apply_2(self, condition, t, evaluation):
         'If[condition_, t_]'
 
         name = condition.get_name()
         # FIXME: can this use .is_true()?
         if name == 'System`True':
-            return t.evaluate(evaluation)
+            return t
         elif name == 'System`False':
             return Symbol('Null')
 
@@ -133,20 +138,49 @@ class If(Builtin):
 
         name = condition.get_name()
         if name == 'System`True':
-            return t.evaluate(evaluation)
+            return t
         elif name == 'System`False':
-            return f.evaluate(evaluation)
+            return f
 
     def apply_4(self, condition, t, f, u, evaluation):
         'If[condition_, t_, f_, u_]'
 
         name = condition.get_name()
         if name == 'System`True':
-            return t.evaluate(evaluation)
+            return t
         elif name == 'System`False':
-            return f.evaluate(evaluation)
+            return f
         else:
-            return u.evaluate(evaluation)
+            return u
+
+
+class _SwitchCase(Matcher):
+    # a case of Switch, with the attributes RuleIndex looks at
+    def __init__(self, form):
+        super(_SwitchCase, self).__init__(form)
+        self.pattern = self.form
+        self.signature = self.form.get_signature()
+
+
+# RuleIndex objects for the cases of recently evaluated Switch expressions,
+# as (forms, cases) pairs by the number of forms and the hash of the first
+_switch_cache = {}
+_switch_cache_size = 64
+
+
+def _get_switch_cases(forms):
+    key = (len(forms), hash(forms[0]))
+    cached = _switch_cache.get(key)
+    # the forms of a Switch evaluated again are usually the same objects
+    if cached is not None and all(
+            form is cached_form or form.same(cached_form)
+            for form, cached_form in zip(forms, cached[0])):
+        return cached[1]
+    cases = RuleIndex([_SwitchCase(form) for form in forms])
+    if len(_switch_cache) >= _switch_cache_size:
+        _switch_cache.clear()
+    _switch_cache[key] = (forms, cases)
+    return cases
 
 
 class Switch(Builtin):
@@ -162,6 +196,12 @@ class Switch(Builtin):
      = Switch[5, 1, x, 2, y]
     >> Switch[5, 1, x, 2, y, _, z]
      = z
+
+    Cases are tried in order, whether they are patterns or literal values:
+    >> Switch[6, 1, x, _?EvenQ, even, 6, six]
+     = even
+    #> Switch[6, 1, x, _?OddQ, odd, 6, six]
+     = six
     >> Switch[2, 1]
      : Switch called with 2 arguments. Switch must be called with an odd number of arguments.
      = Switch[2, 1]
@@ -185,9 +225,14 @@ class Switch(Builtin):
         if len(rules) % 2 != 0:
             evaluation.message('Switch', 'argct', 'Switch', len(rules) + 1)
             return
-        for pattern, value in zip(rules[::2], rules[1::2]):
-            if match(expr, pattern, evaluation):
-                return value.evaluate(evaluation)
+        if not rules:
+            return
+        # cases that can't match expr (literals other than expr, in
+        # particular) are skipped without trying them
+        cases = _get_switch_cases(rules[::2])
+        for position in cases.get_positions(expr, evaluation):
+            if cases.rules[position].match(expr, evaluation):
+                return rules[2 * position + 1]
         # return unevaluated Switch when no pattern matches
 
 
@@ -237,7 +282,7 @@ class Which(Builtin):
             test, item = items[0], items[1]
             test_result = test.evaluate(evaluation)
             if test_result.is_true():
-                return item.evaluate(evaluation)
+                return item
             elif test_result.get_name() != 'System`False':
                 if len(items) == nr_items:
                     return None
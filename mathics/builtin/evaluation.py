@@ -81,6 +81,52 @@ class RecursionLimit(Predefined):
         return Integer(self.value)
 
 
+class IterationLimit(Predefined):
+    """
+    <dl>
+    <dt>'$IterationLimit'
+        <dd>specifies the maximum number of times a reevaluation of an
+        expression may happen.
+    </dl>
+
+    Reevaluating the result of a rule doesn't use up the recursion depth, so
+    tail-recursive definitions are only bounded by '$IterationLimit':
+    >> loop[0, acc_] := acc; loop[n_, acc_] := loop[n - 1, acc + n]
+    >> Block[{$IterationLimit = Infinity}, loop[10000, 0]]
+     = 50005000
+
+    Calculations terminated by '$IterationLimit' return the expression
+    reached, wrapped in 'Hold':
+    >> $IterationLimit
+     = 4096
+    >> loop[5000, 0]
+     : Iteration limit of 4096 exceeded.
+     = Hold[loop[904 - 1, 12093440 + 904]]
+
+    >> $IterationLimit = x;
+     : Cannot set $IterationLimit to x; value must be Infinity or an integer at least 20.
+
+    #> Block[{$IterationLimit = 20}, f[n_] := f[n - 1]; f[0]]
+     : Iteration limit of 20 exceeded.
+     = Hold[f[-20 - 1]]
+    #> ClearAll[f, loop]
+    """
+
+    name = '$IterationLimit'
+    value = 4096
+
+    rules = {
+        '$IterationLimit': str(value),
+    }
+
+    messages = {
+        'itlim': "Iteration limit of `1` exceeded.",
+        'limset': (
+            "Cannot set $IterationLimit to `1`; "
+            "value must be Infinity or an integer at least 20."),
+    }
+
+
 class Hold(Builtin):
     """
     <dl>
@@ -12,8 +12,6 @@ rules are not implemented yet.
 from __future__ import unicode_literals
 from __future__ import absolute_import
 
-import sympy
-import mpmath
 import math
 
 from mathics.builtin.base import Builtin, SympyConstant
@@ -22,6 +20,10 @@ from mathics.core.expression import (
 from mathics.core.numbers import dps, get_precision, PrecisionValueError
 
 from mathics.builtin.arithmetic import _MPMathFunction
+from mathics.core.util import LazyModule
+
+sympy = LazyModule('sympy')
+mpmath = LazyModule('mpmath')
 
 
 class Pi(SympyConstant):
@@ -15,25 +15,34 @@ import io
 import shutil
 import zlib
 import base64
+import binascii
 import tempfile
 import time
 import struct
-import mpmath
 import math
-import sympy
+import sys
 
 import six
+import six.moves.cPickle as pickle
 from six.moves import range
 from six import unichr
 
 from mathics.core.expression import (Expression, Real, Complex, String, Symbol,
                                      from_python, Integer, BoxError,
-                                     MachineReal, Number, valid_context_name)
+                                     MachineReal, Number, Rational,
+                                     PrecisionReal, valid_context_name)
 from mathics.core.numbers import dps
+from mathics.core.serialize import (
+    serialize, deserialize, is_serialized, SerializeError)
 from mathics.builtin.base import (Builtin, Predefined, BinaryOperator,
                                   PrefixOperator)
 from mathics.builtin.numeric import Hash
 from mathics.settings import ROOT_DIR
+from mathics.core.util import LazyModule, no_garbage_collection
+from mathics.version import __version__
+
+sympy = LazyModule('sympy')
+mpmath = LazyModule('mpmath')
 
 
 INITIAL_DIR = os.getcwd()
@@ -2079,18 +2088,28 @@ class Get(PrefixOperator):
     precedence = 720
     attributes = ('Protected')
 
+    messages = {
+        'dump': '`1` was not written by DumpSave of this version of Mathics.',
+    }
+
     def apply(self, path, evaluation):
         'Get[path_String]'
-        from mathics.core.parser import parse, TranslateError, FileLineFeeder
+        from mathics.core.parser import (
+            parse_file, TranslateError, FileLineFeeder)
 
         result = None
         pypath = path.get_string_value()
+        if (path_search(pypath) or '').endswith('.mx'):
+            return _load_dump(pypath, evaluation)
         try:
             with mathics_open(pypath, 'r') as f:
                 feeder = FileLineFeeder(f)
-                while not feeder.empty():
+                queries = parse_file(evaluation.definitions, feeder)
+                while True:
                     try:
-                        query = parse(evaluation.definitions, feeder)
+                        query = next(queries)
+                    except StopIteration:
+                        break
                     except TranslateError:
                         return Symbol('Null')
                     finally:
@@ -2110,6 +2129,158 @@ class Get(PrefixOperator):
         return expr
 
 
+# the start of the files written by DumpSave, which can only be read by the
+# same version of Mathics (and Python)
+DUMP_HEADER = ('Mathics DumpSave %s Python %d\n' % (
+    __version__, sys.version_info[0])).encode('ascii')
+
+
+def _make_expression(head, leaves, is_evaluated):
+    expr = Expression(head)
+    expr.leaves = leaves
+    expr.is_evaluated = is_evaluated
+    return expr
+
+
+def _reduce_atom(atom):
+    return atom.__class__, atom.__getnewargs__()
+
+
+def _reduce_expression(expr):
+    return _make_expression, (expr.head, expr.leaves, expr.is_evaluated)
+
+
+# expressions are written as the arguments they are made from, rather than
+# with all of their attributes, which makes the files about a third as big
+# and quicker to load
+_dump_reducers = dict((cls, _reduce_atom) for cls in (
+    Symbol, String, Integer, Rational, MachineReal, PrecisionReal, Complex))
+_dump_reducers[Expression] = _reduce_expression
+
+
+def _dumps(obj):
+    f = io.BytesIO()
+    pickler = pickle.Pickler(f, -1)
+    if six.PY3:
+        pickler.dispatch_table = _dump_reducers
+    pickler.dump(obj)
+    return f.getvalue()
+
+
+def _load_dump(path, evaluation):
+    try:
+        with mathics_open(path, 'rb') as f:
+            data = f.read()
+    except IOError:
+        evaluation.message('General', 'noopen', String(path))
+        return Symbol('$Failed')
+    dump = None
+    if data.startswith(DUMP_HEADER):
+        try:
+            with no_garbage_collection():
+                dump = pickle.loads(data[len(DUMP_HEADER):])
+        except Exception:
+            pass
+    if not isinstance(dump, dict):
+        evaluation.message('Get', 'dump', String(path))
+        return Symbol('$Failed')
+    for name, definition in six.iteritems(dump):
+        evaluation.definitions.add_user_definition(name, definition)
+    return Symbol('Null')
+
+
+class DumpSave(Builtin):
+    """
+    <dl>
+    <dt>'DumpSave["$file$.mx", $symbol$]'
+      <dd>writes the definitions of $symbol$ to $file$ in a binary format,
+      which 'Get' reads back without parsing or evaluating anything.
+    <dt>'DumpSave["$file$.mx", {$symbol1$, $symbol2$, ...}]'
+      <dd>writes the definitions of several symbols.
+    <dt>'DumpSave["$file$.mx", "$context$`"]'
+      <dd>writes the definitions of all the symbols in $context$.
+    </dl>
+
+    The definitions read back replace those the symbols have.
+    >> fib[0] = 0; fib[1] = 1; fib[n_] := fib[n] = fib[n - 1] + fib[n - 2];
+    >> squares = Range[10] ^ 2;
+    >> fib[50]
+     = 12586269025
+    >> DumpSave["definitions.mx", {fib, squares}]
+    >> Clear[fib, squares]
+    >> Get["definitions.mx"]
+    >> Length[DownValues[fib]]
+     = 52
+    >> squares
+     = {1, 4, 9, 16, 25, 36, 49, 64, 81, 100}
+
+    >> Begin["Tables`"];
+    >> table[1] = "one";
+    >> End[];
+    >> DumpSave["tables.mx", "Tables`"]
+    >> Clear[Tables`table]
+    >> << "tables.mx"
+    >> Tables`table[1]
+     = one
+
+    #> DeleteFile["tables.mx"]
+    #> DumpSave["definitions.mx", {fib, 1}]
+     : 1 is not a symbol or a context.
+     = DumpSave[definitions.mx, {fib, 1}]
+    #> DumpSave["/var/", fib]
+     : Cannot open /var/.
+     = $Failed
+
+    #> Put[fib, "definitions.mx"]
+    #> Get["definitions.mx"]
+     : definitions.mx was not written by DumpSave of this version of Mathics.
+     = $Failed
+    #> DeleteFile["definitions.mx"]
+    """
+
+    attributes = ('HoldRest',)
+
+    messages = {
+        'sym': '`1` is not a symbol or a context.',
+    }
+
+    def apply(self, filename, symbols, evaluation):
+        'DumpSave[filename_String, symbols_]'
+
+        definitions = evaluation.definitions
+        if symbols.has_form('List', None):
+            items = symbols.leaves
+        else:
+            items = [symbols]
+        names = []
+        for item in items:
+            context = item.get_string_value()
+            if isinstance(item, Symbol):
+                names.append(item.get_name())
+            elif valid_context_name(context):
+                names.extend(sorted(
+                    name for name in definitions.get_user_names()
+                    if name.startswith(context) and
+                    '`' not in name[len(context):]))
+            else:
+                evaluation.message('DumpSave', 'sym', item)
+                return
+
+        dump = {}
+        for name in names:
+            definition = definitions.get_user_definition(name, create=False)
+            if definition is not None:
+                dump[name] = definition
+        try:
+            with mathics_open(filename.get_string_value(), 'wb') as f:
+                f.write(DUMP_HEADER)
+                f.write(_dumps(dump))
+        except IOError:
+            evaluation.message('General', 'noopen', filename)
+            return Symbol('$Failed')
+        return Symbol('Null')
+
+
 class Put(BinaryOperator):
     """
     <dl>
@@ -3538,11 +3709,11 @@ class Compress(Builtin):
     </dl>
 
     >> Compress[N[Pi, 10]]
-     = eJwz1jM0MTS1NDIzNQEADRsCNw==
+     = eJxj8A2OYGQIUGWYuOr34RRHAB6VBQ0=
 
     ## Unicode char
     #> Compress["―"]
-     = eJxTetQwVQkABwMCPA==
+     = eJxj8A2OYGQIZn7UMBUADqUDRw==
     #> Uncompress[%]
      = ―
     """
@@ -3555,13 +3726,17 @@ class Compress(Builtin):
 
     def apply(self, expr, evaluation, options):
         'Compress[expr_, OptionsPattern[Compress]]'
-        string = expr.format(evaluation, 'System`FullForm')
-        string = string.boxes_to_text(
-            evaluation=evaluation, show_string_characters=True)
-        string = string.encode('utf-8')
+        try:
+            data = serialize(expr)
+        except SerializeError:
+            # atoms without a binary form, like images, are written as text
+            data = expr.format(evaluation, 'System`FullForm')
+            data = data.boxes_to_text(
+                evaluation=evaluation, show_string_characters=True)
+            data = data.encode('utf-8')
 
         # TODO Implement other Methods
-        result = zlib.compress(string)
+        result = zlib.compress(data)
         result = base64.encodestring(result).decode('utf8')
 
         return String(result)
@@ -3575,7 +3750,7 @@ class Uncompress(Builtin):
     </dl>
 
     >> Compress["Mathics is cool"]
-     = eJxT8k0sychMLlbILFZIzs/PUQIANFwF1w==
+     = eJxj8A2OYGQI5vdNLMnITC5WyCxWSM7PzwEARz8G7g==
     >> Uncompress[%]
      = Mathics is cool
 
@@ -3583,6 +3758,10 @@ class Uncompress(Builtin):
     >> b = Compress[a];
     >> Uncompress[b]
      = x ^ 2 + y Sin[x] + 10 Log[15]
+
+    ## Compressed as text by earlier versions
+    #> Uncompress["eJwz1jM0MTS1NDIzNQEADRsCNw=="]
+     = 3.14159
     """
 
     attributes = ('Protected')
@@ -3592,10 +3771,102 @@ class Uncompress(Builtin):
         string = string.get_string_value().encode('utf-8')
         string = base64.decodestring(string)
         tmp = zlib.decompress(string)
+        if is_serialized(tmp):
+            return deserialize(tmp)
+        # written as text, like everything before the binary format
         tmp = tmp.decode('utf-8')
         return evaluation.parse(tmp)
 
 
+class BinarySerialize(Builtin):
+    """
+    <dl>
+    <dt>'BinarySerialize[$expr$]'
+      <dd>gives a binary representation of $expr$, as a 'ByteArray' of
+      the bytes in Base64.
+    </dl>
+
+    >> BinarySerialize[{1, 2.5, x}]
+     = ByteArray[AE1TWAECC1N5c3RlbWBMaXN0CEdsb2JhbGB4RQNZAEkCUgAAAAAAAARAWQE=]
+    >> BinaryDeserialize[%]
+     = {1, 2.5, x}
+
+    Lists of machine reals or integers are stored as blocks of 8 bytes per
+    number, which are read back quickly:
+    >> data = RandomReal[1, 1000];
+    >> BinaryDeserialize[BinarySerialize[data]] === data
+     = True
+
+    Expressions with atoms other than numbers, strings and symbols
+    cannot be serialized:
+    >> BinarySerialize[<|a -> 1|>]
+     : <|a -> 1|> cannot be serialized.
+     = $Failed
+    """
+
+    messages = {
+        'atom': '`1` cannot be serialized.',
+    }
+
+    def apply(self, expr, evaluation):
+        'BinarySerialize[expr_]'
+
+        try:
+            data = serialize(expr)
+        except SerializeError:
+            evaluation.message('BinarySerialize', 'atom', expr)
+            return Symbol('$Failed')
+        return Expression(
+            'ByteArray', String(base64.b64encode(data).decode('ascii')))
+
+
+class BinaryDeserialize(Builtin):
+    """
+    <dl>
+    <dt>'BinaryDeserialize[$bytes$]'
+      <dd>gives the expression serialized in the 'ByteArray' $bytes$ by
+      'BinarySerialize'.
+    <dt>'BinaryDeserialize[$bytes$, $h$]'
+      <dd>wraps the expression in $h$ before it is evaluated.
+    </dl>
+
+    >> BinaryDeserialize[BinarySerialize[Hold[1 + 1]]]
+     = Hold[1 + 1]
+    >> BinaryDeserialize[BinarySerialize[Unevaluated[1 + 1]], HoldForm]
+     = 1 + 1
+    >> BinaryDeserialize[ByteArray["AAAA"]]
+     : ByteArray[AAAA] is not a valid serialized expression.
+     = $Failed
+    """
+
+    messages = {
+        'corrupt': '`1` is not a valid serialized expression.',
+    }
+
+    def apply(self, bytes, evaluation):
+        'BinaryDeserialize[bytes_]'
+
+        return self.apply_head(bytes, None, evaluation)
+
+    def apply_head(self, bytes, head, evaluation):
+        'BinaryDeserialize[bytes_, head_]'
+
+        expr = None
+        if bytes.has_form('ByteArray', 1):
+            string = bytes.leaves[0].get_string_value()
+            if string is not None:
+                try:
+                    expr = deserialize(base64.b64decode(string))
+                except (SerializeError, binascii.Error, TypeError):
+                    pass
+        if expr is None:
+            evaluation.message('BinaryDeserialize', 'corrupt', bytes)
+            return Symbol('$Failed')
+        if head is not None:
+            expr = Expression(head, expr)
+        return expr
+
+
 class FileByteCount(Builtin):
     """
     <dl>
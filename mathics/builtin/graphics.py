@@ -1458,9 +1458,9 @@ class _GraphicsElements(object):
         self.evaluation = evaluation
         self.elements = []
 
-        builtins = evaluation.definitions.builtin
+        definitions = evaluation.definitions
         def get_options(name):
-            builtin = builtins.get(name)
+            builtin = definitions.get_builtin_definition(name)
             if builtin is None:
                 return None
             return builtin.options
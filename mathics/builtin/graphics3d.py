@@ -22,8 +22,6 @@ from .graphics import (Graphics, GraphicsBox, PolygonBox, create_pens, _Color,
 
 import json
 
-from django.utils.html import escape as escape_html
-
 
 def coords3D(value):
     if value.has_form('List', 3):
@@ -540,6 +538,8 @@ currentlight=light(rgb(0.5,0.5,1), specular=red, (2,0,2), (2,2,2), (0,2,2));
         return tex
 
     def boxes_to_xml(self, leaves, **options):
+        from django.utils.html import escape as escape_html
+
         elements, axes, ticks, calc_dimensions, boxscale = \
             self._prepare_elements(leaves, options)
 
@@ -10,11 +10,14 @@ from mathics.builtin.base import (
     Builtin, AtomBuiltin, Test, BoxConstruct, String)
 from mathics.core.expression import (
     Atom, Expression, Integer, Rational, Real, Symbol, from_python)
+from mathics.core.util import LazyModule
 
 import six
 import base64
 import functools
 import math
+import warnings
+from io import BytesIO
 
 _image_requires = (
     'skimage',
@@ -25,60 +28,42 @@ _image_requires = (
     'matplotlib',
 )
 
-try:
-    import skimage
-    import skimage.io
-    import skimage.transform
-    import skimage.filters
-    import skimage.exposure
-    import skimage.feature
-    import skimage.filters.rank
-    import skimage.morphology
-    import skimage.measure
-
-    import warnings
-
-    import PIL
-    import PIL.ImageEnhance
-    import PIL.ImageOps
-    import PIL.ImageFilter
-
-    import numpy
-
-    import matplotlib.cm
+# the packages are only imported once they are used (see
+# Builtin._get_missing_package for the builtins needing them)
+skimage = LazyModule(
+    'skimage', 'skimage.io', 'skimage.transform', 'skimage.filters',
+    'skimage.exposure', 'skimage.feature', 'skimage.filters.rank',
+    'skimage.morphology', 'skimage.measure')
+PIL = LazyModule(
+    'PIL', 'PIL.ImageEnhance', 'PIL.ImageOps', 'PIL.ImageFilter')
+numpy = LazyModule('numpy')
+matplotlib = LazyModule('matplotlib', 'matplotlib.cm')
 
-    _enabled = True
-except ImportError:
-    _enabled = False
+# the functions of skimage.color converting between the color spaces
+_color_space_conversions = {
+    'RGB2Grayscale': 'rgb2gray',
+    'Grayscale2RGB': 'gray2rgb',
 
-from io import BytesIO
-
-
-if _enabled:
-    _color_space_conversions = {
-        'RGB2Grayscale': skimage.color.rgb2gray,
-        'Grayscale2RGB': skimage.color.gray2rgb,
+    'HSV2RGB': 'hsv2rgb',
+    'RGB2HSV': 'rgb2hsv',
 
-        'HSV2RGB': skimage.color.hsv2rgb,
-        'RGB2HSV': skimage.color.rgb2hsv,
+    'LAB2LCH': 'lab2lch',
+    'LCH2LAB': 'lch2lab',
 
-        'LAB2LCH': skimage.color.lab2lch,
-        'LCH2LAB': skimage.color.lch2lab,
+    'LAB2RGB': 'lab2rgb',
+    'LAB2XYZ': 'lab2xyz',
 
-        'LAB2RGB': skimage.color.lab2rgb,
-        'LAB2XYZ': skimage.color.lab2xyz,
+    'LUV2RGB': 'luv2rgb',
+    'LUV2XYZ': 'luv2xyz',
 
-        'LUV2RGB': skimage.color.luv2rgb,
-        'LUV2XYZ': skimage.color.luv2xyz,
+    'RGB2LAB': 'rgb2lab',
+    'RGB2LUV': 'rgb2luv',
+    'RGB2XYZ': 'rgb2xyz',
 
-        'RGB2LAB': skimage.color.rgb2lab,
-        'RGB2LUV': skimage.color.rgb2luv,
-        'RGB2XYZ': skimage.color.rgb2xyz,
-
-        'XYZ2LAB': skimage.color.xyz2lab,
-        'XYZ2LUV': skimage.color.xyz2luv,
-        'XYZ2RGB': skimage.color.xyz2rgb,
-    }
+    'XYZ2LAB': 'xyz2lab',
+    'XYZ2LUV': 'xyz2luv',
+    'XYZ2RGB': 'xyz2rgb',
+}
 
 
 class _ImageBuiltin(Builtin):
@@ -1220,7 +1205,9 @@ class Image(Atom):
         else:
             conversion = '%s2%s' % (self.color_space, to_color_space)
             if conversion in _color_space_conversions:
-                return Image(_color_space_conversions[conversion](self.pixels), to_color_space)
+                convert = getattr(
+                    skimage.color, _color_space_conversions[conversion])
+                return Image(convert(self.pixels), to_color_space)
             else:
                 raise ValueError('cannot convert from color space %s to %s' % (self.color_space, to_color_space))
 
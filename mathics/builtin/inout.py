@@ -10,8 +10,6 @@ from __future__ import absolute_import
 import six
 
 import re
-import sympy
-import mpmath
 
 from mathics.builtin.base import (
     Builtin, BinaryOperator, BoxConstruct, BoxConstructError, Operator)
@@ -24,6 +22,10 @@ from mathics.core.expression import (
     from_python, MachineReal, PrecisionReal)
 from mathics.core.numbers import (
     dps, prec, convert_base, machine_precision, reconstruct_digits)
+from mathics.core.util import LazyModule
+
+sympy = LazyModule('sympy')
+mpmath = LazyModule('mpmath')
 
 MULTI_NEWLINE_RE = re.compile(r"\n{2,}")
 
@@ -1608,6 +1610,9 @@ class General(Builtin):
         # 'rep': "`1` is not a valid replacement rule.",
         'options': "`1` is not a valid list of option rules.",
         'timeout': "Timeout reached.",
+        'nomem': ("The current computation was aborted because there was "
+                  "insufficient memory available to complete the "
+                  "computation."),
         'syntax': "`1`",
         'invalidargs': "Invalid arguments.",
 
@@ -8,13 +8,15 @@ Integer functions
 from __future__ import unicode_literals
 from __future__ import absolute_import
 
-import sympy
 import string
 import math
 
 from mathics.builtin.base import Builtin, SympyFunction
 from mathics.core.convert import from_sympy
 from mathics.core.expression import Integer, String, Expression
+from mathics.core.util import LazyModule
+
+sympy = LazyModule('sympy')
 
 
 class Floor(SympyFunction):
@@ -12,12 +12,14 @@ import six
 from six.moves import range
 from six.moves import zip
 
-import sympy
-from mpmath import mp
 
 from mathics.builtin.base import Builtin
 from mathics.core.convert import from_sympy
 from mathics.core.expression import Expression, Integer, Symbol, Real
+from mathics.core.util import LazyModule
+
+sympy = LazyModule('sympy')
+mpmath = LazyModule('mpmath')
 
 
 def matrix_data(m):
@@ -53,7 +55,7 @@ def to_mpmath_matrix(data, **kwargs):
     if not isinstance(data, list):
         data = mpmath_matrix_data(data)
     try:
-        return mp.matrix(data)
+        return mpmath.mp.matrix(data)
     except (TypeError, AssertionError, ValueError):
         return None
 
@@ -230,8 +232,8 @@ class SingularValueDecomposition(Builtin):
             # symbolic argument (not implemented)
             evaluation.message('SingularValueDecomposition', 'nosymb')
 
-        U, S, V = mp.svd(matrix)
-        S = mp.diag(S)
+        U, S, V = mpmath.mp.svd(matrix)
+        S = mpmath.mp.diag(S)
         U_list = Expression('List', *U.tolist())
         S_list = Expression('List', *S.tolist())
         V_list = Expression('List', *V.tolist())
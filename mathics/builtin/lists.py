@@ -18,8 +18,11 @@ from mathics.builtin.base import (
 from mathics.builtin.scoping import dynamic_scoping
 from mathics.builtin.base import MessageException, NegativeIntegerException, CountableInteger
 from mathics.core.expression import Expression, String, Symbol, Integer, Number, Real, strip_context, from_python
-from mathics.core.expression import min_prec, machine_precision
-from mathics.core.evaluation import BreakInterrupt, ContinueInterrupt, ReturnInterrupt
+from mathics.core.expression import Rational, MachineReal
+from mathics.core.expression import min_prec, machine_precision, sort_key
+from mathics.core.evaluation import (
+    BreakInterrupt, ContinueInterrupt, ReturnInterrupt, LEAF_REFERENCE_SIZE,
+    ATOM_SIZE)
 from mathics.core.rules import Pattern
 from mathics.core.convert import from_sympy
 from mathics.builtin.algebra import cancel
@@ -27,12 +30,17 @@ from mathics.algorithm.introselect import introselect
 from mathics.algorithm.clusters import optimize, agglomerate, kmeans, PrecomputedDistances, LazyDistances
 from mathics.algorithm.clusters import AutomaticSplitCriterion, AutomaticMergeCriterion
 from mathics.builtin.options import options_to_rules
+from mathics.builtin.associations import (
+    Association, HashKey, get_association_rules, get_key)
 
-import sympy
 import heapq
+import math
 
 from collections import defaultdict
 import functools
+from mathics.core.util import LazyModule
+
+sympy = LazyModule('sympy')
 
 
 class List(Builtin):
@@ -141,12 +149,18 @@ class Length(Builtin):
      = 0
     >> FullForm[1/3]
      = Rational[1, 3]
+
+    The length of an association is its number of entries:
+    >> Length[<|a -> 1, b -> 2|>]
+     = 2
     """
 
     def apply(self, expr, evaluation):
         'Length[expr_]'
 
-        if expr.is_atom():
+        if isinstance(expr, Association):
+            return Integer(len(expr.get_items()))
+        elif expr.is_atom():
             return Integer(0)
         else:
             return Integer(len(expr.leaves))
@@ -249,62 +263,80 @@ def get_part(list, indices):
     return rec(list, indices)
 
 
-def set_part(list, indices, new):
-    " Simple part replacement. indices must be a list of python integers. "
+def set_part(list, indices, new, copied=None):
+    """
+    Simple part replacement. indices must be a list of python integers.
+
+    Returns a copy of list with the part replaced, in which only the
+    expressions on the path to the part are copied. copied maps the ids of
+    the copies made by previous calls to them: passing the same dict to a
+    series of calls modifies these copies in place, so that each
+    expression is copied at most once.
+    """
+
+    if copied is None:
+        copied = {}
 
     def rec(cur, rest):
+        if cur.is_atom():
+            raise PartDepthError
+        if id(cur) not in copied:
+            cur = cur.restructure(cur.head, cur.leaves[:])
+            copied[id(cur)] = cur
+        pos = rest[0]
+        try:
+            if pos > 0:
+                part = cur.leaves[pos - 1]
+            elif pos == 0:
+                part = cur.head
+            else:
+                part = cur.leaves[pos]
+        except IndexError:
+            raise PartRangeError
         if len(rest) > 1:
-            pos = rest[0]
-            if cur.is_atom():
-                raise PartDepthError
-            try:
-                if pos > 0:
-                    part = cur.leaves[pos - 1]
-                elif pos == 0:
-                    part = cur.head
-                else:
-                    part = cur.leaves[pos]
-            except IndexError:
-                raise PartRangeError
-            rec(part, rest[1:])
-        elif len(rest) == 1:
-            pos = rest[0]
-            if cur.is_atom():
-                raise PartDepthError
-            try:
-                if pos > 0:
-                    cur.leaves[pos - 1] = new
-                elif pos == 0:
-                    cur.head = new
-                else:
-                    cur.leaves[pos] = new
-            except IndexError:
-                raise PartRangeError
+            part = rec(part, rest[1:])
+        else:
+            part = new
+        if pos > 0:
+            cur.leaves[pos - 1] = part
+        elif pos == 0:
+            cur.head = part
+        else:
+            cur.leaves[pos] = part
+        return cur
 
-    rec(list, indices)
+    if not indices:
+        return new
+    return rec(list, indices)
 
 
 def walk_parts(list_of_list, indices, evaluation, assign_list=None):
-    list = list_of_list[0]
-
-    # To get rid of duplicate entries (TODO: could be made faster!)
-    list = list.copy()
-
-    list.set_positions()
-    list_of_list = [list]
-
-    result = list.copy()
-    result.set_positions()
+    """
+    Returns the parts of list_of_list[0] given by the indices of Part, or,
+    if assign_list is given, a copy of list_of_list[0] with these parts
+    replaced by assign_list. Returns False if the parts don't exist.
 
-    inner_list = [result]   # changed in loop
+    The parts are selected level by level, building a tree of selections:
+    each selected part is a tuple (expr, position), position being the
+    tuple of indices of expr in list_of_list[0]; the parts selected by a
+    Span or a List of indices from an expression are a list [head, parts].
+    """
 
-    list_of_result = [result]   # to be able to change it in replace_result
+    root = [(list_of_list[0], ())]
+    # (container, index) of the parts the next index applies to
+    slots = [(root, 0)]
 
-    def replace_item(all, item, new):
-        if item.position is None:
-            all[0] = new
-        else:
-            item.position.replace(new)
+    def select(inner, position, py_indices):
+        parts = []
+        for py_index in py_indices:
+            if py_index is None:
+                parts.append((inner.head, position + (0,)))
+            else:
+                if py_index < 0:
+                    py_index += len(inner.leaves)
+                parts.append(
+                    (inner.leaves[py_index], position + (py_index + 1,)))
+        return parts
 
     for index in indices:
         index = index.evaluate(evaluation)
@@ -337,95 +369,105 @@ def walk_parts(list_of_list, indices, evaluation, assign_list=None):
                 evaluation.message('Part', 'span', index)
                 return False
 
-            for inner in inner_list:
+            new_slots = []
+            for container, slot in slots:
+                inner, position = container[slot]
+                if inner.is_atom():
+                    evaluation.message('Part', 'partd')
+                    return False
                 py_slice = python_seq(start, stop, step, len(inner.leaves))
                 if py_slice is None:
                     evaluation.message('Part', 'take', start, stop, inner)
                     return False
-                if inner.is_atom():
-                    evaluation.message('Part', 'partd')
-                    return False
-                inner.leaves = inner.leaves[py_slice]
-                inner.original = None
-                inner.set_positions()
-            inner_list = join_lists(inner.leaves for inner in inner_list)
+                parts = select(inner, position, range(
+                    *py_slice.indices(len(inner.leaves))))
+                container[slot] = [inner.head, parts]
+                new_slots.extend((parts, i) for i in range(len(parts)))
+            slots = new_slots
         elif index.has_form('List', None):
             index_list = index
-            indices = []
+            py_indices = []
             for index in index_list.leaves:
                 if not isinstance(index, Integer):
                     evaluation.message('Part', 'pspec', index_list)
                     return False
                 index = index.value
                 if index > 0:
-                    py_index = index - 1
+                    py_indices.append(index - 1)
+                elif index == 0:
+                    py_indices.append(None)
                 else:
-                    py_index = index
-                indices.append((py_index, index))
+                    py_indices.append(index)
 
-            for inner in inner_list:
+            new_slots = []
+            for container, slot in slots:
+                inner, position = container[slot]
                 if inner.is_atom():
                     evaluation.message('Part', 'partd')
                     return False
-
-                new_leaves = []
-                for py_index, index in indices:
-                    try:
-                        if index != 0:
-                            part = inner.leaves[py_index]
-                        else:
-                            part = inner.head
-                        new_leaves.append(part)
-                    except IndexError:
+                for py_index, index in zip(py_indices, index_list.leaves):
+                    if (py_index is not None and
+                        not -len(inner.leaves) <= py_index < len(inner.leaves)):    # nopep8
                         evaluation.message('Part', 'partw', index, inner)
                         return False
-                inner.leaves = new_leaves
-                inner.original = None
-                inner.set_positions()
-            inner_list = join_lists(inner.leaves for inner in inner_list)
+                parts = select(inner, position, py_indices)
+                container[slot] = [inner.head, parts]
+                new_slots.extend((parts, i) for i in range(len(parts)))
+            slots = new_slots
         elif isinstance(index, Integer):
             index = index.value
             if index > 0:
                 py_index = index - 1
+            elif index == 0:
+                py_index = None
             else:
                 py_index = index
-            for inner in inner_list:
+            for container, slot in slots:
+                inner, position = container[slot]
                 if inner.is_atom():
                     evaluation.message('Part', 'partd')
                     return False
-                try:
-                    if index != 0:
-                        part = inner.leaves[py_index]
-                    else:
-                        part = inner.head
-                except IndexError:
+                if (py_index is not None and
+                    not -len(inner.leaves) <= py_index < len(inner.leaves)):    # nopep8
                     evaluation.message('Part', 'partw', index, inner)
                     return False
-                replace_item(list_of_result, inner, part)
-                part.set_positions()
-            inner_list = [inner.leaves[py_index] for inner in inner_list]
-
-    result = list_of_result[0]
-
-    if assign_list is not None:
-        def process_level(item, assignment):
-            if item.is_atom():
-                replace_item(list_of_list, item.original, assignment)
-            elif (assignment.get_head_name() != 'System`List' or
-                  len(item.leaves) != len(assignment.leaves)):
-                if item.original:
-                    replace_item(list_of_list, item.original, assignment)
-                else:
-                    for leaf in item.leaves:
-                        process_level(leaf, assignment)
+                container[slot] = select(inner, position, [py_index])[0]
+
+    if assign_list is None:
+        def build(selection):
+            if isinstance(selection, tuple):
+                return selection[0]
+            head, parts = selection
+            return Expression(head, *[build(part) for part in parts])
+
+        return build(root[0])
+
+    result = [list_of_list[0]]
+    copied = {}
+
+    def assign(selection, assignment):
+        if isinstance(selection, tuple):
+            part, position = selection
+            if (part.is_atom() or
+                assignment.get_head_name() != 'System`List' or
+                len(part.leaves) != len(assignment.leaves)):    # nopep8
+                result[0] = set_part(result[0], position, assignment, copied)
             else:
-                for sub_item, sub_assignment in zip(item.leaves,
-                                                    assignment.leaves):
-                    process_level(sub_item, sub_assignment)
-        process_level(result, assign_list)
-        return list_of_list[0]
-    else:
-        return result
+                for index, leaf in enumerate(part.leaves):
+                    assign((leaf, position + (index + 1,)),
+                           assignment.leaves[index])
+        else:
+            head, parts = selection
+            if (assignment.get_head_name() != 'System`List' or
+                len(parts) != len(assignment.leaves)):  # nopep8
+                for part in parts:
+                    assign(part, assignment)
+            else:
+                for part, sub_assignment in zip(parts, assignment.leaves):
+                    assign(part, sub_assignment)
+
+    assign(root[0], assign_list)
+    return result[0]
 
 
 def is_in_level(current, depth, start=1, stop=None):
@@ -439,7 +481,17 @@ def is_in_level(current, depth, start=1, stop=None):
 
 
 def walk_levels(expr, start=1, stop=None, current=0, heads=False,
-                callback=lambda l: l, include_pos=False, cur_pos=[]):
+                callback=lambda l: l, include_pos=False, cur_pos=()):
+    """
+    Applies callback to the subexpressions of expr at the levels from start
+    to stop, and returns the new expression and its depth. With
+    include_pos, callback is also passed the position of each
+    subexpression, as a tuple of indices.
+
+    Subexpressions for which callback returns parts that are all unchanged
+    are not rebuilt.
+    """
+
     if expr.is_atom():
         depth = 0
         new_expr = expr
@@ -448,18 +500,23 @@ def walk_levels(expr, start=1, stop=None, current=0, heads=False,
         if heads:
             head, head_depth = walk_levels(
                 expr.head, start, stop, current + 1, heads, callback,
-                include_pos, cur_pos + [0])
+                include_pos, cur_pos + (0,) if include_pos else None)
         else:
             head = expr.head
         leaves = []
+        changed = head is not expr.head
         for index, leaf in enumerate(expr.leaves):
-            leaf, leaf_depth = walk_levels(
+            new_leaf, leaf_depth = walk_levels(
                 leaf, start, stop, current + 1, heads, callback, include_pos,
-                cur_pos + [index + 1])
+                cur_pos + (index + 1,) if include_pos else None)
             if leaf_depth + 1 > depth:
                 depth = leaf_depth + 1
-            leaves.append(leaf)
-        new_expr = Expression(head, *leaves)
+            changed = changed or new_leaf is not leaf
+            leaves.append(new_leaf)
+        if changed:
+            new_expr = expr.restructure(head, leaves)
+        else:
+            new_expr = expr
     if is_in_level(current, depth, start, stop):
         if include_pos:
             new_expr = callback(new_expr, cur_pos)
@@ -782,6 +839,25 @@ class Part(Builtin):
     #> {1, 2, 3, 4}[[3;;1]]
      : Cannot take positions 3 through 1 in {1, 2, 3, 4}.
      = {1, 2, 3, 4}[[3 ;; 1]]
+
+    Assigning to parts leaves other values sharing them unchanged:
+    #> a = {{1, 2}, {3, 4}}; b = a; a[[2, 1]] = x; {a, b}
+     = {{{1, 2}, {x, 4}}, {{1, 2}, {3, 4}}}
+    #> a[[;;, 2]] = {y, z}; {a, b}
+     = {{{1, y}, {x, z}}, {{1, 2}, {3, 4}}}
+    #> x[[1 ;; 2]]
+     : Part specification is longer than depth of object.
+     = x[[1 ;; 2]]
+    #> Clear[a, b]
+
+    Parts of associations are given by their keys, or by position:
+    >> a = <|"x" -> 1, y -> {2, 3}|>;
+    >> {a[["x"]], a[[Key[y], 2]], a[[1]]}
+     = {1, 3, 1}
+    >> a[["z"]]
+     : Part z of <|x -> 1, y -> {2, 3}|> does not exist.
+     = <|x -> 1, y -> {2, 3}|>[[z]]
+    #> Clear[a]
     """
 
     attributes = ('NHoldRest', 'ReadProtected')
@@ -805,6 +881,24 @@ class Part(Builtin):
 
         indices = i.get_sequence()
 
+        if indices and isinstance(list, Association):
+            index = indices[0]
+            if isinstance(index, Integer):
+                # by position
+                rules = list.get_rules()
+                if 0 < abs(index.value) <= len(rules):
+                    rule = rules[index.value - 1 if index.value > 0
+                                 else index.value]
+                else:
+                    rule = None
+            else:
+                rule = list.get_rule(get_key(index))
+            if rule is None:
+                return evaluation.message('Part', 'partw', index, list)
+            if len(indices) == 1:
+                return rule.leaves[1]
+            return Expression('Part', rule.leaves[1], *indices[1:])
+
         result = walk_parts([list], indices, evaluation)
         if result:
             return result
@@ -1023,6 +1117,12 @@ class ReplacePart(Builtin):
     Negative part numbers count from the end:
     >> ReplacePart[{a, b, c}, -1 -> t]
      = {a, b, t}
+
+    #> l = {a, {b, c}}; ReplacePart[l, {{2, 1} -> t, {2, 2} -> u, 0 -> g}]
+     = g[a, {t, u}]
+    #> l
+     = {a, {b, c}}
+    #> Clear[l]
     """
 
     messages = {
@@ -1040,7 +1140,8 @@ class ReplacePart(Builtin):
     def apply(self, expr, replacements, evaluation):
         'ReplacePart[expr_, {replacements___}]'
 
-        new_expr = expr.copy()
+        new_expr = expr
+        copied = {}
         replacements = replacements.get_sequence()
         for replacement in replacements:
             if (not replacement.has_form('Rule', 2) and     # noqa
@@ -1051,24 +1152,18 @@ class ReplacePart(Builtin):
             position = replacement.leaves[0]
             replace = replacement.leaves[1]
             if position.has_form('List', None):
-                position = position.leaves
+                position = [pos.get_int_value() for pos in position.leaves]
             else:
-                position = [position]
-            for index, pos in enumerate(position):
-                value = pos.get_int_value()
-                if value is None:
-                    position = None
-                    break
-                else:
-                    position[index] = value
-            if position is None:
+                position = [position.get_int_value()]
+            if None in position:
                 continue
             try:
                 if replacement.get_head_name() == 'System`RuleDelayed':
                     replace_value = replace.evaluate(evaluation)
                 else:
                     replace_value = replace
-                set_part(new_expr, position, replace_value)
+                new_expr = set_part(
+                    new_expr, position, replace_value, copied)
             except PartError:
                 pass
 
@@ -1557,6 +1652,17 @@ class MemberQ(Builtin):
     }
 
 
+def get_iteration_count(imin, imax, di):
+    '''
+    returns the number of values imin, imin + di, ... not greater than imax,
+    or None if this can't be determined numerically.
+    '''
+    imin, imax, di = (x.round_to_float() for x in (imin, imax, di))
+    if imin is None or imax is None or di is None or di <= 0:
+        return None
+    return max(0, int(math.floor((imax - imin) / di)) + 1)
+
+
 class Range(Builtin):
     """
     <dl>
@@ -1581,6 +1687,17 @@ class Range(Builtin):
     def apply(self, imin, imax, di, evaluation):
         'Range[imin_?RealNumberQ, imax_?RealNumberQ, di_?RealNumberQ]'
 
+        count = get_iteration_count(imin, imax, di)
+        if count is not None:
+            evaluation.check_allocation(count, ATOM_SIZE)
+
+        if (isinstance(imin, Integer) and isinstance(imax, Integer) and
+                isinstance(di, Integer) and di.value > 0):
+            # without SymPy
+            return Expression('List', *[
+                Integer(index) for index in
+                range(imin.value, imax.value + 1, di.value)])
+
         imin = imin.to_sympy()
         imax = imax.to_sympy()
         di = di.to_sympy()
@@ -1628,6 +1745,7 @@ class _IterationFunction(Builtin):
             if self.throw_iterb:
                 evaluation.message(self.get_name(), 'iterb')
             return
+        evaluation.check_allocation(max(0, int(math.ceil(imax))))
         result = []
         while index < imax:
             evaluation.check_stopped()
@@ -1678,6 +1796,10 @@ class _IterationFunction(Builtin):
         imax = imax.evaluate(evaluation)
         di = di.evaluate(evaluation)
 
+        count = get_iteration_count(index, imax, di)
+        if count is not None:
+            evaluation.check_allocation(count)
+
         result = []
         while True:
             cont = Expression('LessEqual', index, imax).evaluate(evaluation)
@@ -1997,6 +2119,10 @@ class Append(Builtin):
     >> Append[{a, b}, {c, d}]
      = {a, b, {c, d}}
 
+    'Append' adds rules to associations:
+    >> Append[<|a -> 1|>, {b -> 2, a -> 3}]
+     = <|a -> 3, b -> 2|>
+
     #> Append[a, b]
      : Nonatomic expression expected.
      = Append[a, b]
@@ -2005,6 +2131,10 @@ class Append(Builtin):
     def apply(self, expr, item, evaluation):
         'Append[expr_, item_]'
 
+        if isinstance(expr, Association):
+            rules = get_association_rules(item)
+            if rules is not None:
+                return expr.updated(rules)
         if expr.is_atom():
             return evaluation.message('Append', 'normal')
 
@@ -2051,7 +2181,8 @@ class AppendTo(Builtin):
         'AppendTo[s_, item_]'
         if isinstance(s, Symbol):
             resolved_s = s.evaluate(evaluation)
-            if not resolved_s.is_atom():
+            if (not resolved_s.is_atom() or
+                    isinstance(resolved_s, Association)):
                 result = Expression('Set', s, Expression('Append', resolved_s, item))
                 return result.evaluate(evaluation)
         return evaluation.message('AppendTo', 'rvalue', s)
@@ -2139,6 +2270,8 @@ class Tuples(Builtin):
             evaluation.message('Tuples', 'intnn')
             return
         items = expr.leaves
+        evaluation.check_allocation(
+            len(items) ** n, ATOM_SIZE + n * LEAF_REFERENCE_SIZE)
 
         def iterate(n_rest):
             evaluation.check_stopped()
@@ -2164,6 +2297,12 @@ class Tuples(Builtin):
                 return
             items.append(expr.leaves)
 
+        count = 1
+        for leaves in items:
+            count *= len(leaves)
+        evaluation.check_allocation(
+            count, ATOM_SIZE + len(items) * LEAF_REFERENCE_SIZE)
+
         return Expression('List', *(Expression('List', *leaves)
                                     for leaves in get_tuples(items)))
 
@@ -2384,6 +2523,18 @@ def _is_sameq(same_test):
     return same_test.is_symbol() and same_test.get_name() == 'System`SameQ'
 
 
+def _is_equal(same_test):
+    # recognises Equal and #1 == #2 &
+    if same_test.is_symbol():
+        return same_test.get_name() == 'System`Equal'
+    if not same_test.has_form('Function', 1):
+        return False
+    body = same_test.leaves[0]
+    return body.has_form('Equal', 2) and all(
+        leaf.has_form('Slot', 1) and leaf.leaves[0].get_int_value() == i
+        for i, leaf in enumerate(body.leaves, 1))
+
+
 def _test_pair(test, a, b, evaluation, name):
     test_expr = Expression(test, a, b)
     result = test_expr.evaluate(evaluation)
@@ -2392,7 +2543,21 @@ def _test_pair(test, a, b, evaluation, name):
     return result.is_true()
 
 
-class _SlowEquivalence:
+class _Equivalence(object):
+    # groups prototypes of the equivalence classes found so far. find() looks
+    # for the class of an element in the group select() gives for it.
+
+    def find(self, elem):
+        for prototype, value in self.select(elem):
+            if self.same(prototype, elem):
+                return value
+        return None
+
+    def add(self, elem, value):
+        self.select(elem).append((elem, value))
+
+
+class _SlowEquivalence(_Equivalence):
     # models an equivalence relation through a user defined test function. for n
     # distinct elements (each in its own bin), we need sum(1, .., n - 1) = O(n^2)
     # comparisons.
@@ -2410,12 +2575,12 @@ class _SlowEquivalence:
         return _test_pair(self._test, a, b, self._evaluation, self._name)
 
 
-class _FastEquivalence:
+class _FastEquivalence(_Equivalence):
     # models an equivalence relation through SameQ. for n distinct elements (each
     # in its own bin), we expect to make O(n) comparisons (if the hash function
     # does not fail us by distributing items very unevenly).
 
-    # IMPORTANT NOTE ON ATOM'S HASH FUNCTIONS / this code relies on this assumption:
+    # IMPORTANT NOTE ON ATOM'S HASH FUNCTIONS / this code (and HashKey) relies on this assumption:
     #
     # if SameQ[a, b] == true then hash(a) == hash(b)
     #
@@ -2429,13 +2594,74 @@ class _FastEquivalence:
     # and thus are hashed correctly (see sympy/core/numbers.py:Rational.__eq__()).
 
     def __init__(self):
-        self._hashes = defaultdict(list)
+        self._keys = {}
 
-    def select(self, elem):
-        return self._hashes[hash(elem)]
+    def find(self, elem):
+        return self._keys.get(HashKey(elem))
+
+    def add(self, elem, value):
+        self._keys[HashKey(elem)] = value
 
-    def same(self, a, b):
-        return a.same(b)
+
+def _real_value(elem):
+    if isinstance(elem, (Integer, Rational, MachineReal)):
+        try:
+            return float(elem.value)
+        except OverflowError:
+            pass
+    return None
+
+
+def _real_bucket(value):
+    # numbers the buckets of width 2^-40 relative to the magnitude of value so
+    # that they increase monotonically across binary exponents. Equal ignores
+    # the last seven binary digits of machine reals, and numbers within that
+    # tolerance are always in the same or in neighbouring buckets.
+    if value == 0:
+        return 0
+    mantissa, exponent = math.frexp(abs(value))
+    index = (exponent + 1100) * 2 ** 39 + int(mantissa * 2 ** 40) - 2 ** 39
+    return index if value > 0 else -index
+
+
+class _NumericEquivalence(_Equivalence):
+    # models Equal on integers, rationals and machine reals, comparing each
+    # element only with the prototypes in its own and the neighbouring buckets.
+    # as Equal is not transitive within its tolerance, the oldest matching
+    # prototype wins, just as in _SlowEquivalence.
+
+    def __init__(self):
+        self._buckets = defaultdict(list)
+        self._count = 0
+
+    def find(self, elem):
+        bucket = _real_bucket(_real_value(elem))
+        candidates = []
+        for key in (bucket - 1, bucket, bucket + 1):
+            candidates.extend(self._buckets.get(key, ()))
+        candidates.sort(key=lambda candidate: candidate[0])
+        for _, prototype, value in candidates:
+            if prototype == elem:  # what Equal compares real numbers with
+                return value
+        return None
+
+    def add(self, elem, value):
+        bucket = _real_bucket(_real_value(elem))
+        self._buckets[bucket].append((self._count, elem, value))
+        self._count += 1
+
+
+def _hashed_equivalence(same_test, items):
+    '''
+    Returns the class of an equivalence that models same_test on items
+    without comparing every pair of them, or None if there is none.
+    '''
+    if _is_sameq(same_test):
+        return _FastEquivalence
+    if _is_equal(same_test) and all(
+            _real_value(item) is not None for item in items):
+        return _NumericEquivalence
+    return None
 
 
 class _GatherBin:
@@ -2492,8 +2718,9 @@ class _GatherOperation(Builtin):
             expr = Expression(self.get_name(), list, test)
             return evaluation.message(self.get_name(), 'list', expr, 1)
 
-        if _is_sameq(test):
-            return self._gather(list, _FastEquivalence())
+        equivalence = _hashed_equivalence(test, list.leaves)
+        if equivalence is not None:
+            return self._gather(list, equivalence())
         else:
             return self._gather(list, _SlowEquivalence(test, evaluation, self.get_name()))
 
@@ -2502,14 +2729,12 @@ class _GatherOperation(Builtin):
         Bin = self._bin
 
         for elem in a_list.leaves:
-            selection = equivalence.select(elem)
-            for prototype, add_to_bin in selection:  # find suitable bin
-                if equivalence.same(prototype, elem):
-                    add_to_bin(elem)  # add to existing bin
-                    break
+            add_to_bin = equivalence.find(elem)  # find suitable bin
+            if add_to_bin is not None:
+                add_to_bin(elem)  # add to existing bin
             else:
                 a_bin = Bin(elem)  # create new bin
-                selection.append((elem, a_bin.add_to))
+                equivalence.add(elem, a_bin.add_to)
                 bins.append(a_bin)
 
         return Expression('List', *[a_bin.from_python() for a_bin in bins])
@@ -2613,6 +2838,9 @@ class DeleteDuplicates(_GatherOperation):
 
     #> DeleteDuplicates[{}]
      = {}
+
+    #> DeleteDuplicates[{1, 1., 2, 1/2, 0.5}, Equal]
+     = {1, 2, 1 / 2}
     """
 
     _bin = _DeleteDuplicatesBin
@@ -2641,6 +2869,17 @@ class _SetOperation(Builtin):
                 result.append(a)
         return result
 
+    @staticmethod
+    def _index(arg, equivalence):
+        'removes duplicates from a single operand and indexes the rest'
+        index = equivalence()
+        result = []
+        for a in arg:
+            if index.find(a) is None:
+                index.add(a, True)
+                result.append(a)
+        return result, index
+
     def apply(self, lists, evaluation, options={}):
         '%(name)s[lists__, OptionsPattern[%(name)s]]'
 
@@ -2660,14 +2899,24 @@ class _SetOperation(Builtin):
 
         same_test = self.get_option(options, 'SameTest', evaluation)
         operands = [l.leaves for l in seq]
-        if not _is_sameq(same_test):
+        equivalence = _hashed_equivalence(same_test, chain(*operands))
+        if equivalence is _FastEquivalence:
+            keys = functools.reduce(getattr(set, self._operation),
+                                    [set(map(HashKey, op)) for op in operands])
+            items = [key.expr for key in keys]
+        elif equivalence is None:
             same = lambda a, b: _test_pair(same_test, a, b, evaluation, self.get_name())
             operands = [self._remove_duplicates(op, same) for op in operands]
-            items = functools.reduce(lambda a, b: [e for e in self._elementwise(a, b, same)], operands)
+            items = functools.reduce(lambda a, b: list(self._elementwise(
+                a, b, lambda ea: any(same(eb, ea) for eb in b))), operands)
         else:
-            items = list(functools.reduce(getattr(set, self._operation), map(set, operands)))
+            indexed = [self._index(op, equivalence) for op in operands]
+            items = indexed[0][0]
+            for b, index in indexed[1:]:
+                items = list(self._elementwise(
+                    items, b, lambda ea: index.find(ea) is not None))
 
-        return Expression(seq[0].get_head(), *sorted(items))
+        return Expression(seq[0].get_head(), *sorted(items, key=sort_key))
 
 
 class Union(_SetOperation):
@@ -2693,17 +2942,21 @@ class Union(_SetOperation):
     >> Union[{1, 2, 3}, {2, 3, 4}, SameTest->Less]
      = {1, 2, 2, 3, 4}
 
+    Numbers can be compared with 'Equal' instead of 'SameQ':
+    >> Union[{1, 2., 0.5}, {1., 1/2}, SameTest -> Equal]
+     = {1 / 2, 1., 2.}
+
     #> Union[{1, -1, 2}, {-2, 3}, SameTest -> (Abs[#1] == Abs[#2] &)]
      = {-2, 1, 3}
     """
 
     _operation = 'union'
 
-    def _elementwise(self, a, b, same):
+    def _elementwise(self, a, b, contains):
         for eb in b:
             yield eb
         for ea in a:
-            if not any(same(eb, ea) for eb in b):
+            if not contains(ea):
                 yield ea
 
 
@@ -2733,9 +2986,9 @@ class Intersection(_SetOperation):
 
     _operation = 'intersection'
 
-    def _elementwise(self, a, b, same):
+    def _elementwise(self, a, b, contains):
         for ea in a:
-            if any(same(eb, ea) for eb in b):
+            if contains(ea):
                 yield ea
 
 
@@ -2778,9 +3031,9 @@ class Complement(_SetOperation):
 
     _operation = 'difference'
 
-    def _elementwise(self, a, b, same):
+    def _elementwise(self, a, b, contains):
         for ea in a:
-            if not any(same(eb, ea) for eb in b):
+            if not contains(ea):
                 yield ea
 
 
@@ -11,12 +11,14 @@ import six
 from six.moves import map
 from six.moves import range
 
-import sympy
 from itertools import combinations
 
 from mathics.builtin.base import Builtin, Test
 from mathics.core.expression import (
     Expression, Integer, Rational, Symbol, from_python)
+from mathics.core.util import LazyModule
+
+sympy = LazyModule('sympy')
 
 
 class PowerMod(Builtin):
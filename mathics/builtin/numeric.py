@@ -12,7 +12,6 @@ However, things like 'N[Pi, 100]' should work as expected.
 from __future__ import unicode_literals
 from __future__ import absolute_import
 
-import sympy
 import hashlib
 import zlib
 import math
@@ -26,6 +25,9 @@ from mathics.core.expression import (
     Integer, Real, Complex, Expression, Number, Symbol, Rational, from_python,
     MachineReal)
 from mathics.core.convert import from_sympy
+from mathics.core.util import LazyModule
+
+sympy = LazyModule('sympy')
 
 
 class N(Builtin):
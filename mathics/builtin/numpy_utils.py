@@ -6,13 +6,12 @@ A couple of helper functions for working with numpy (and a couple of fallbacks,
 """
 
 from mathics.core.expression import Expression
+from mathics.core.util import LazyModule, have_module
 from itertools import chain
 
-try:
-    import numpy
-    _numpy = True
-except ImportError:  # no numpy?
-    _numpy = False
+# numpy is only imported once it is used
+_numpy = have_module('numpy')
+numpy = LazyModule('numpy')
 
 
 def py_instantiate_elements(a, new_element, d=1):
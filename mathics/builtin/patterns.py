@@ -38,14 +38,15 @@ from __future__ import absolute_import
 
 from six.moves import range
 
-from mathics.builtin.base import Builtin, BinaryOperator, PostfixOperator
+from mathics.builtin.base import (
+    Builtin, AtomBuiltin, BinaryOperator, PostfixOperator)
 from mathics.builtin.base import PatternObject
 from mathics.builtin.lists import python_levelspec, InvalidLevelspecError
 
 from mathics.core.expression import (
-    Symbol, Expression, Number, Integer, Rational, Real)
-from mathics.core.rules import Rule
-from mathics.core.pattern import Pattern, StopGenerator
+    Atom, Symbol, Expression, Number, Integer, Rational, Real)
+from mathics.core.rules import Rule, RuleIndex
+from mathics.core.pattern import Pattern, AtomPattern, StopGenerator
 
 
 class Rule_(BinaryOperator):
@@ -97,7 +98,21 @@ class RuleDelayed(BinaryOperator):
     needs_verbatim = True
 
 
+# RuleIndex objects for recently used lists of rules, as (rules_expr, rules)
+# pairs by the hash of rules_expr
+_rules_cache = {}
+_rules_cache_size = 64
+
+
 def create_rules(rules_expr, expr, name, evaluation, extra_args=[]):
+    if isinstance(rules_expr, Dispatch):
+        return rules_expr.rules, False
+    key = hash(rules_expr)
+    cached = _rules_cache.get(key)
+    if cached is not None and (cached[0] is rules_expr or
+                               cached[0].same(rules_expr)):
+        return cached[1], False
+
     if rules_expr.has_form('List', None):
         rules = rules_expr.leaves
     else:
@@ -126,6 +141,10 @@ def create_rules(rules_expr, expr, name, evaluation, extra_args=[]):
                 return None, True
             else:
                 result.append(Rule(rule.leaves[0], rule.leaves[1]))
+        result = RuleIndex(result)
+        if len(_rules_cache) >= _rules_cache_size:
+            _rules_cache.clear()
+        _rules_cache[key] = (rules_expr, result)
         return result, False
 
 
@@ -384,7 +403,7 @@ class ReplaceList(Builtin):
             return rules
 
         list = []
-        for rule in rules:
+        for rule in rules.get_candidates(expr, evaluation):
             result = rule.apply(
                 expr, evaluation, return_list=True, max_list=max_count)
             list.extend(result)
@@ -392,6 +411,84 @@ class ReplaceList(Builtin):
         return Expression('List', *list)
 
 
+class Dispatch(Atom):
+    def __init__(self, rules_expr, rules, **kwargs):
+        super(Dispatch, self).__init__(**kwargs)
+        self.src = rules_expr
+        self.rules = rules
+
+    def __str__(self):
+        return 'Dispatch[%s]' % self.src
+
+    def atom_to_boxes(self, f, evaluation):
+        return Expression('Dispatch', self.src).format(
+            evaluation, f.get_name())
+
+    def do_copy(self):
+        return Dispatch(self.src, self.rules)
+
+    def compute_sort_key(self):
+        return Expression('Dispatch', self.src).get_sort_key()
+
+    def same(self, other):
+        return isinstance(other, Dispatch) and self.src.same(other.src)
+
+    def __hash__(self):
+        return hash(('Dispatch', self.src))
+
+
+class DispatchAtom(AtomBuiltin):
+    """
+    <dl>
+    <dt>'Dispatch[$rules$]'
+        <dd>gives an optimized form of the list of $rules$, which can
+        be used in place of it in 'Replace', 'ReplaceAll',
+        'ReplaceRepeated' and 'ReplaceList'.
+    </dl>
+
+    >> disp = Dispatch[{a -> 1, b -> 2, f[x_] :> x ^ 2}]
+     = Dispatch[{a -> 1, b -> 2, f[x_] :> x ^ 2}]
+    >> {a, b, c, f[3]} /. disp
+     = {1, 2, c, 9}
+    >> Replace[b, disp]
+     = 2
+    >> ReplaceList[f[4], disp]
+     = {16}
+    >> Head[disp]
+     = Dispatch
+    >> Dispatch[disp] === disp
+     = True
+
+    Rules are looked up by the atom or head they apply to, so large
+    tables don't have to be searched rule by rule:
+    >> squares = Dispatch[Table[i -> i ^ 2, {i, 1000}]];
+    >> Total[Range[1000] /. squares]
+     = 333833500
+
+    #> Dispatch[x]
+     : x is not a valid replacement rule.
+     = Dispatch[x]
+    """
+
+    messages = {
+        'reps': "`1` is not a valid replacement rule.",
+        'rmix': "Elements of `1` are a mixture of lists and nonlists.",
+    }
+
+    def apply_create(self, rules, evaluation):
+        'Dispatch[rules_]'
+
+        if isinstance(rules, Dispatch):
+            return rules
+        rule_index, ret = create_rules(rules, rules, 'Dispatch', evaluation)
+        if ret:
+            if rule_index is not None:
+                # lists of lists of rules
+                evaluation.message('Dispatch', 'reps', rules)
+            return
+        return Dispatch(rules, rule_index)
+
+
 class PatternTest(BinaryOperator, PatternObject):
     """
     <dl>
@@ -445,30 +542,43 @@ class PatternTest(BinaryOperator, PatternObject):
                 return builtin.test(candidate)
         return None
 
+    def test_items(self, expression, evaluation):
+        for item in expression.get_sequence():
+            item = item.evaluate(evaluation)
+            quick_test = self.quick_pattern_test(item, self.test_name)
+            if quick_test is not None:
+                if not quick_test:
+                    return False
+            else:
+                test_expr = Expression(self.test, item)
+                test_value = test_expr.evaluate(evaluation)
+                if not test_value.is_true():
+                    return False
+        return True
+
     def match(self, yield_func, expression, vars, evaluation, **kwargs):
         # for vars_2, rest in self.pattern.match(expression, vars, evaluation):
         def yield_match(vars_2, rest):
-            items = expression.get_sequence()
-            for item in items:
-                item = item.evaluate(evaluation)
-                quick_test = self.quick_pattern_test(item, self.test_name)
-                if quick_test is not None:
-                    if not quick_test:
-                        break
-                        # raise StopGenerator
-                else:
-                    test_expr = Expression(self.test, item)
-                    test_value = test_expr.evaluate(evaluation)
-                    if not test_value.is_true():
-                        break
-                        # raise StopGenerator
-            else:
+            if self.test_items(expression, evaluation):
                 yield_func(vars_2, None)
         # try:
         self.pattern.match(yield_match, expression, vars, evaluation)
         # except StopGenerator:
         #    pass
 
+    def get_signature(self):
+        return self.pattern.get_signature()
+
+    def get_matcher(self, heads):
+        matcher = self.pattern.get_matcher(heads)
+        if matcher is None:
+            return None
+
+        def match_test(expression, vars, evaluation):
+            return (matcher(expression, vars, evaluation) and
+                    self.test_items(expression, evaluation))
+        return match_test
+
     def get_match_count(self, vars={}):
         return self.pattern.get_match_count(vars)
 
@@ -510,6 +620,20 @@ class Alternatives(BinaryOperator, PatternObject):
             #     yield_func(new_vars, rest)
             alternative.match(yield_func, expression, vars, evaluation)
 
+    def get_matcher(self, heads):
+        # only alternatives that bind no variables can be tried one after
+        # the other without backtracking
+        matchers = []
+        for alternative in self.alternatives:
+            if not isinstance(alternative, (AtomPattern, Blank)):
+                return None
+            matchers.append(alternative.get_matcher(heads))
+
+        def match_alternatives(expression, vars, evaluation):
+            return any(matcher(expression, vars, evaluation)
+                       for matcher in matchers)
+        return match_alternatives
+
     def get_match_count(self, vars={}):
         range = None
         for alternative in self.alternatives:
@@ -519,7 +643,8 @@ class Alternatives(BinaryOperator, PatternObject):
             else:
                 if sub[0] < range[0]:
                     range[0] = sub[0]
-                if range[1] is None or sub[1] > range[1]:
+                if range[1] is not None and (
+                        sub[1] is None or sub[1] > range[1]):
                     range[1] = sub[1]
         return range
 
@@ -650,6 +775,13 @@ class Verbatim(PatternObject):
         if self.content.same(expression):
             yield_func(vars, None)
 
+    def get_matcher(self, heads):
+        content = self.content
+
+        def match_verbatim(expression, vars, evaluation):
+            return content.same(expression)
+        return match_verbatim
+
 
 class HoldPattern(PatternObject):
     """
@@ -683,6 +815,12 @@ class HoldPattern(PatternObject):
         #     yield new_vars, rest
         self.pattern.match(yield_func, expression, vars, evaluation)
 
+    def get_signature(self):
+        return self.pattern.get_signature()
+
+    def get_matcher(self, heads):
+        return self.pattern.get_matcher(heads)
+
 
 class Pattern_(PatternObject):
     """
@@ -770,6 +908,23 @@ class Pattern_(PatternObject):
             if existing.same(expression):
                 yield_func(vars, None)
 
+    def get_signature(self):
+        return self.pattern.get_signature()
+
+    def get_matcher(self, heads):
+        matcher = self.pattern.get_matcher(heads)
+        if matcher is None:
+            return None
+        varname = self.varname
+
+        def match_pattern(expression, vars, evaluation):
+            existing = vars.get(varname, None)
+            if existing is None:
+                vars[varname] = expression
+                return matcher(expression, vars, evaluation)
+            return existing.same(expression)
+        return match_pattern
+
     def get_match_candidates(self, leaves, expression, attributes, evaluation,
                              vars={}):
         existing = vars.get(self.varname, None)
@@ -952,6 +1107,15 @@ class Blank(_Blank):
             else:
                 yield_func(vars, None)
 
+    def get_matcher(self, heads):
+        head = self.head
+
+        def match_blank(expression, vars, evaluation):
+            if expression.has_form('Sequence', 0):
+                return False
+            return head is None or expression.get_head().same(head)
+        return match_blank
+
 
 class BlankSequence(_Blank):
     """
@@ -1014,6 +1178,17 @@ class BlankSequence(_Blank):
     def get_match_count(self, vars={}):
         return (1, None)
 
+    def get_matcher(self, heads):
+        head = self.head
+
+        def match_sequence(expression, vars, evaluation):
+            leaves = expression.get_sequence()
+            if not leaves:
+                return False
+            return head is None or all(
+                leaf.get_head() == head for leaf in leaves)
+        return match_sequence
+
 
 class BlankNullSequence(_Blank):
     """
@@ -1066,6 +1241,14 @@ class BlankNullSequence(_Blank):
     def get_match_count(self, vars={}):
         return (0, None)
 
+    def get_matcher(self, heads):
+        head = self.head
+
+        def match_null_sequence(expression, vars, evaluation):
+            return head is None or all(
+                leaf.get_head() == head for leaf in expression.get_sequence())
+        return match_null_sequence
+
 
 class Repeated(PostfixOperator, PatternObject):
     """
@@ -1106,6 +1289,7 @@ class Repeated(PostfixOperator, PatternObject):
     arg_counts = [1, 2]
 
     def init(self, expr, min=1):
+        self.expr = expr
         self.pattern = Pattern.create(expr.leaves[0])
 
         self.max = None
@@ -1225,6 +1409,21 @@ class Condition(BinaryOperator, PatternObject):
                 yield_func(new_vars, rest)
         self.pattern.match(yield_match, expression, vars, evaluation)
 
+    def get_signature(self):
+        return self.pattern.get_signature()
+
+    def get_matcher(self, heads):
+        matcher = self.pattern.get_matcher(heads)
+        if matcher is None:
+            return None
+
+        def match_condition(expression, vars, evaluation):
+            if not matcher(expression, vars, evaluation):
+                return False
+            test_expr = self.test.replace_vars(vars)
+            return test_expr.evaluate(evaluation).is_true()
+        return match_condition
+
 
 class OptionsPattern(PatternObject):
     """
@@ -23,12 +23,13 @@ from mathics.builtin.base import Builtin
 from mathics.builtin.numpy_utils import instantiate_elements, stack_along_inner_axis
 from mathics.core.expression import (Integer, String, Symbol, Real, Expression,
                                      Complex)
+from mathics.core.util import LazyModule, have_module
 
-try:
-    import numpy
-    _numpy = True
-except ImportError:  # no numpy?
-    _numpy = False
+# numpy is only imported once it is used
+_numpy = have_module('numpy')
+if _numpy:
+    numpy = LazyModule('numpy')
+else:
     import random
 
 if _numpy:
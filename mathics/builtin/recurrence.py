@@ -8,10 +8,12 @@ Recurrence relation solvers
 from __future__ import unicode_literals
 from __future__ import absolute_import
 
-import sympy
 from mathics.builtin.base import Builtin
 from mathics.core.expression import Expression
 from mathics.core.convert import sympy_symbol_prefix, from_sympy
+from mathics.core.util import LazyModule
+
+sympy = LazyModule('sympy')
 
 
 class RSolve(Builtin):
@@ -8,7 +8,6 @@ Special functions
 from __future__ import unicode_literals
 from __future__ import absolute_import
 
-import mpmath
 
 from mathics.builtin.base import Builtin, SympyFunction
 from mathics.builtin.arithmetic import _MPMathFunction, _MPMathMultiFunction
@@ -16,6 +15,9 @@ from mathics.core.expression import Integer, Number
 from mathics.core.numbers import machine_precision, prec, get_precision, PrecisionValueError
 from mathics.core.convert import from_sympy
 from mathics.core.numbers import prec as _prec
+from mathics.core.util import LazyModule
+
+mpmath = LazyModule('mpmath')
 
 
 class Erf(_MPMathMultiFunction):
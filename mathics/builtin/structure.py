@@ -7,12 +7,13 @@ from __future__ import absolute_import
 from mathics.builtin.base import (Builtin, Predefined, BinaryOperator, Test,
                                   MessageException)
 from mathics.core.expression import (Expression, String, Symbol, Integer,
-                                     Rational, strip_context)
+                                     Rational, strip_context, sort_key)
 from mathics.core.rules import Pattern
 
 from mathics.builtin.lists import (python_levelspec, walk_levels,
                                    InvalidLevelspecError)
 from mathics.builtin.functional import Identity
+from mathics.builtin.associations import Association
 import six
 from six.moves import range
 
@@ -67,7 +68,7 @@ class Sort(Builtin):
         if list.is_atom():
             evaluation.message('Sort', 'normal')
         else:
-            new_leaves = sorted(list.leaves)
+            new_leaves = sorted(list.leaves, key=sort_key)
             return Expression(list.head, *new_leaves)
 
     def apply_predicate(self, list, p, evaluation):
@@ -449,6 +450,10 @@ class Map(BinaryOperator):
     >> Map[f, a + b + c, Heads->True]
      = f[Plus][f[a], f[b], f[c]]
 
+    Map over the values of an association:
+    >> Map[f, <|a -> 1, b :> 2|>]
+     = <|a -> f[1], b :> f[2]|>
+
     #> Map[f, expr, a+b, Heads->True]
      : Level specification a + b is not of the form n, {n}, or {m, n}.
      = Map[f, expr, a + b, Heads -> True]
@@ -477,6 +482,12 @@ class Map(BinaryOperator):
             evaluation.message('Map', 'level', ls)
             return
 
+        if isinstance(expr, Association) and (start, stop) == (1, 1):
+            return Expression('Association', *[
+                Expression(rule.head, rule.leaves[0],
+                           Expression(f, rule.leaves[1]))
+                for rule in expr.get_rules()])
+
         def callback(level):
             return Expression(f, level)
 
@@ -101,3 +101,46 @@ class Failed(Predefined):
     """
 
     name = '$Failed'
+
+
+class MemoryConstrained(Builtin):
+    """
+    <dl>
+    <dt>'MemoryConstrained[$expr$, $b$]'
+        <dd>evaluates $expr$, stopping if more than $b$ bytes of memory
+        are requested.
+    <dt>'MemoryConstrained[$expr$, $b$, $failexpr$]'
+        <dd>returns $failexpr$ if the memory constraint is not met.
+    </dl>
+
+    >> MemoryConstrained[Total[Range[100]], 10^6]
+     = 5050
+
+    Large lists are estimated before they are built:
+    >> MemoryConstrained[Table[i, {i, 10^9}], 10^6]
+     = $Aborted
+    >> MemoryConstrained[Range[10^9], 10^6, "too large"]
+     = too large
+
+    Limits can be nested; the innermost exceeded limit handles the
+    failure:
+    >> MemoryConstrained[{MemoryConstrained[ConstantArray[0, 10^8], 10^6, 0], 1}, 10^8]
+     = {0, 1}
+
+    #> MemoryConstrained[x, -1]
+     : Positive integer expected.
+     = MemoryConstrained[x, -1]
+    """
+
+    attributes = ('HoldAll',)
+
+    def apply(self, expr, b, failexpr, evaluation):
+        'MemoryConstrained[expr_, b_, failexpr_:$Aborted]'
+
+        max_bytes = b.evaluate(evaluation).get_int_value()
+        if max_bytes is None or max_bytes <= 0:
+            evaluation.message('MemoryConstrained', 'intp')
+            return
+        return evaluation.with_memory_limit(
+            lambda: expr.evaluate(evaluation), max_bytes,
+            exceeded=lambda: failexpr.evaluate(evaluation))
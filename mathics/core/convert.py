@@ -13,90 +13,21 @@ import six
 from six.moves import range
 from six.moves import zip
 
-import sympy
+from mathics.core.util import LazyModule
+
+sympy = LazyModule('sympy')
 
 sympy_symbol_prefix = '_Mathics_User_'
 sympy_slot_prefix = '_Mathics_Slot_'
 
 
-BasicSympy = sympy.Expr
-
-
-class SympyExpression(BasicSympy):
-    is_Function = True
-    nargs = None
-
-    def __new__(cls, *exprs):
-        # sympy simplify may also recreate the object if simplification occurred
-        # in the leaves
-        from mathics.core.expression import Expression
-
-        if all(isinstance(expr, BasicSympy) for expr in exprs):
-            # called with SymPy arguments
-            obj = BasicSympy.__new__(cls, *exprs)
-        elif len(exprs) == 1 and isinstance(exprs[0], Expression):
-            # called with Mathics argument
-            expr = exprs[0]
-            sympy_head = expr.head.to_sympy()
-            sympy_leaves = [leaf.to_sympy() for leaf in expr.leaves]
-            if sympy_head is None or None in sympy_leaves:
-                return None
-            obj = BasicSympy.__new__(cls, sympy_head, *sympy_leaves)
-            obj.expr = expr
-        else:
-            raise TypeError
-        return obj
-
-    """def new(self, *args):
-        from mathics.core import expression
-
-        expr = expression.Expression(from_sympy(args[0]),
-            *(from_sympy(arg) for arg in args[1:]))
-        return SympyExpression(expr)"""
-
-    @property
-    def func(self):
-        class SympyExpressionFunc(object):
-            def __new__(cls, *args):
-                return SympyExpression(self.expr)
-                # return SympyExpression(expression.Expression(self.expr.head,
-                # *(from_sympy(arg) for arg in args[1:])))
-        return SympyExpressionFunc
-
-    def has_any_symbols(self, *syms):
-        result = any(arg.has_any_symbols(*syms) for arg in self.args)
-        return result
-
-    def _eval_subs(self, old, new):
-        if self == old:
-            return new
-        old, new = from_sympy(old), from_sympy(new)
-        old_name = old.get_name()
-        if old_name:
-            new_expr = self.expr.replace_vars({old_name: new})
-            return SympyExpression(new_expr)
-        return self
-
-    def _eval_rewrite(self, pattern, rule, **hints):
-        return self
-
-    @property
-    def is_commutative(self):
-        if all(getattr(t, 'is_commutative', False) for t in self.args):
-            return True
-        else:
-            return False
-
-    def __str__(self):
-        return '%s[%s]' % (super(SympyExpression, self).__str__(), self.expr)
-
-
 def from_sympy(expr):
     from mathics.builtin import sympy_to_mathics
     from mathics.core.expression import (
         Symbol, Integer, Rational, Real, Complex, String, Expression, MachineReal)
     from mathics.core.numbers import machine_precision
 
+    from mathics.core.sympy_expression import SympyExpression
     from sympy.core import numbers, function, symbol
 
     if isinstance(expr, (tuple, list)):
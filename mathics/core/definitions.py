@@ -8,11 +8,14 @@ import six
 import six.moves.cPickle as pickle
 
 import os
+import sys
 import base64
+import hashlib
+import io
 import re
-import bisect
 
-from mathics.core.expression import Expression, Symbol, String, fully_qualified_symbol_name
+from mathics.core.expression import (Expression, Symbol, String,
+                                     fully_qualified_symbol_name, sort_key)
 from mathics.core.characters import letters, letterlikes
 
 
@@ -28,6 +31,42 @@ def get_file_time(file):
         return 0
 
 
+def get_builtin_snapshot_key():
+    """
+    Returns a key that changes whenever the builtin definitions made by
+    Definitions(add_builtin=True) may: with the versions of Mathics, Python
+    and the libraries whose objects they contain, the enabled builtin modules,
+    the Python packages missing for builtins that require them and the
+    sources of the builtins, the core and the autoload files.
+    """
+
+    from mathics import version_info
+    from mathics.builtin import builtins, modules
+    from mathics.core.util import have_module
+    from mathics.settings import ROOT_DIR
+
+    key = hashlib.sha1()
+    for item in (version_info['mathics'], sys.version, version_info['sympy'],
+                 version_info['mpmath']):
+        key.update(item.encode('utf8'))
+    for module in modules:
+        key.update(module.__name__.encode('utf8'))
+    packages = set()
+    for builtin in builtins.values():
+        packages.update(getattr(builtin, 'requires', ()))
+    for package in sorted(packages):
+        if not have_module(package):
+            key.update(b'missing ' + package.encode('utf8'))
+    for directory in ('builtin', 'core', 'autoload'):
+        for root, dirs, files in os.walk(os.path.join(ROOT_DIR, directory)):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith(('.py', '.m')):
+                    with open(os.path.join(root, name), 'rb') as source:
+                        key.update(source.read())
+    return key.hexdigest()
+
+
 def valuesname(name):
     " 'NValues' -> 'n' "
 
@@ -40,47 +79,106 @@ def valuesname(name):
 
 class Definitions(object):
     def __init__(self, add_builtin=False, builtin_filename=None):
+        """
+        With add_builtin, the builtin definitions are made, including those
+        of the autoload files. They are stored in builtin_filename (by
+        default a file in DATA_DIR, if BUILTIN_SNAPSHOT is set) and loaded
+        from there as long as get_builtin_snapshot_key() stays the same.
+        With LAZY_BUILTIN, most builtins are only made once they are used.
+        """
+
         super(Definitions, self).__init__()
         self.builtin = {}
         self.user = {}
+        # the names of the builtins that only have their attributes so far
+        # (see Builtin.contribute_lazily)
+        self.pending_builtin = set()
 
         if add_builtin:
-            from mathics.builtin import modules, contribute
-            from mathics.core.evaluation import Evaluation
-            from mathics.settings import ROOT_DIR
-
-            loaded = False
-            if builtin_filename is not None:
-                builtin_dates = [get_file_time(module.__file__)
-                                 for module in modules]
-                builtin_time = max(builtin_dates)
-                if get_file_time(builtin_filename) > builtin_time:
-                    builtin_file = open(builtin_filename, 'rb')
-                    self.builtin = pickle.load(builtin_file)
-                    loaded = True
-            if not loaded:
-                contribute(self)
-                if builtin_filename is not None:
-                    builtin_file = open(builtin_filename, 'wb')
-                    pickle.dump(self.builtin, builtin_file, -1)
-
-            for root, dirs, files in os.walk(os.path.join(ROOT_DIR, 'autoload')):
-                for path in [os.path.join(root, f) for f in files if f.endswith('.m')]:
-                    Expression('Get', String(path)).evaluate(Evaluation(self))
-
-            # Move any user definitions created by autoloaded files to
-            # builtins, and clear out the user definitions list. This
-            # means that any autoloaded definitions become shared
-            # between users and no longer disappear after a Quit[].
-            #
-            # Autoloads that accidentally define a name in Global`
-            # could cause confusion, so check for this.
-            #
-            for name in self.user:
-                if name.startswith('Global`'):
-                    raise ValueError("autoload defined %s." % name)
-            self.builtin.update(self.user)
-            self.user = {}
+            from mathics.settings import BUILTIN_SNAPSHOT, DATA_DIR
+
+            if builtin_filename is None and BUILTIN_SNAPSHOT:
+                builtin_filename = os.path.join(DATA_DIR, 'builtin.pickle')
+            if builtin_filename is None:
+                self.add_builtin()
+            else:
+                key = get_builtin_snapshot_key()
+                if not self.load_builtin(builtin_filename, key):
+                    self.add_builtin()
+                    self.save_builtin(builtin_filename, key)
+
+    def add_builtin(self):
+        from mathics.builtin import contribute
+        from mathics.core.evaluation import Evaluation
+        from mathics.settings import LAZY_BUILTIN, ROOT_DIR
+
+        contribute(self, lazy=LAZY_BUILTIN)
+
+        for root, dirs, files in os.walk(os.path.join(ROOT_DIR, 'autoload')):
+            for path in [os.path.join(root, f) for f in files if f.endswith('.m')]:
+                Expression('Get', String(path)).evaluate(Evaluation(self))
+
+        # Move any user definitions created by autoloaded files to
+        # builtins, and clear out the user definitions list. This
+        # means that any autoloaded definitions become shared
+        # between users and no longer disappear after a Quit[].
+        #
+        # Autoloads that accidentally define a name in Global`
+        # could cause confusion, so check for this.
+        #
+        for name in self.user:
+            if name.startswith('Global`'):
+                raise ValueError("autoload defined %s." % name)
+        self.builtin.update(self.user)
+        self.pending_builtin.difference_update(self.user)
+        self.user = {}
+
+    def load_builtin(self, filename, key):
+        """
+        Loads the builtin definitions stored by save_builtin() under the
+        same key. Returns whether there were any.
+        """
+
+        from mathics.builtin.importexport import IMPORTERS, EXPORTERS
+
+        try:
+            with open(filename, 'rb') as snapshot_file:
+                snapshot = io.BytesIO(snapshot_file.read())
+        except (IOError, OSError):
+            return False
+        try:
+            if pickle.load(snapshot) != key:
+                return False
+            builtin, pending, importers, exporters = pickle.load(snapshot)
+        except Exception:
+            # a snapshot that can't be read is simply made again
+            return False
+        self.builtin = builtin
+        self.pending_builtin = pending
+        # the formats registered by the autoload files
+        IMPORTERS.update(importers)
+        EXPORTERS.update(exporters)
+        return True
+
+    def save_builtin(self, filename, key):
+        from mathics.builtin.importexport import IMPORTERS, EXPORTERS
+
+        # written to a temporary file first, so that other processes never
+        # see half a snapshot
+        temp_filename = '%s.%d' % (filename, os.getpid())
+        try:
+            directory = os.path.dirname(filename)
+            if directory and not os.path.isdir(directory):
+                os.makedirs(directory)
+            with open(temp_filename, 'wb') as snapshot_file:
+                pickle.dump(key, snapshot_file, -1)
+                pickle.dump((self.builtin, self.pending_builtin, IMPORTERS,
+                             EXPORTERS), snapshot_file, -1)
+            getattr(os, 'replace', os.rename)(temp_filename, filename)
+        except Exception:
+            # without a snapshot, the builtins are just made again next time
+            if os.path.exists(temp_filename):
+                os.remove(temp_filename)
 
     def get_current_context(self):
         # It's crucial to specify System` in this get_ownvalue() call,
@@ -221,12 +319,30 @@ class Definitions(object):
         return name_with_ctx
 
     def have_definition(self, name):
-        return self.get_definition(name, only_if_exists=True) is not None
+        # without making pending builtins
+        name = self.lookup_name(name)
+        return name in self.user or name in self.builtin
+
+    def get_builtin_definition(self, name):
+        """
+        Returns the builtin definition of the symbol with the given full
+        name, if there is one.
+        """
+
+        if name in self.pending_builtin:
+            from mathics.builtin import builtins
+
+            self.pending_builtin.discard(name)
+            builtins[name].contribute(self)
+        return self.builtin.get(name, None)
 
     def get_definition(self, name, only_if_exists=False):
         name = self.lookup_name(name)
         user = self.user.get(name, None)
-        builtin = self.builtin.get(name, None)
+        if name in self.pending_builtin:
+            builtin = self.get_builtin_definition(name)
+        else:
+            builtin = self.builtin.get(name, None)
 
         if user is None and builtin is None:
             return None if only_if_exists else Definition(name=name)
@@ -286,7 +402,7 @@ class Definitions(object):
     def get_formats(self, name, format=''):
         formats = self.get_definition(name).formatvalues
         result = formats.get(format, []) + formats.get('', [])
-        result.sort()
+        result.sort(key=sort_key)
         return result
 
     def get_nvalues(self, name):
@@ -476,9 +592,18 @@ def insert_rule(values, rule):
         if existing.pattern.same(rule.pattern):
             del values[index]
             break
-    # use insort_left to guarantee that if equal rules exist, newer rules will
-    # get higher precedence by being inserted before them. see DownValues[].
-    bisect.insort_left(values, rule)
+    # insert to the left of equal rules to guarantee that newer rules get
+    # higher precedence. see DownValues[]. this is bisect.insort_left, except
+    # that the key of the new rule is only computed once.
+    key = rule.get_sort_key()
+    lo, hi = 0, len(values)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if values[mid].get_sort_key() < key:
+            lo = mid + 1
+        else:
+            hi = mid
+    values.insert(lo, rule)
 
 
 class Definition(object):
@@ -9,9 +9,15 @@ import six
 import six.moves.cPickle as pickle
 from six.moves.queue import Queue
 
+import os
 import sys
 from threading import Thread
 
+try:
+    import tracemalloc
+except ImportError:     # Python 2
+    tracemalloc = None
+
 from mathics import settings
 from mathics.core.expression import ensure_context, KeyComparable
 
@@ -33,6 +39,11 @@ class TimeoutInterrupt(EvaluationInterrupt):
     pass
 
 
+class MemoryInterrupt(EvaluationInterrupt):
+    def __init__(self, limit):
+        self.limit = limit
+
+
 class ReturnInterrupt(EvaluationInterrupt):
     def __init__(self, expr):
         self.expr = expr
@@ -77,6 +88,52 @@ def run_with_timeout(request, timeout):
         six.reraise(*result)
 
 
+# Number of check_stopped() calls between two samples of the memory in use
+# while a memory limit is active.
+MEMORY_SAMPLE_INTERVAL = 100
+
+# Rough lower bounds (in bytes) used to estimate the size of large lists
+# before they are built: one reference to each leaf, and a freshly created
+# atom (e.g. an Integer) per leaf.
+LEAF_REFERENCE_SIZE = 24
+ATOM_SIZE = 200
+
+
+def get_memory_in_use():
+    '''
+    returns the number of bytes currently allocated. This is exact while
+    tracemalloc is tracing, otherwise the resident set size of the process.
+    '''
+    if tracemalloc is not None and tracemalloc.is_tracing():
+        return tracemalloc.get_traced_memory()[0]
+    try:
+        with open('/proc/self/statm') as statm:
+            pages = int(statm.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE')
+    except (IOError, OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:     # Windows
+        return 0
+    # peak rather than current usage, in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class MemoryLimit(object):
+    '''
+    A bound on the memory allocated by (part of) an evaluation, as set up
+    by MemoryConstrained[] or Evaluation.evaluate(memory_limit=...).
+    '''
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.start = get_memory_in_use()
+
+    def exceeded(self, in_use, extra=0):
+        return in_use + extra - self.start > self.max_bytes
+
+
 class Out(KeyComparable):
     def __init__(self):
         self.is_message = False
@@ -169,6 +226,8 @@ class Evaluation(object):
         self.recursion_depth = 0
         self.timeout = False
         self.stopped = False
+        self.memory_limits = []
+        self.memory_check_count = 0
         self.out = []
         self.output = output if output else Output()
         self.listeners = {}
@@ -178,6 +237,7 @@ class Evaluation(object):
         self.quiet_all = False
         self.format = format
         self.catch_interrupt = catch_interrupt
+        self.use_stack_evaluator = settings.STACK_EVALUATOR
 
     def parse(self, query):
         'Parse a single expression and print the messages.'
@@ -201,7 +261,7 @@ class Evaluation(object):
         feeder.send_messages(self)
         return result
 
-    def evaluate(self, query, timeout=None):
+    def evaluate(self, query, timeout=None, memory_limit=None):
         'Evaluate an expression.'
         from mathics.core.expression import Symbol, Expression
         from mathics.core.rules import Rule
@@ -240,7 +300,12 @@ class Evaluation(object):
                 return None
         try:
             try:
-                result = run_with_timeout(evaluate, timeout)
+                if memory_limit is None:
+                    result = run_with_timeout(evaluate, timeout)
+                else:
+                    result = run_with_timeout(
+                        lambda: self.with_memory_limit(evaluate, memory_limit),
+                        timeout)
             except KeyboardInterrupt:
                 if self.catch_interrupt:
                     exc_result = Symbol('$Aborted')
@@ -268,6 +333,9 @@ class Evaluation(object):
                 self.timeout = True
                 self.message('General', 'timeout')
                 exc_result = Symbol('$Aborted')
+            except MemoryInterrupt:
+                self.message('General', 'nomem')
+                exc_result = Symbol('$Aborted')
             except AbortInterrupt:  # , error:
                 exc_result = Symbol('$Aborted')
             except ReturnInterrupt as ret:
@@ -441,6 +509,57 @@ class Evaluation(object):
     def check_stopped(self):
         if self.stopped:
             raise TimeoutInterrupt
+        if self.memory_limits:
+            self.memory_check_count += 1
+            if self.memory_check_count >= MEMORY_SAMPLE_INTERVAL:
+                self.memory_check_count = 0
+                self.check_memory()
+
+    def check_memory(self, extra=0):
+        '''
+        Raises a MemoryInterrupt if the memory in use, plus extra bytes that
+        are about to be allocated, exceeds an active memory limit. The
+        innermost exceeded limit is reported, as aborting its computation
+        frees the memory allocated under it.
+        '''
+        if not self.memory_limits:
+            return
+        in_use = get_memory_in_use()
+        for limit in reversed(self.memory_limits):
+            if limit.exceeded(in_use, extra):
+                raise MemoryInterrupt(limit)
+
+    def check_allocation(self, count, item_size=LEAF_REFERENCE_SIZE):
+        '''
+        Checks in advance whether a list of count items, each estimated to
+        take item_size bytes, can be built within the active memory limits.
+        '''
+        if self.memory_limits:
+            self.check_memory(count * item_size)
+
+    def with_memory_limit(self, request, max_bytes, exceeded=None):
+        '''
+        Calls request() while at most max_bytes of additional memory may be
+        allocated. If the limit is exceeded, the result of exceeded() is
+        returned instead, or the MemoryInterrupt is passed on if exceeded is
+        None.
+        '''
+        started_tracing = False
+        if tracemalloc is not None and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            started_tracing = True
+        limit = MemoryLimit(max_bytes)
+        self.memory_limits.append(limit)
+        try:
+            return request()
+        except MemoryInterrupt as exc:
+            if exc.limit is not limit or exceeded is None:
+                raise
+        finally:
+            self.memory_limits.remove(limit)
+            if started_tracing:
+                tracemalloc.stop()
+        return exceeded()
 
     def inc_recursion_depth(self):
         self.check_stopped()
@@ -456,6 +575,13 @@ class Evaluation(object):
     def dec_recursion_depth(self):
         self.recursion_depth -= 1
 
+    def get_iteration_limit(self):
+        'Returns the value of $IterationLimit, None meaning Infinity.'
+        limit = self.definitions.get_config_value('$IterationLimit')
+        if limit is not None and limit < 20:
+            limit = 20
+        return limit
+
     def add_listener(self, tag, listener):
         existing = self.listeners.get(tag)
         if existing is None:
@@ -4,19 +4,22 @@
 from __future__ import unicode_literals
 from __future__ import absolute_import
 
-import sympy
-import mpmath
 import math
 import re
 import abc
+import operator
 
 from mathics.core.numbers import get_type, dps, prec, min_prec, machine_precision
-from mathics.core.convert import sympy_symbol_prefix, SympyExpression
+from mathics.core.convert import sympy_symbol_prefix
 
 import six
 from six.moves import map
 from six.moves import range
 from six.moves import zip
+from mathics.core.util import LazyModule
+
+sympy = LazyModule('sympy')
+mpmath = LazyModule('mpmath')
 
 
 def fully_qualified_symbol_name(name):
@@ -62,6 +65,13 @@ def system_symbols_dict(d):
     return {ensure_context(k): v for k, v in six.iteritems(d)}
 
 
+# key functions for sorting lists of expressions in canonical and pattern
+# order. sorting with these computes each key once per element instead of
+# once per comparison (as KeyComparable's operators do).
+sort_key = operator.methodcaller('get_sort_key')
+pattern_sort_key = operator.methodcaller('get_sort_key', True)
+
+
 class BoxError(Exception):
     def __init__(self, box, form):
         super(BoxError, self).__init__(
@@ -70,43 +80,33 @@ class BoxError(Exception):
         self.form = form
 
 
-class ExpressionPointer(object):
-    def __init__(self, parent, position):
-        self.parent = parent
-        self.position = position
-
-    def replace(self, new):
-        if self.position == 0:
-            self.parent.head = new
-        else:
-            self.parent.leaves[self.position - 1] = new
-
-    def __str__(self):
-        return '%s[[%s]]' % (self.parent, self.position)
-
-
 def from_python(arg):
-    number_type = get_type(arg)
-    if isinstance(arg, six.integer_types) or number_type == 'z':
+    if isinstance(arg, BaseExpression):
+        return arg
+    # Python's own types first: get_type() needs SymPy
+    if isinstance(arg, six.integer_types):
         return Integer(arg)
-    elif isinstance(arg, float) or number_type == 'f':
+    elif isinstance(arg, float):
         return Real(arg)
-    elif number_type == 'q':
-        return Rational(arg)
     elif isinstance(arg, complex):
         return Complex(Real(arg.real), Real(arg.imag))
-    elif number_type == 'c':
-        return Complex(arg.real, arg.imag)
     elif isinstance(arg, six.string_types):
         return String(arg)
         # if arg[0] == arg[-1] == '"':
         #     return String(arg[1:-1])
         # else:
         #     return Symbol(arg)
-    elif isinstance(arg, BaseExpression):
-        return arg
     elif isinstance(arg, list) or isinstance(arg, tuple):
         return Expression('List', *[from_python(leaf) for leaf in arg])
+    number_type = get_type(arg)
+    if number_type == 'z':
+        return Integer(arg)
+    elif number_type == 'f':
+        return Real(arg)
+    elif number_type == 'q':
+        return Rational(arg)
+    elif number_type == 'c':
+        return Complex(arg.real, arg.imag)
     else:
         raise NotImplementedError
 
@@ -236,6 +236,11 @@ class BaseExpression(KeyComparable):
             elif l2 is not None and level > l2:
                 return self, False
 
+        # a RuleIndex only gives the rules that can match
+        get_candidates = getattr(rules, 'get_candidates', None)
+        if get_candidates is not None:
+            rules = get_candidates(self, evaluation)
+
         for rule in rules:
             result = rule.apply(self, evaluation, fully=False)
             if result is not None:
@@ -501,7 +506,83 @@ class Monomial(object):
         return 0
 
 
+def get_evaluated_positions(leaves, attributes):
+    """
+    Yields the indices of the leaves that are evaluated for a head with the
+    given attributes: all leaves not wrapped in Unevaluated, and held
+    leaves wrapped in Evaluate (unless the head is HoldAllComplete).
+    """
+
+    if 'System`HoldAllComplete' in attributes:
+        return
+    if 'System`HoldAll' in attributes:
+        held = lambda index: True
+    elif 'System`HoldFirst' in attributes:
+        held = lambda index: index == 0
+    elif 'System`HoldRest' in attributes:
+        held = lambda index: index > 0
+    else:
+        held = lambda index: False
+    for index, leaf in enumerate(leaves):
+        if held(index):
+            if leaf.has_form('Evaluate', 1):
+                yield index
+        elif not leaf.has_form('Unevaluated', 1):
+            yield index
+
+
+def evaluate_on_stack(expr, evaluation):
+    """
+    Evaluates expr keeping the pending evaluations on an explicit stack
+    instead of the Python stack, so that the depth of expressions and of
+    user-defined recursion is only bounded by $RecursionLimit.
+
+    Each entry of the stack is the evaluate_steps() generator of an
+    expression or symbol being evaluated, together with the list its value
+    is stored in. Other atoms are evaluated directly.
+    """
+
+    result = [None]
+    stack = [(expr.evaluate_steps(evaluation, result), result)]
+    value = None
+    try:
+        while stack:
+            steps, result = stack[-1]
+            try:
+                sub = steps.send(value)
+            except StopIteration:
+                stack.pop()
+                value = result[0]
+                continue
+            if isinstance(sub, (Expression, Symbol)):
+                result = [None]
+                stack.append((sub.evaluate_steps(evaluation, result), result))
+                value = None
+            else:
+                value = sub.evaluate(evaluation)
+    finally:
+        # restore the options and recursion depth of pending evaluations
+        # when an interrupt or error leaves the loop
+        while stack:
+            stack.pop()[0].close()
+    return value
+
+
+_numeric_functions = frozenset(system_symbols(
+    'Sqrt', 'Times', 'Plus', 'Subtract', 'Minus', 'Power', 'Abs',
+    'Divide', 'Sin'))
+
+_numeric_constants = frozenset(system_symbols(
+    'Pi', 'E', 'EulerGamma', 'GoldenRatio', 'MachinePrecision', 'Catalan'))
+
+
 class Expression(BaseExpression):
+    # cached sort keys, as (head, leaves, key) tuples. an entry is only
+    # valid while head and leaves are still the objects it was computed
+    # for; code that modifies leaves in place must call clear_sort_keys().
+    _sort_key = None
+    _pattern_sort_key = None
+
     def __new__(cls, head, *leaves, **kwargs):
         self = super(Expression, cls).__new__(cls)
         if isinstance(head, six.string_types):
@@ -517,9 +598,22 @@ class Expression(BaseExpression):
         result = Expression(
             self.head.copy(), *[leaf.copy() for leaf in self.leaves])
         result.options = self.options
-        result.original = self
         return result
 
+    def restructure(self, head, leaves):
+        """
+        Returns a new expression with the given head and leaves, like
+        Expression(head, *leaves) but without passing the leaves (which must
+        be BaseExpressions already) through from_python(). The list of
+        leaves is used as it is, not copied.
+        """
+        expr = Expression(head)
+        expr.leaves = leaves
+        if leaves is self.leaves and head is self.head:
+            expr._sort_key = self._sort_key
+            expr._pattern_sort_key = self._pattern_sort_key
+        return expr
+
     def shallow_copy(self):
         # this is a minimal, shallow copy: head, leaves are shared with
         # the original, only the Expression instance is new. we transfer
@@ -528,14 +622,10 @@ class Expression(BaseExpression):
         expr.leaves = self.leaves
         expr.options = self.options
         expr.is_evaluated = self.is_evaluated
+        expr._sort_key = self._sort_key
+        expr._pattern_sort_key = self._pattern_sort_key
         return expr
 
-    def set_positions(self, position=None):
-        self.position = position
-        self.head.set_positions(ExpressionPointer(self, 0))
-        for index, leaf in enumerate(self.leaves):
-            leaf.set_positions(ExpressionPointer(self, index + 1))
-
     def get_head(self):
         return self.head
 
@@ -579,6 +669,7 @@ class Expression(BaseExpression):
 
     def to_sympy(self, **kwargs):
         from mathics.builtin import mathics_to_sympy
+        from mathics.core.sympy_expression import SympyExpression
 
         if 'converted_functions' in kwargs:
             functions = kwargs['converted_functions']
@@ -629,6 +720,23 @@ class Expression(BaseExpression):
         return self
 
     def get_sort_key(self, pattern_sort=False):
+        cached = self._pattern_sort_key if pattern_sort else self._sort_key
+        if (cached is not None and cached[0] is self.head and
+                cached[1] is self.leaves):
+            return cached[2]
+        key = self.compute_sort_key(pattern_sort)
+        if pattern_sort:
+            self._pattern_sort_key = (self.head, self.leaves, key)
+        else:
+            self._sort_key = (self.head, self.leaves, key)
+        return key
+
+    def clear_sort_keys(self):
+        self._sort_key = self._pattern_sort_key = None
+
+    def compute_sort_key(self, pattern_sort):
+        # keys of the leaves are cached themselves, so they must be copied
+        # before being modified
 
         if pattern_sort:
             """
@@ -664,25 +772,25 @@ class Expression(BaseExpression):
             if name == 'System`PatternTest':
                 if len(self.leaves) != 2:
                     return [3, 0, 0, 0, 0, self.head, self.leaves, 1]
-                sub = self.leaves[0].get_sort_key(True)
+                sub = list(self.leaves[0].get_sort_key(True))
                 sub[2] = 0
                 return sub
             elif name == 'System`Condition':
                 if len(self.leaves) != 2:
                     return [3, 0, 0, 0, 0, self.head, self.leaves, 1]
-                sub = self.leaves[0].get_sort_key(True)
+                sub = list(self.leaves[0].get_sort_key(True))
                 sub[7] = 0
                 return sub
             elif name == 'System`Pattern':
                 if len(self.leaves) != 2:
                     return [3, 0, 0, 0, 0, self.head, self.leaves, 1]
-                sub = self.leaves[1].get_sort_key(True)
+                sub = list(self.leaves[1].get_sort_key(True))
                 sub[3] = 0
                 return sub
             elif name == 'System`Optional':
                 if len(self.leaves) not in (1, 2):
                     return [3, 0, 0, 0, 0, self.head, self.leaves, 1]
-                sub = self.leaves[0].get_sort_key(True)
+                sub = list(self.leaves[0].get_sort_key(True))
                 sub[4] = 1
                 return sub
             elif name == 'System`Alternatives':
@@ -753,129 +861,240 @@ class Expression(BaseExpression):
         sub_level = None if level is None else level - 1
         do_flatten = False
         for leaf in self.leaves:
-            if leaf.get_head().same(head) and (not pattern_only or leaf.pattern_sequence):
+            # atoms are never flattened; skip building their heads
+            if not leaf.is_atom() and leaf.head.same(head) and (
+                    not pattern_only or leaf.pattern_sequence):
                 do_flatten = True
                 break
         if do_flatten:
             new_leaves = []
             for leaf in self.leaves:
-                if leaf.get_head().same(head) and (not pattern_only or leaf.pattern_sequence):
+                if not leaf.is_atom() and leaf.head.same(head) and (
+                        not pattern_only or leaf.pattern_sequence):
                     new_leaf = leaf.flatten(head, pattern_only, callback, level=sub_level)
                     if callback is not None:
                         callback(new_leaf.leaves, leaf)
                     new_leaves.extend(new_leaf.leaves)
                 else:
                     new_leaves.append(leaf)
-            return Expression(self.head, *new_leaves)
+            return self.restructure(self.head, new_leaves)
         else:
             return self
 
     def evaluate(self, evaluation):
+        if evaluation.use_stack_evaluator:
+            return evaluate_on_stack(self, evaluation)
         evaluation.inc_recursion_depth()
         old_options = evaluation.options
-        if hasattr(self, 'options') and self.options:
-            evaluation.options = self.options
         try:
-            if self.is_evaluated:
-                return self
-            head = self.head.evaluate(evaluation)
-            attributes = head.get_attributes(evaluation.definitions)
-            leaves = self.leaves[:]
-
-            def rest_range(indices):
-                if 'System`HoldAllComplete' not in attributes:
-                    for index in indices:
-                        leaf = leaves[index]
-                        if leaf.has_form('Evaluate', 1):
-                            leaves[index] = leaf.evaluate(evaluation)
-
-            def eval_range(indices):
-                for index in indices:
-                    leaf = leaves[index]
-                    if not leaf.has_form('Unevaluated', 1):
-                        leaves[index] = leaf.evaluate(evaluation)
-
-            if 'System`HoldAll' in attributes or 'System`HoldAllComplete' in attributes:
-                # eval_range(range(0, 0))
-                rest_range(range(len(leaves)))
-            elif 'System`HoldFirst' in attributes:
-                rest_range(range(0, min(1, len(leaves))))
-                eval_range(range(1, len(leaves)))
-            elif 'System`HoldRest' in attributes:
-                eval_range(range(0, min(1, len(leaves))))
-                rest_range(range(1, len(leaves)))
+            expr = self
+            iteration = 0
+            while True:
+                if expr.is_evaluated:
+                    return expr
+                if hasattr(expr, 'options') and expr.options:
+                    evaluation.options = expr.options
+                head = expr.head.evaluate(evaluation)
+                attributes = head.get_attributes(evaluation.definitions)
+                leaves = expr.leaves
+                for index in get_evaluated_positions(expr.leaves, attributes):
+                    leaf = expr.leaves[index]
+                    value = leaf.evaluate(evaluation)
+                    if value is not leaf:
+                        if leaves is expr.leaves:
+                            leaves = leaves[:]
+                        leaves[index] = value
+
+                expr, reevaluate = expr.evaluate_rules(
+                    head, attributes, leaves, evaluation)
+                if not reevaluate:
+                    return expr
+                if not isinstance(expr, Expression):
+                    return expr.evaluate(evaluation)
+
+                # The result of a rule is evaluated in this same call instead
+                # of recursing, so that tail-recursive definitions run in
+                # constant stack, bounded by $IterationLimit instead of
+                # $RecursionLimit.
+                if iteration == 0:
+                    limit = evaluation.get_iteration_limit()
+                iteration += 1
+                if limit is not None and iteration > limit:
+                    evaluation.message('$IterationLimit', 'itlim', limit)
+                    return Expression('Hold', expr)
+                evaluation.check_stopped()
+
+        finally:
+            evaluation.options = old_options
+            evaluation.dec_recursion_depth()
+
+    def evaluate_steps(self, evaluation, result):
+        """
+        Evaluates like evaluate(), but as a generator for the explicit stack
+        evaluator: subexpressions to be evaluated are yielded, and their
+        values are sent back in. The value of self is left in result[0].
+        """
+        evaluation.inc_recursion_depth()
+        old_options = evaluation.options
+        try:
+            expr = self
+            iteration = 0
+            while True:
+                if expr.is_evaluated:
+                    result[0] = expr
+                    return
+                if hasattr(expr, 'options') and expr.options:
+                    evaluation.options = expr.options
+                head = yield expr.head
+                attributes = head.get_attributes(evaluation.definitions)
+                leaves = expr.leaves
+                for index in get_evaluated_positions(expr.leaves, attributes):
+                    leaf = expr.leaves[index]
+                    value = yield leaf
+                    if value is not leaf:
+                        if leaves is expr.leaves:
+                            leaves = leaves[:]
+                        leaves[index] = value
+
+                expr, reevaluate = expr.evaluate_rules(
+                    head, attributes, leaves, evaluation)
+                if not reevaluate:
+                    result[0] = expr
+                    return
+                if not isinstance(expr, Expression):
+                    result[0] = yield expr
+                    return
+
+                if iteration == 0:
+                    limit = evaluation.get_iteration_limit()
+                iteration += 1
+                if limit is not None and iteration > limit:
+                    evaluation.message('$IterationLimit', 'itlim', limit)
+                    result[0] = Expression('Hold', expr)
+                    return
+                evaluation.check_stopped()
+
+        finally:
+            evaluation.options = old_options
+            evaluation.dec_recursion_depth()
+
+    def evaluate_rules(self, head, attributes, leaves, evaluation):
+        """
+        Builds the expression from the evaluated head and leaves, flattens
+        and sorts it according to the head's attributes, and applies
+        threading and the first matching rule.
+
+        leaves is self.leaves if no leaf changed during evaluation. The list
+        is then only copied if it has to be flattened, sorted or have
+        Unevaluated leaves stripped, so that evaluating an expression that
+        is already in evaluated form takes no copies of its leaves.
+
+        Returns the new expression and whether it still needs to be
+        evaluated.
+        """
+
+        hold_all_complete = 'System`HoldAllComplete' in attributes
+        sequence_hold = (hold_all_complete or
+                         'System`SequenceHold' in attributes)
+        flat = 'System`Flat' in attributes
+        rebuild = False
+        for leaf in leaves:
+            if leaf.is_atom():
+                continue
+            leaf_head = leaf.get_head_name()
+            if ((leaf_head == 'System`Sequence' and not sequence_hold) or
+                (leaf_head == 'System`Unevaluated' and    # noqa
+                 not hold_all_complete and len(leaf.leaves) == 1) or
+                (flat and leaf.get_head().same(head))):
+                rebuild = True
+                break
+
+        if rebuild:
+            new, unevaluated = self.rebuild_evaluated(
+                head, attributes, leaves)
+        else:
+            # if no leaf changed, the new expression shares its leaves with
+            # self, so they must not be modified in place
+            new, unevaluated = self.restructure(head, leaves), None
+
+        if 'System`Orderless' in attributes:
+            if new.leaves is self.leaves:
+                new.leaves = sorted(new.leaves, key=sort_key)
             else:
-                eval_range(range(len(leaves)))
-                # rest_range(range(0, 0))
+                new.sort()
+        leaves = new.leaves
 
-            new = Expression(head, *leaves)
-            if ('System`SequenceHold' not in attributes and    # noqa
-                'System`HoldAllComplete' not in attributes):
-                new = new.flatten(Symbol('Sequence'))
-            leaves = new.leaves
+        new.is_evaluated = True
+        if 'System`Listable' in attributes:
+            done, threaded = new.thread(evaluation)
+            if done:
+                return threaded, not threaded.same(new)
 
-            for leaf in leaves:
-                leaf.unevaluated = False
+        def rules():
+            rules_names = set()
             if 'System`HoldAllComplete' not in attributes:
-                for index, leaf in enumerate(leaves):
-                    if leaf.has_form('Unevaluated', 1):
-                        leaves[index] = leaf.leaves[0]
-                        leaves[index].unevaluated = True
-
-            def flatten_callback(new_leaves, old):
-                for leaf in new_leaves:
-                    leaf.unevaluated = old.unevaluated
-
-            new = Expression(head, *leaves)
-            if 'System`Flat' in attributes:
-                new = new.flatten(new.head, callback=flatten_callback)
-            if 'System`Orderless' in attributes:
-                new.sort()
+                for leaf in leaves:
+                    name = leaf.get_lookup_name()
+                    if len(name) > 0:  # only lookup rules if this is a symbol
+                        if name not in rules_names:
+                            rules_names.add(name)
+                            for rule in evaluation.definitions.get_upvalues(name):
+                                yield rule
+            lookup_name = new.get_lookup_name()
+            if lookup_name == new.get_head_name():
+                for rule in evaluation.definitions.get_downvalues(lookup_name):
+                    yield rule
+            else:
+                for rule in evaluation.definitions.get_subvalues(lookup_name):
+                    yield rule
 
-            new.is_evaluated = True
-            if 'System`Listable' in attributes:
-                done, threaded = new.thread(evaluation)
-                if done:
-                    if not threaded.same(new):
-                        threaded = threaded.evaluate(evaluation)
-                    return threaded
-
-            def rules():
-                rules_names = set()
-                if 'System`HoldAllComplete' not in attributes:
-                    for leaf in leaves:
-                        name = leaf.get_lookup_name()
-                        if len(name) > 0:  # only lookup rules if this is a symbol
-                            if name not in rules_names:
-                                rules_names.add(name)
-                                for rule in evaluation.definitions.get_upvalues(name):
-                                    yield rule
-                lookup_name = new.get_lookup_name()
-                if lookup_name == new.get_head_name():
-                    for rule in evaluation.definitions.get_downvalues(lookup_name):
-                        yield rule
-                else:
-                    for rule in evaluation.definitions.get_subvalues(lookup_name):
-                        yield rule
-
-            for rule in rules():
-                result = rule.apply(new, evaluation, fully=False)
-                if result is not None:
-                    if not result.same(new):
-                        result = result.evaluate(evaluation)
-                    return result
+        for rule in rules():
+            result = rule.apply(new, evaluation, fully=False,
+                                attributes=attributes)
+            if result is not None:
+                return result, not result.same(new)
 
-            # Expression did not change, re-apply Unevaluated
+        # Expression did not change, re-apply Unevaluated
+        if unevaluated:
             for index, leaf in enumerate(new.leaves):
-                if leaf.unevaluated:
+                if id(leaf) in unevaluated:
                     new.leaves[index] = Expression('Unevaluated', leaf)
 
-            new.unformatted = self.unformatted
-            return new
+        new.unformatted = self.unformatted
+        return new, False
 
-        finally:
-            evaluation.options = old_options
-            evaluation.dec_recursion_depth()
+    def rebuild_evaluated(self, head, attributes, leaves):
+        """
+        Splices Sequence leaves (and, for Flat heads, nested leaves with the
+        same head) into a new expression and strips Unevaluated.
+
+        Returns the new expression and the set of ids of its leaves that
+        were wrapped in Unevaluated.
+        """
+
+        hold_all_complete = 'System`HoldAllComplete' in attributes
+        if leaves is self.leaves:
+            leaves = leaves[:]
+        new = self.restructure(head, leaves)
+        if ('System`SequenceHold' not in attributes and    # noqa
+            not hold_all_complete):
+            new = new.flatten(Symbol('Sequence'))
+        leaves = new.leaves
+
+        unevaluated = set()
+        if not hold_all_complete:
+            for index, leaf in enumerate(leaves):
+                if leaf.has_form('Unevaluated', 1):
+                    leaves[index] = leaf.leaves[0]
+                    unevaluated.add(id(leaves[index]))
+
+        def flatten_callback(new_leaves, old):
+            if id(old) in unevaluated:
+                unevaluated.update(id(leaf) for leaf in new_leaves)
+
+        if 'System`Flat' in attributes:
+            new = new.flatten(new.head, callback=flatten_callback)
+        return new, unevaluated
 
     def evaluate_leaves(self, evaluation):
         leaves = [leaf.evaluate(evaluation) for leaf in self.leaves]
@@ -1078,9 +1297,10 @@ class Expression(BaseExpression):
         " Sort the leaves according to internal ordering. "
 
         if pattern:
-            self.leaves.sort(key=lambda e: e.get_sort_key(pattern_sort=True))
+            self.leaves.sort(key=pattern_sort_key)
         else:
-            self.leaves.sort()
+            self.leaves.sort(key=sort_key)
+        self.clear_sort_keys()
 
     def filter_leaves(self, head_name):
         # TODO: should use sorting
@@ -1104,8 +1324,15 @@ class Expression(BaseExpression):
             new_applied[0] = new_applied[0] or sub_applied
             return new
 
-        def descend(expr):
-            return Expression(expr.head, *[apply_leaf(leaf) for leaf in expr.leaves])
+        def descend(expr, head):
+            # subtrees without any replacement are shared with expr, and expr
+            # itself is returned if nothing changed at all
+            leaves = expr.leaves
+            new_leaves = [apply_leaf(leaf) for leaf in leaves]
+            if head is expr.head and all(
+                    new is old for new, old in zip(new_leaves, leaves)):
+                return expr
+            return expr.restructure(head, new_leaves)
 
         if options is None:  # default ReplaceAll mode; replace breadth first
             result, applied = super(
@@ -1114,9 +1341,9 @@ class Expression(BaseExpression):
                 return result, True
             head, applied = self.head.apply_rules(rules, evaluation, level, options)
             new_applied[0] = applied
-            return descend(Expression(head, *self.leaves)), new_applied[0]
+            return descend(self, head), new_applied[0]
         else:  # Replace mode; replace depth first
-            expr = descend(self)
+            expr = descend(self, self.head)
             expr, applied = super(
                 Expression, expr).apply_rules(rules, evaluation, level, options)
             new_applied[0] = new_applied[0] or applied
@@ -1124,10 +1351,10 @@ class Expression(BaseExpression):
                 # heads in Replace are treated at the level of the arguments, i.e. level + 1
                 head, applied = expr.head.apply_rules(rules, evaluation, level + 1, options)
                 new_applied[0] = new_applied[0] or applied
-                expr = Expression(head, *expr.leaves)
+                if head is not expr.head:
+                    expr = expr.restructure(head, expr.leaves)
             return expr, new_applied[0]
 
-
     def replace_vars(self, vars, options=None,
                      in_scoping=True, in_function=True):
         from mathics.builtin.scoping import get_scoping_vars
@@ -1225,14 +1452,12 @@ class Expression(BaseExpression):
         if dim is None:
             return False, self
         else:
-            leaves = [Expression(self.head, *item) for item in items]
-            return True, Expression(head, *leaves)
+            leaves = [self.restructure(self.head, item) for item in items]
+            return True, self.restructure(head, leaves)
 
     def is_numeric(self):
-        return (self.head.get_name() in system_symbols(
-            'Sqrt', 'Times', 'Plus', 'Subtract', 'Minus', 'Power', 'Abs',
-            'Divide', 'Sin') and
-            all(leaf.is_numeric() for leaf in self.leaves))
+        return (self.head.get_name() in _numeric_functions and
+                all(leaf.is_numeric() for leaf in self.leaves))
         # TODO: complete list of numeric functions, or access NumericFunction
         # attribute
 
@@ -1277,10 +1502,14 @@ class Expression(BaseExpression):
             leaf.user_hash(update)
 
     def __getnewargs__(self):
-        return (self.head, self.leaves)
+        # the leaves are restored with the rest of __dict__; passing them to
+        # __new__ as well would only convert the list to another Expression
+        return (self.head,)
 
 
 class Atom(BaseExpression):
+    # atoms don't change, so their canonical sort key is computed only once
+    _sort_key = None
 
     def is_atom(self):
         return True
@@ -1316,18 +1545,18 @@ class Atom(BaseExpression):
         return self
 
     def copy(self):
-        result = self.do_copy()
-        result.original = self
-        return result
-
-    def set_positions(self, position=None):
-        self.position = position
+        return self.do_copy()
 
     def get_sort_key(self, pattern_sort=False):
         if pattern_sort:
             return [0, 0, 1, 1, 0, 0, 0, 1]
-        else:
-            raise NotImplementedError
+        key = self._sort_key
+        if key is None:
+            key = self._sort_key = self.compute_sort_key()
+        return key
+
+    def compute_sort_key(self):
+        raise NotImplementedError
 
     def get_atoms(self, include_heads=True):
         return [self]
@@ -1395,12 +1624,9 @@ class Symbol(Atom):
     def is_symbol(self):
         return True
 
-    def get_sort_key(self, pattern_sort=False):
-        if pattern_sort:
-            return super(Symbol, self).get_sort_key(True)
-        else:
-            return [1 if self.is_numeric() else 2,
-                    2, Monomial({self.name: 1}), 0, self.name, 1]
+    def compute_sort_key(self):
+        return [1 if self.is_numeric() else 2,
+                2, Monomial({self.name: 1}), 0, self.name, 1]
 
     def same(self, other):
         return isinstance(other, Symbol) and self.name == other.name
@@ -1420,17 +1646,26 @@ class Symbol(Atom):
         rules = evaluation.definitions.get_ownvalues(self.name)
         for rule in rules:
             result = rule.apply(self, evaluation, fully=True)
-            if result is not None and result != self:
+            if result is not None and not result.same(self):
                 return result.evaluate(evaluation)
         return self
 
+    def evaluate_steps(self, evaluation, result):
+        " Generator version of evaluate(), see Expression.evaluate_steps. "
+
+        rules = evaluation.definitions.get_ownvalues(self.name)
+        for rule in rules:
+            value = rule.apply(self, evaluation, fully=True)
+            if value is not None and not value.same(self):
+                result[0] = yield value
+                return
+        result[0] = self
+
     def is_true(self):
         return self.name == 'System`True'
 
     def is_numeric(self):
-        return self.name in system_symbols(
-            'Pi', 'E', 'EulerGamma', 'GoldenRatio',
-            'MachinePrecision', 'Catalan')
+        return self.name in _numeric_constants
 
     def __hash__(self):
         return hash(('Symbol', self.name))  # to distinguish from String
@@ -1547,11 +1782,8 @@ class Integer(Number):
         evaluation.check_stopped()
         return self
 
-    def get_sort_key(self, pattern_sort=False):
-        if pattern_sort:
-            return super(Integer, self).get_sort_key(True)
-        else:
-            return [0, 0, self.value, 0, 1]
+    def compute_sort_key(self):
+        return [0, 0, self.value, 0, 1]
 
     def do_copy(self):
         return Integer(self.value)
@@ -1630,12 +1862,9 @@ class Rational(Number):
         evaluation.check_stopped()
         return self
 
-    def get_sort_key(self, pattern_sort=False):
-        if pattern_sort:
-            return super(Rational, self).get_sort_key(True)
-        else:
-            # HACK: otherwise "Bus error" when comparing 1==1.
-            return [0, 0, sympy.Float(self.value), 0, 1]
+    def compute_sort_key(self):
+        # HACK: otherwise "Bus error" when comparing 1==1.
+        return [0, 0, sympy.Float(self.value), 0, 1]
 
     def do_copy(self):
         return Rational(self.value)
@@ -1701,9 +1930,7 @@ class Real(Number):
         evaluation.check_stopped()
         return self
 
-    def get_sort_key(self, pattern_sort=False):
-        if pattern_sort:
-            return super(Real, self).get_sort_key(True)
+    def compute_sort_key(self):
         return [0, 0, self.value, 0, 1]
 
     def __eq__(self, other):
@@ -1760,6 +1987,18 @@ class MachineReal(Real):
     def round(self, d=None):
         return self
 
+    def __eq__(self, other):
+        if isinstance(other, MachineReal):
+            # what Real.__eq__ computes with mpmath at machine precision
+            diff = abs(self.value - other.value)
+            if diff == 0:
+                return True
+            return (diff / max(abs(self.value), abs(other.value)) <=
+                    0.5 ** (machine_precision - 7))
+        return Real.__eq__(self, other)
+
+    __hash__ = Real.__hash__
+
     def same(self, other):
         if isinstance(other, MachineReal):
             return self.value == other.value
@@ -1915,12 +2154,9 @@ class Complex(Number):
         return 'Complex[%s, %s]' % (self.real.default_format(evaluation, form),
                                     self.imag.default_format(evaluation, form))
 
-    def get_sort_key(self, pattern_sort=False):
-        if pattern_sort:
-            return super(Complex, self).get_sort_key(True)
-        else:
-            return [0, 0, self.real.get_sort_key()[2],
-                    self.imag.get_sort_key()[2], 1]
+    def compute_sort_key(self):
+        return [0, 0, self.real.get_sort_key()[2],
+                self.imag.get_sort_key()[2], 1]
 
     def same(self, other):
         return (isinstance(other, Complex) and self.real == other.real and
@@ -2145,11 +2381,8 @@ class String(Atom):
         value = self.value.replace('\\', '\\\\').replace('"', '\\"')
         return '"%s"' % value
 
-    def get_sort_key(self, pattern_sort=False):
-        if pattern_sort:
-            return super(String, self).get_sort_key(True)
-        else:
-            return [0, 1, self.value, 0, 1]
+    def compute_sort_key(self):
+        return [0, 1, self.value, 0, 1]
 
     def same(self, other):
         return isinstance(other, String) and self.value == other.value
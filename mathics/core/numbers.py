@@ -5,11 +5,13 @@ from __future__ import unicode_literals
 from __future__ import absolute_import
 
 import six
-import sympy
-import mpmath
 from math import log, ceil
 from six.moves import range
 import string
+from mathics.core.util import LazyModule
+
+sympy = LazyModule('sympy')
+mpmath = LazyModule('mpmath')
 
 
 C = log(10, 2)  # ~ 3.3219280948873626
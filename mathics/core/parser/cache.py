@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+A cache of the syntax trees parsed from files, so that Get doesn't have to
+tokenise and parse a package again as long as it is unchanged.
+
+The trees are stored as they come out of the parser, before their symbols
+are looked up in the Definitions, so that they can be loaded in any
+context. They are written with marshal as nested lists and tuples, which
+load much faster than pickled Node objects, and made into Expressions
+straight from there.
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import hashlib
+import io
+import marshal
+import os
+import sys
+import time
+
+import six
+
+import mathics.core.expression as ma
+from mathics.core.parser.ast import Symbol, Number, String, Filename
+from mathics.core.parser.convert import Converter
+
+_atoms = {Number: 'n', String: 's', Filename: 'f'}
+_atom_classes = dict((tag, cls) for cls, tag in _atoms.items())
+
+
+def encode(node):
+    """
+    Turns a syntax tree into nested lists (for Nodes), strings (for
+    symbols as they were written) and tuples (for other atoms).
+    """
+
+    if isinstance(node, Symbol):
+        if node.context is None:
+            return node.value
+        return ('c', node.context, node.value)
+    tag = _atoms.get(node.__class__)
+    if tag is not None:
+        return (tag, node.value)
+    return [encode(node.head)] + [encode(child) for child in node.children]
+
+
+class EncodedConverter(Converter):
+    "Makes Expressions straight from encoded syntax trees, like convert."
+
+    def do_convert(self, item):
+        if isinstance(item, six.text_type):
+            return ma.Symbol(self.lookup_name(item))
+        elif isinstance(item, list):
+            head = self.do_convert(item[0])
+            return ma.Expression(
+                head, *[self.do_convert(child) for child in item[1:]])
+        elif item[0] == 'c':
+            return ma.Symbol(item[1] + '`' + item[2])
+        cls = _atom_classes[item[0]]
+        return getattr(self, 'convert_' + cls.__name__)(cls(item[1]))
+
+
+convert_encoded = EncodedConverter().convert
+
+
+def get_parser_version():
+    "Changes whenever the trees the parser makes or their encoding may."
+
+    from mathics import version_info
+
+    version = hashlib.sha1()
+    version.update(version_info['mathics'].encode('utf8'))
+    version.update(sys.version.encode('utf8'))
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.py'):
+            with open(os.path.join(directory, name), 'rb') as source:
+                version.update(source.read())
+    return version.hexdigest()
+
+
+class ParseCache(object):
+    """
+    Stores the syntax trees of each file in its own file in directory,
+    together with the path, modification time and size of the file when it
+    was read.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.version = None
+
+    def get_key(self, path):
+        """
+        Returns the key under which the trees of the file at path are
+        stored, or None if there is no such file. Call it before reading
+        the file, so that changes made while it is read are noticed.
+        """
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if self.version is None:
+            self.version = get_parser_version()
+        return (self.version, os.path.realpath(path), stat.st_mtime,
+                stat.st_size)
+
+    def get_filename(self, key):
+        name = hashlib.sha1(key[1].encode('utf8')).hexdigest()
+        return os.path.join(self.directory, name + '.marshal')
+
+    def load(self, key):
+        "Returns the encoded syntax trees stored under key, or None."
+
+        try:
+            with open(self.get_filename(key), 'rb') as cache_file:
+                data = cache_file.read()
+        except (IOError, OSError):
+            return None
+        try:
+            stored_key, trees = marshal.loads(data)
+        except Exception:
+            # a file that can't be read is simply made again
+            return None
+        if tuple(stored_key) != key:
+            return None
+        return trees
+
+    def save(self, key, nodes):
+        if time.time() - key[2] < 2:
+            # another change within the resolution of the modification time
+            # would go unnoticed
+            return
+
+        # written to a temporary file first, so that other processes never
+        # see half of it
+        filename = self.get_filename(key)
+        temp_filename = '%s.%d' % (filename, os.getpid())
+        try:
+            data = marshal.dumps((key, [encode(node) for node in nodes]))
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory)
+            with io.open(temp_filename, 'wb') as cache_file:
+                cache_file.write(data)
+            getattr(os, 'replace', os.rename)(temp_filename, filename)
+        except Exception:
+            # too deeply nested to marshal, or the directory isn't writable:
+            # the file is just parsed again next time
+            if os.path.exists(temp_filename):
+                os.remove(temp_filename)
@@ -6,22 +6,28 @@ from __future__ import unicode_literals
 
 import re
 from math import log10
-import sympy
 
 import mathics.core.expression as ma
 from mathics.core.parser.ast import Symbol, String, Number, Filename
 from mathics.core.numbers import machine_precision, reconstruct_digits
 from mathics.core.numbers import prec as _prec
+from mathics.core.util import LazyModule
+
+sympy = LazyModule('sympy')
 
 
 class Converter(object):
     def __init__(self):
         self.definitions = None
+        self.names = None
 
     def convert(self, node, definitions):
         self.definitions = definitions
+        # the names looked up so far, as they can't change during one call
+        self.names = {}
         result = self.do_convert(node)
         self.definitions = None
+        self.names = None
         return result
 
     def do_convert(self, node):
@@ -49,8 +55,14 @@ class Converter(object):
     def convert_Symbol(self, node):
         if node.context is not None:
             return ma.Symbol(node.context + '`' + node.value)
-        value = self.definitions.lookup_name(node.value)
-        return ma.Symbol(value)
+        return ma.Symbol(self.lookup_name(node.value))
+
+    def lookup_name(self, name):
+        value = self.names.get(name)
+        if value is None:
+            value = self.definitions.lookup_name(name)
+            self.names[name] = value
+        return value
 
     def convert_String(self, node):
         value = self.string_escape(node.value)
@@ -28,7 +28,8 @@ class Parser(object):
         # no implicit times on these tokens
         self.halt_tags = set([
             'END', 'RawRightParenthesis', 'RawComma', 'RawRightBrace',
-            'RawRightBracket', 'RawColon', 'DifferentialD'])
+            'RawRightBracket', 'RawRightAssociation', 'RawColon',
+            'DifferentialD'])
 
     def parse(self, feeder):
         self.feeder = feeder
@@ -162,7 +163,8 @@ class Parser(object):
                 self.tokeniser.feeder.message('Syntax', 'com')
                 result.append(Symbol('Null'))
                 self.consume()
-            elif tag in ('RawRightBrace', 'RawRightBracket'):
+            elif tag in ('RawRightBrace', 'RawRightBracket',
+                         'RawRightAssociation'):
                 if result:
                     self.tokeniser.feeder.message('Syntax', 'com')
                     result.append(Symbol('Null'))
@@ -174,7 +176,8 @@ class Parser(object):
                 if tag == 'RawComma':
                     self.consume()
                     continue
-                elif tag in ('RawRightBrace', 'RawRightBracket'):
+                elif tag in ('RawRightBrace', 'RawRightBracket',
+                             'RawRightAssociation'):
                     break
         return result
 
@@ -265,6 +268,14 @@ class Parser(object):
         self.bracket_depth -= 1
         return Node('List', *seq)
 
+    def p_RawLeftAssociation(self, token):
+        self.consume()
+        self.bracket_depth += 1
+        seq = self.parse_seq()
+        self.expect('RawRightAssociation')
+        self.bracket_depth -= 1
+        return Node('Association', *seq)
+
     def p_LeftRowBox(self, token):
         self.consume()
         children = []
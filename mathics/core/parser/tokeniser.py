@@ -48,6 +48,8 @@ tokens = [
     ('RawRightBrace', r' \} '),
     ('RawLeftParenthesis', r' \( '),
     ('RawRightParenthesis', r' \) '),
+    ('RawLeftAssociation', r' \<\| '),
+    ('RawRightAssociation', r' \|\> '),
 
     ('RawComma', r' \, '),
 
@@ -227,7 +229,7 @@ literal_tokens = {
           'Postfix', 'TagSet', 'Condition', 'Divide'],
     ':': ['MessageName', 'RuleDelayed', 'SetDelayed', 'RawColon'],
     ';': ['Span', 'Semicolon'],
-    '<': ['Get', 'StringJoin', 'LessEqual', 'Less'],
+    '<': ['RawLeftAssociation', 'Get', 'StringJoin', 'LessEqual', 'Less'],
     '=': ['SameQ', 'UnsameQ', 'Equal', 'Unset', 'Set'],
     '>': ['PutAppend', 'Put', 'GreaterEqual', 'Greater'],
     '?': ['PatternTest'],
@@ -240,7 +242,7 @@ literal_tokens = {
     '^': ['UpSetDelayed', 'UpSet', 'Power'],
     '_': ['Pattern'],
     '`': ['Pattern', 'Symbol'],
-    '|': ['Or', 'Alternatives'],
+    '|': ['RawRightAssociation', 'Or', 'Alternatives'],
     '{': ['RawLeftBrace'],
     '}': ['RawRightBrace'],
     '~': ['StringExpression', 'Infix']
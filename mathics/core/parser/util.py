@@ -6,14 +6,18 @@ from __future__ import unicode_literals
 
 import six
 
+from mathics import settings
 from mathics.core.parser.parser import Parser
 from mathics.core.parser.convert import convert
+from mathics.core.parser.cache import ParseCache, convert_encoded
 from mathics.core.parser.feed import SingleLineFeeder
 from mathics.core.expression import ensure_context
 
 
 parser = Parser()
 
+parse_cache = ParseCache(settings.DATA_DIR + 'parsed')
+
 
 def parse(definitions, feeder):
     '''
@@ -29,6 +33,39 @@ def parse(definitions, feeder):
         return None
 
 
+def parse_file(definitions, feeder):
+    '''
+    Parse all the input of a FileLineFeeder, yielding one expression (or None
+    for blank lines and comments) at a time. Each is looked up in the
+    Definitions only when it is asked for, so that the contexts set by
+    evaluating those before it are taken into account.
+
+    Unless settings.PARSE_CACHE is off, the syntax trees are stored in
+    parse_cache once the whole file has been parsed without messages, and
+    taken from there instead of parsing the file again while it is unchanged.
+    '''
+    key = parse_cache.get_key(feeder.filename) if settings.PARSE_CACHE else None
+    if key is not None:
+        trees = parse_cache.load(key)
+        if trees is not None:
+            for tree in trees:
+                yield convert_encoded(tree, definitions)
+            return
+
+    nodes = []
+    while not feeder.empty():
+        node = parser.parse(feeder)
+        if feeder.messages:
+            key = None
+        if node is None:
+            yield None
+        else:
+            nodes.append(node)
+            yield convert(node, definitions)
+    if key is not None:
+        parse_cache.save(key, nodes)
+
+
 class SystemDefinitions(object):
     """
     Dummy Definitions object that puts every unqualified symbol in
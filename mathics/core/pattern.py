@@ -6,9 +6,9 @@ from __future__ import unicode_literals
 from __future__ import absolute_import
 
 from mathics.core.expression import (Expression, system_symbols,
-                                     ensure_context)
+                                     ensure_context, pattern_sort_key)
 from mathics.core.util import subsets, subranges, permutations
-from six.moves import range
+from six.moves import range, zip
 
 # from mathics.core.pattern_nocython import (
 #    StopGenerator #, Pattern #, ExpressionPattern)
@@ -42,6 +42,43 @@ class StopGenerator_Pattern(StopGenerator):
     pass
 
 
+# attributes of pattern heads that make matching ambiguous, so that
+# compiled matchers can't be used
+_ambiguous_attributes = frozenset(system_symbols(
+    'Flat', 'Orderless', 'OneIdentity'))
+
+# heads of patterns that may take several leaves of a Flat expression,
+# wrapped in its head
+_flattened_heads = frozenset(system_symbols(
+    'Pattern', 'PatternTest', 'Condition', 'Optional', 'Blank',
+    'BlankSequence', 'BlankNullSequence', 'Alternatives', 'OptionsPattern',
+    'Repeated', 'RepeatedNull'))
+
+
+def wrap_leaves(head, leaves):
+    """
+    Returns Expression(head, *leaves) for leaves that are expressions
+    already, without passing each of them through from_python().
+    """
+
+    expr = Expression(head)
+    expr.leaves = list(leaves)
+    return expr
+
+
+def get_leaf_count_range(leaf, attributes, vars):
+    """
+    Returns the minimum and maximum (None: unbounded) number of leaves of
+    an expression with the given attributes that the pattern leaf can take.
+    """
+
+    match_count = leaf.get_match_count(vars)
+    if ('System`Flat' in attributes and
+            leaf.get_head_name() in _flattened_heads):
+        return match_count[0], None
+    return match_count
+
+
 class Pattern(object):
     create = staticmethod(Pattern_create)
 
@@ -119,6 +156,32 @@ class Pattern(object):
             self, leaves, expression, attributes, evaluation, vars={}):
         return len(self.get_match_candidates(leaves, expression, attributes, evaluation, vars))
 
+    def get_matcher(self, heads):
+        """
+        Compiles this pattern into a function matcher(expression, vars,
+        evaluation) that matches exactly one expression without any
+        backtracking. The matcher binds pattern variables in the dict vars
+        (in place) and returns whether expression matches.
+
+        The names of heads whose attributes decide whether the matcher may
+        be used are added to the set heads (see ExpressionPattern.match).
+        Patterns that can match in several ways (sequences, Optional, ...)
+        return None and are matched by the general matcher.
+        """
+        return None
+
+    def get_signature(self):
+        """
+        Returns a tuple (head_name, min_count, max_count, literals)
+        describing expressions this pattern can match: their head is the
+        symbol head_name, they have between min_count and max_count leaves
+        (max_count None means no limit) and literals is a tuple of
+        (index, atom) pairs for leaves that must be the given atoms. Flat,
+        Orderless and OneIdentity can lift these restrictions, see
+        BaseRule.may_match. Returns None if nothing simple is known.
+        """
+        return None
+
 
 class AtomPattern(Pattern):
     def __init__(self, expr):
@@ -140,6 +203,13 @@ class AtomPattern(Pattern):
     def get_match_count(self, vars={}):
         return (1, 1)
 
+    def get_matcher(self, heads):
+        atom = self.atom
+
+        def match_atom(expression, vars, evaluation):
+            return expression.same(atom)
+        return match_atom
+
 
 # class StopGenerator_ExpressionPattern_match(StopGenerator):
 #    pass
@@ -148,10 +218,29 @@ class ExpressionPattern(Pattern):
     # get_pre_choices = pattern_nocython.get_pre_choices
     # match = pattern_nocython.match
 
+    # (matcher, heads) from get_matcher(), compiled on first use
+    compiled = None
+
+    # get_rest_constraints() results for non-Flat and Flat heads
+    rest_constraints = None
+
     def match(self, yield_func, expression, vars, evaluation, head=None,
               leaf_index=None, leaf_count=None, fully=True, wrap_oneid=True):
         evaluation.check_stopped()
 
+        if self.compiled is None:
+            heads = set()
+            self.compiled = (self.get_matcher(heads), heads)
+        matcher, heads = self.compiled
+        if matcher is not None:
+            definitions = evaluation.definitions
+            if all(_ambiguous_attributes.isdisjoint(
+                    definitions.get_attributes(name)) for name in heads):
+                new_vars = vars.copy()
+                if matcher(expression, new_vars, evaluation):
+                    yield_func(new_vars, None)
+                return
+
         attributes = self.head.get_attributes(evaluation.definitions)
         if 'System`Flat' not in attributes:
             fully = True
@@ -255,9 +344,12 @@ class ExpressionPattern(Pattern):
             # prev_leaf = None
 
             # count duplicate leaves
-            expr_groups = {}
+            expr_groups = []
             for leaf in expression.leaves:
-                expr_groups[leaf] = expr_groups.get(leaf, 0) + 1
+                if expr_groups and expr_groups[-1][0].same(leaf):
+                    expr_groups[-1][1] += 1
+                else:
+                    expr_groups.append([leaf, 1])
 
             def per_name(yield_name, groups, vars):
                 """
@@ -288,27 +380,33 @@ class ExpressionPattern(Pattern):
                         """
 
                         if expr_groups:
-                            expr, count = expr_groups.popitem()
-                            max_per_pattern = count / len(patterns)
+                            expr, count = expr_groups[0]
+                            max_per_pattern = count // len(patterns)
+                            if match_count[1] is not None:
+                                max_per_pattern = min(
+                                    max_per_pattern, match_count[1] - sum)
                             for per_pattern in range(max_per_pattern, -1, -1):
-                                for next in per_expr(   # nopep8
-                                    expr_groups, sum + per_pattern):
+                                def yield_next(next):
                                     yield_expr([expr] * per_pattern + next)
+                                per_expr(yield_next, expr_groups[1:],
+                                         sum + per_pattern)
                         else:
                             if sum >= match_count[0]:
                                 yield_expr([])
 
                     # for sequence in per_expr(expr_groups.items()):
                     def yield_expr(sequence):
-                        wrappings = self.get_wrappings(
-                            sequence, match_count[1], expression, attributes)
-                        for wrapping in wrappings:
+                        # for wrapping in self.get_wrappings(...):
+                        def yield_wrapping(wrapping):
                             # for next in per_name(groups[1:], vars):
                             def yield_next(next):
                                 setting = next.copy()
                                 setting[name] = wrapping
                                 yield_name(setting)
                             per_name(yield_next, groups[1:], vars)
+                        self.get_wrappings(
+                            yield_wrapping, sequence, match_count[1],
+                            expression, attributes)
                     per_expr(yield_expr, expr_groups)
                 else:  # no groups left
                     yield_name(vars)
@@ -325,6 +423,131 @@ class ExpressionPattern(Pattern):
         self.leaves = [Pattern.create(leaf) for leaf in expr.leaves]
         self.expr = expr
 
+    def __getstate__(self):
+        # compiled matchers are closures, which can't be pickled
+        state = self.__dict__.copy()
+        state.pop('compiled', None)
+        return state
+
+    def get_rest_constraints(self, attributes):
+        """
+        Returns a list whose entry k describes the last k leaves of this
+        pattern as (min_count, max_count, anchor): the minimum and maximum
+        (None: unbounded) number of leaves of the matched expression they
+        take together, and either None or (offset, atom) if the leaf at that
+        offset into the ones they take must be atom, because a literal
+        pattern leaf only follows leaves of fixed length.
+        """
+
+        flat = 'System`Flat' in attributes
+        if self.rest_constraints is None:
+            self.rest_constraints = {}
+        constraints = self.rest_constraints.get(flat)
+        if constraints is None:
+            constraints = [(0, 0, None)]
+            for leaf in reversed(self.leaves):
+                low, high = get_leaf_count_range(leaf, attributes, {})
+                rest_low, rest_high, anchor = constraints[-1]
+                if isinstance(leaf, AtomPattern):
+                    anchor = (0, leaf.atom)
+                elif anchor is not None and low == high:
+                    anchor = (anchor[0] + low, anchor[1])
+                else:
+                    anchor = None
+                if high is not None and rest_high is not None:
+                    high += rest_high
+                else:
+                    high = None
+                constraints.append((rest_low + low, high, anchor))
+            self.rest_constraints[flat] = constraints
+        return constraints
+
+    def get_signature(self):
+        head_name = self.head.get_name()
+        if not isinstance(self.head, AtomPattern) or not head_name:
+            return None
+        min_count = max_count = 0
+        literals = []
+        for index, leaf in enumerate(self.leaves):
+            if max_count == min_count == index and isinstance(
+                    leaf, AtomPattern):
+                # all leaves before this one match exactly one leaf
+                literals.append((index, leaf.atom))
+            leaf_min, leaf_max = leaf.get_match_count()
+            min_count += leaf_min
+            if max_count is not None:
+                max_count = None if leaf_max is None else max_count + leaf_max
+        return head_name, min_count, max_count, tuple(literals)
+
+    def get_matcher(self, heads):
+        head_name = self.head.get_name()
+        if not isinstance(self.head, AtomPattern) or not head_name:
+            return None
+        # without Flat or Orderless, leaves are matched from left to right,
+        # so if at most one of them can match a sequence of leaves, there is
+        # only one way to match the expression
+        leaf_matchers = []
+        sequence = None
+        for index, leaf in enumerate(self.leaves):
+            leaf_matcher = leaf.get_matcher(heads)
+            if leaf_matcher is None:
+                return None
+            min_count, max_count = leaf.get_match_count()
+            if (min_count, max_count) != (1, 1):
+                if sequence is not None or max_count is not None:
+                    return None
+                sequence = index
+                sequence_min = min_count
+            leaf_matchers.append(leaf_matcher)
+        heads.add(head_name)
+        head = self.head.atom
+
+        if sequence is None:
+            leaf_count = len(leaf_matchers)
+
+            def match_expression(expression, vars, evaluation):
+                if expression.is_atom() or len(expression.leaves) != leaf_count:
+                    return False
+                if not expression.head.same(head):
+                    return False
+                for leaf_matcher, leaf in zip(leaf_matchers, expression.leaves):
+                    if not leaf_matcher(leaf, vars, evaluation):
+                        return False
+                return True
+            return match_expression
+
+        before = leaf_matchers[:sequence]
+        sequence_matcher = leaf_matchers[sequence]
+        after = leaf_matchers[sequence + 1:]
+        fixed_count = len(before) + len(after)
+
+        def match_sequence_expression(expression, vars, evaluation):
+            if expression.is_atom():
+                return False
+            leaves = expression.leaves
+            end = len(leaves) - len(after)
+            if len(leaves) - fixed_count < sequence_min:
+                return False
+            if not expression.head.same(head):
+                return False
+            for leaf_matcher, leaf in zip(before, leaves):
+                if not leaf_matcher(leaf, vars, evaluation):
+                    return False
+            # wrap the items like get_wrappings does
+            items = leaves[len(before):end]
+            if len(items) == 1:
+                item = items[0]
+            else:
+                item = Expression('Sequence', *items)
+                item.pattern_sequence = True
+            if not sequence_matcher(item, vars, evaluation):
+                return False
+            for leaf_matcher, leaf in zip(after, leaves[end:]):
+                if not leaf_matcher(leaf, vars, evaluation):
+                    return False
+            return True
+        return match_sequence_expression
+
     def filter_leaves(self, head_name):
         head_name = ensure_context(head_name)
         return [leaf for leaf in self.leaves
@@ -344,15 +567,15 @@ class ExpressionPattern(Pattern):
             if max_count is None or len(items) <= max_count:
                 if 'System`Orderless' in attributes:
                     for perm in permutations(items):
-                        sequence = Expression('Sequence', *perm)
+                        sequence = wrap_leaves('System`Sequence', perm)
                         sequence.pattern_sequence = True
                         yield_func(sequence)
                 else:
-                    sequence = Expression('Sequence', *items)
+                    sequence = wrap_leaves('System`Sequence', items)
                     sequence.pattern_sequence = True
                     yield_func(sequence)
             if 'System`Flat' in attributes and include_flattened:
-                yield_func(Expression(expression.get_head(), *items))
+                yield_func(wrap_leaves(expression.get_head(), items))
 
     def match_leaf(self, yield_func, leaf, rest_leaves, rest_expression, vars,
                    expression, attributes, evaluation, leaf_index=1,
@@ -365,30 +588,40 @@ class ExpressionPattern(Pattern):
         evaluation.check_stopped()
 
         match_count = leaf.get_match_count(vars)
-        leaf_candidates = leaf.get_match_candidates(
-            rest_expression[1],  # leaf.candidates,
-            expression, attributes, evaluation, vars)
+        candidates = rest_expression[1]
+        orderless = 'System`Orderless' in attributes
 
-        if len(leaf_candidates) < match_count[0]:
-            return
+        if orderless:
+            leaf_candidates = leaf.get_match_candidates(
+                candidates, expression, attributes, evaluation, vars)
 
-        candidates = rest_expression[1]
+            if len(leaf_candidates) < match_count[0]:
+                return
 
-        leaf_candidates = set(leaf_candidates)  # for fast lookup
+            leaf_candidates = set(leaf_candidates)  # for fast lookup
 
         # "Artificially" only use more leaves than specified for some kind
         # of pattern.
-        # TODO: This could be further optimized!
-        try_flattened = (('System`Flat' in attributes) and (leaf.get_head_name() in (
-            system_symbols(
-                'Pattern', 'PatternTest', 'Condition', 'Optional', 'Blank',
-                'BlankSequence', 'BlankNullSequence', 'Alternatives',
-                'OptionsPattern', 'Repeated', 'RepeatedNull'))))
-
-        if try_flattened:
-            set_lengths = (match_count[0], None)
-        else:
-            set_lengths = match_count
+        try_flattened = (('System`Flat' in attributes) and
+                         leaf.get_head_name() in _flattened_heads)
+        min_length, max_length = get_leaf_count_range(leaf, attributes, vars)
+
+        # Leave enough candidates for the remaining pattern leaves, and if
+        # the match must be complete, take at least as many as they can't.
+        # (subranges derives its start positions from the maximum length, so
+        # that is not narrowed when the start is flexible.)
+        flexible_start = first and not fully
+        rest_min, rest_max, anchor = self.get_rest_constraints(
+            attributes)[len(rest_leaves)]
+        if (not flexible_start or orderless) and (
+                max_length is None or
+                max_length > len(candidates) - rest_min):
+            max_length = len(candidates) - rest_min
+        if fully and rest_max is not None:
+            min_length = max(min_length, len(candidates) - rest_max)
+        if max_length is not None and min_length > max_length:
+            return
+        set_lengths = (min_length, max_length)
 
         # try_flattened is used later to decide whether wrapping of leaves
         # into one operand may occur.
@@ -398,7 +631,7 @@ class ExpressionPattern(Pattern):
 
         less_first = len(rest_leaves) > 0
 
-        if 'System`Orderless' in attributes:
+        if orderless:
             sets = None
             if leaf.get_head_name() == 'System`Pattern':
                 varname = leaf.leaves[0].get_name()
@@ -424,9 +657,14 @@ class ExpressionPattern(Pattern):
                 sets = subsets(candidates, included=leaf_candidates,
                                less_first=less_first, *set_lengths)
         else:
-            sets = subranges(candidates, flexible_start=first and not fully,
-                             included=leaf_candidates, less_first=less_first,
-                             *set_lengths)
+            sets = subranges(candidates, flexible_start=flexible_start,
+                             less_first=less_first, *set_lengths)
+            if anchor is not None:
+                # skip splits that don't put the literal where it belongs
+                offset, atom = anchor
+                sets = ((items, items_rest) for items, items_rest in sets
+                        if len(items_rest[1]) > offset and
+                        items_rest[1][offset].same(atom))
 
         if rest_leaves:
             next_leaf = rest_leaves[0]
@@ -504,4 +742,5 @@ class ExpressionPattern(Pattern):
         return count
 
     def sort(self):
-        self.leaves.sort(key=lambda e: e.get_sort_key(pattern_sort=True))
+        self.leaves.sort(key=pattern_sort_key)
+        self.rest_constraints = None
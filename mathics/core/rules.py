@@ -5,26 +5,102 @@ from __future__ import unicode_literals
 from __future__ import absolute_import
 
 from mathics.core.expression import Expression, Symbol, strip_context, KeyComparable
-from mathics.core.pattern import Pattern, StopGenerator
+from mathics.core.pattern import Pattern, AtomPattern, StopGenerator
 
 
 class StopGenerator_BaseRule(StopGenerator):
     pass
 
 
+# counts of calls of BaseRule.apply ('attempted'), of those rejected by
+# BaseRule.may_match without running the pattern matcher ('prefiltered')
+# and of those that found a match ('matched')
+rule_statistics = {'attempted': 0, 'prefiltered': 0, 'matched': 0}
+
+
+def flatten_sequences(expr, sequence):
+    """
+    Splices the Sequence[...] objects created by the pattern matcher into
+    their parents at every level of expr. Subtrees that contain none are
+    shared with expr, which is returned itself if nothing changed.
+    """
+
+    if expr.is_atom():
+        return expr
+    new_expr = expr.flatten(sequence, pattern_only=True)
+    leaves = new_expr.leaves
+    new_leaves = None
+    for index, leaf in enumerate(leaves):
+        new_leaf = flatten_sequences(leaf, sequence)
+        if new_leaf is not leaf:
+            if new_leaves is None:
+                new_leaves = leaves[:]
+            new_leaves[index] = new_leaf
+    if new_leaves is not None:
+        new_expr = new_expr.restructure(new_expr.head, new_leaves)
+    if new_expr is not expr:
+        new_expr.options = expr.options
+    return new_expr
+
+
 class BaseRule(KeyComparable):
+    # see Pattern.get_signature; rules unpickled from an older version
+    # don't have their own
+    signature = None
+
     def __init__(self, pattern, system=False):
         self.pattern = Pattern.create(pattern)
         self.system = system
+        self.signature = self.pattern.get_signature()
+
+    def may_match(self, expression, evaluation, attributes=None):
+        """
+        Quickly checks whether the pattern of this rule can possibly match
+        expression, looking only at its head, leaf count and literal leaves.
+
+        attributes are those of the head of expression, if already known.
+        """
+
+        head_name, min_count, max_count, literals = self.signature
+        if expression.is_atom() or expression.get_head_name() != head_name:
+            # only matches by wrapping the expression in the head of the
+            # pattern, which then has a single leaf
+            if min_count > 1 or expression.get_head_name() == head_name:
+                return False
+            return 'System`OneIdentity' in evaluation.definitions.get_attributes(
+                head_name)
+        leaves = expression.leaves
+        if len(leaves) < min_count:
+            return False
+        if max_count is not None and len(leaves) > max_count:
+            # Flat patterns can group several leaves into one
+            if attributes is None:
+                attributes = evaluation.definitions.get_attributes(head_name)
+            if 'System`Flat' not in attributes:
+                return False
+        for index, atom in literals:
+            if index >= len(leaves) or not leaves[index].same(atom):
+                if attributes is None:
+                    attributes = evaluation.definitions.get_attributes(
+                        head_name)
+                return ('System`Flat' in attributes or
+                        'System`Orderless' in attributes)
+        return True
 
     def apply(self, expression, evaluation, fully=True, return_list=False,
-              max_list=None):
+              max_list=None, attributes=None):
         result_list = []
         # count = 0
 
         if return_list and max_list is not None and max_list <= 0:
             return []
 
+        rule_statistics['attempted'] += 1
+        if (self.signature is not None and
+                not self.may_match(expression, evaluation, attributes)):
+            rule_statistics['prefiltered'] += 1
+            return [] if return_list else None
+
         def yield_match(vars, rest):
             if rest is None:
                 rest = ([], [])
@@ -45,18 +121,10 @@ class BaseRule(KeyComparable):
             else:
                 result = new_expression
 
-            # Flatten out sequences (important for Rule itself!)
-
-            def flatten(expr):
-                new_expr = expr.flatten(Symbol('Sequence'), pattern_only=True)
-                if not new_expr.is_atom():
-                    for index, leaf in enumerate(new_expr.leaves):
-                        new_expr.leaves[index] = flatten(leaf)
-                if hasattr(expr, 'options'):
-                    new_expr.options = expr.options
-                return new_expr
-
-            result = flatten(result)
+            # Flatten out sequences (important for Rule itself!). They can
+            # only have come in through the values of the pattern variables.
+            if any(value.pattern_sequence for value in vars.values()):
+                result = flatten_sequences(result, Symbol('System`Sequence'))
             if return_list:
                 result_list.append(result)
                 # count += 1
@@ -72,9 +140,12 @@ class BaseRule(KeyComparable):
             self.pattern.match(
                 yield_match, expression, {}, evaluation, fully=fully)
         except StopGenerator_BaseRule as exc:
+            rule_statistics['matched'] += 1
             return exc.value
 
         if return_list:
+            if result_list:
+                rule_statistics['matched'] += 1
             return result_list
         else:
             return None
@@ -147,3 +218,74 @@ class BuiltinRule(BaseRule):
         cls, name = dict['function_']
 
         self.function = getattr(builtins[cls], name)
+
+
+class RuleIndex(object):
+    """
+    An ordered list of rules, indexed to quickly find the ones that can
+    apply to an expression: rules with an atom as their pattern by that atom,
+    the others by the head of their pattern, if it has a fixed one.
+
+    Wherever a list of rules is expected, a RuleIndex can be used as well.
+    """
+
+    # with fewer rules, trying them all is faster than looking them up
+    min_indexed = 8
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.by_atom = {}
+        self.by_head = {}
+        # positions of rules by head that can match expressions with other
+        # heads if the head has the attribute OneIdentity
+        self.by_wrapped_head = {}
+        self.general = []
+        for position, rule in enumerate(rules):
+            signature = rule.signature
+            if isinstance(rule.pattern, AtomPattern):
+                self.by_atom.setdefault(rule.pattern.atom, []).append(position)
+            elif signature is not None:
+                head_name, min_count = signature[:2]
+                self.by_head.setdefault(head_name, []).append(position)
+                if min_count <= 1:
+                    self.by_wrapped_head.setdefault(
+                        head_name, []).append(position)
+            else:
+                self.general.append(position)
+
+    def __iter__(self):
+        return iter(self.rules)
+
+    def __len__(self):
+        return len(self.rules)
+
+    def get_candidates(self, expression, evaluation):
+        """
+        Returns the rules that may match expression, in their original order.
+        """
+
+        if len(self.rules) < self.min_indexed:
+            return self.rules
+        rules = self.rules
+        return [rules[position]
+                for position in self.get_positions(expression, evaluation)]
+
+    def get_positions(self, expression, evaluation):
+        """
+        Returns the positions of the rules that may match expression, in
+        ascending order.
+        """
+
+        if len(self.rules) < self.min_indexed:
+            return range(len(self.rules))
+        positions = list(self.general)
+        if expression.is_atom():
+            positions.extend(self.by_atom.get(expression, ()))
+        head_name = expression.get_head_name()
+        positions.extend(self.by_head.get(head_name, ()))
+        for name, wrapped in self.by_wrapped_head.items():
+            if (name != head_name and 'System`OneIdentity' in
+                    evaluation.definitions.get_attributes(name)):
+                positions.extend(wrapped)
+        positions.sort()
+        return positions
@@ -0,0 +1,271 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+A compact binary format for expressions, used by BinarySerialize and
+Compress.
+
+The data starts with MAGIC and the version of the format, followed by a
+table of the names of all the symbols in the expression, so that each
+occurrence of a symbol is only its index in the table. Then the expression
+follows in prefix order, each item starting with a tag byte:
+
+  E  count, head, leaves  an Expression with count leaves
+  Y  index                a Symbol
+  I  integer              an Integer
+  Q  integer, integer     a Rational
+  R  double               a MachineReal
+  P  precision, sign, mantissa, integer
+                          a PrecisionReal, with the binary exponent
+  C  real, imaginary      a Complex
+  S  length, UTF-8        a String
+  D  count, doubles       a List of MachineReals
+  L  count, int64s        a List of Integers that fit in 64 bits
+
+Counts, lengths, indices and precisions are unsigned varints (seven bits in
+each byte, least significant first, with the high bit set in all but the
+last byte). Integers are zigzag-encoded varints of any size. Doubles and
+int64s are little-endian, and written as a single block for a List, which
+is much faster to write and read than a leaf at a time.
+"""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import struct
+
+import mathics.core.expression as ma
+from mathics.core.util import LazyModule, no_garbage_collection
+
+sympy = LazyModule('sympy')
+
+# not the start of any text, which Uncompress also reads
+MAGIC = b'\x00MSX'
+VERSION = 1
+
+_double = struct.Struct('<d')
+_int64_range = (-2 ** 63, 2 ** 63)
+
+# lists shorter than this are written leaf by leaf
+_min_block = 4
+
+
+class SerializeError(Exception):
+    pass
+
+
+def _write_varint(out, n):
+    while n > 0x7f:
+        out.append((n & 0x7f) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _write_integer(out, n):
+    _write_varint(out, 2 * n if n >= 0 else -2 * n - 1)
+
+
+def _write_bytes(out, data):
+    _write_varint(out, len(data))
+    out.extend(data)
+
+
+class _Writer(object):
+    def __init__(self):
+        self.names = []
+        self.indices = {}
+        self.out = bytearray()
+
+    def write(self, expr):
+        out = self.out
+        cls = expr.__class__
+        if cls is ma.Expression:
+            leaves = expr.leaves
+            if (len(leaves) >= _min_block and
+                    expr.head.get_name() == 'System`List' and
+                    self.write_block(leaves)):
+                return
+            out.append(ord('E'))
+            _write_varint(out, len(leaves))
+            self.write(expr.head)
+            for leaf in leaves:
+                self.write(leaf)
+        elif cls is ma.Symbol:
+            index = self.indices.get(expr.name)
+            if index is None:
+                index = self.indices[expr.name] = len(self.names)
+                self.names.append(expr.name)
+            out.append(ord('Y'))
+            _write_varint(out, index)
+        elif cls is ma.Integer:
+            out.append(ord('I'))
+            _write_integer(out, expr.value)
+        elif cls is ma.Rational:
+            out.append(ord('Q'))
+            _write_integer(out, int(expr.value.p))
+            _write_integer(out, int(expr.value.q))
+        elif cls is ma.MachineReal:
+            out.append(ord('R'))
+            out.extend(_double.pack(expr.value))
+        elif cls is ma.PrecisionReal:
+            sign, mantissa, exponent, bits = expr.value._mpf_
+            out.append(ord('P'))
+            _write_varint(out, expr.value._prec)
+            _write_varint(out, sign)
+            _write_varint(out, int(mantissa))
+            _write_integer(out, exponent)
+        elif cls is ma.Complex:
+            out.append(ord('C'))
+            self.write(expr.real)
+            self.write(expr.imag)
+        elif cls is ma.String:
+            out.append(ord('S'))
+            _write_bytes(out, expr.value.encode('utf-8'))
+        else:
+            raise SerializeError(
+                'cannot serialize %s' % cls.__name__)
+
+    def write_block(self, leaves):
+        cls = leaves[0].__class__
+        if cls is ma.MachineReal:
+            tag, code = 'D', 'd'
+        elif cls is ma.Integer:
+            tag, code = 'L', 'q'
+        else:
+            return False
+        if any(leaf.__class__ is not cls for leaf in leaves):
+            return False
+        values = [leaf.value for leaf in leaves]
+        if code == 'q':
+            low, high = _int64_range
+            if min(values) < low or max(values) >= high:
+                return False
+        out = self.out
+        out.append(ord(tag))
+        _write_varint(out, len(values))
+        out.extend(struct.pack('<%d%s' % (len(values), code), *values))
+        return True
+
+    def get_data(self):
+        data = bytearray(MAGIC)
+        data.append(VERSION)
+        _write_varint(data, len(self.names))
+        for name in self.names:
+            _write_bytes(data, name.encode('utf-8'))
+        return bytes(data + self.out)
+
+
+def serialize(expr):
+    "Returns the bytes that deserialize() makes expr from again."
+
+    writer = _Writer()
+    writer.write(expr)
+    return writer.get_data()
+
+
+class _Reader(object):
+    def __init__(self, data):
+        self.data = bytearray(data)
+        self.pos = 0
+
+    def read_byte(self):
+        byte = self.data[self.pos]
+        self.pos += 1
+        return byte
+
+    def read_varint(self):
+        data = self.data
+        pos = self.pos
+        n = shift = 0
+        while True:
+            byte = data[pos]
+            pos += 1
+            n |= (byte & 0x7f) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+        self.pos = pos
+        return n
+
+    def read_integer(self):
+        n = self.read_varint()
+        return n >> 1 if not n & 1 else -((n + 1) >> 1)
+
+    def read_bytes(self, size):
+        end = self.pos + size
+        if end > len(self.data):
+            raise IndexError
+        chunk = self.data[self.pos:end]
+        self.pos = end
+        return bytes(chunk)
+
+    def read_string(self):
+        return self.read_bytes(self.read_varint()).decode('utf-8')
+
+    def read(self):
+        tag = chr(self.read_byte())
+        if tag == 'E':
+            count = self.read_varint()
+            head = self.read()
+            expr = ma.Expression(head)
+            expr.leaves = [self.read() for i in range(count)]
+            return expr
+        elif tag == 'Y':
+            return ma.Symbol(self.names[self.read_varint()])
+        elif tag == 'I':
+            return ma.Integer(self.read_integer())
+        elif tag == 'Q':
+            numerator = self.read_integer()
+            return ma.Rational(numerator, self.read_integer())
+        elif tag == 'R':
+            return ma.MachineReal(_double.unpack(self.read_bytes(8))[0])
+        elif tag == 'P':
+            precision = self.read_varint()
+            sign = self.read_varint()
+            mantissa = self.read_varint()
+            exponent = self.read_integer()
+            mpf = (sign, mantissa, exponent, mantissa.bit_length())
+            return ma.PrecisionReal(sympy.Float._new(mpf, precision))
+        elif tag == 'C':
+            real = self.read()
+            return ma.Complex(real, self.read())
+        elif tag == 'S':
+            return ma.String(self.read_string())
+        elif tag in 'DL':
+            count = self.read_varint()
+            code, cls = ('d', ma.MachineReal) if tag == 'D' else (
+                'q', ma.Integer)
+            values = struct.unpack('<%d%s' % (count, code),
+                                   self.read_bytes(8 * count))
+            expr = ma.Expression('System`List')
+            expr.leaves = [cls(value) for value in values]
+            return expr
+        raise SerializeError('unknown tag %r' % tag)
+
+
+def is_serialized(data):
+    return data[:len(MAGIC)] == MAGIC
+
+
+def deserialize(data):
+    """
+    Makes the expression serialized in data, raising SerializeError if it
+    is not serialized data of this version of the format.
+    """
+
+    if not is_serialized(data):
+        raise SerializeError('not serialized data')
+    reader = _Reader(data)
+    reader.pos = len(MAGIC)
+    try:
+        if reader.read_byte() != VERSION:
+            raise SerializeError('unknown version')
+        reader.names = [reader.read_string()
+                        for i in range(reader.read_varint())]
+        with no_garbage_collection():
+            expr = reader.read()
+    except (IndexError, UnicodeDecodeError, struct.error):
+        raise SerializeError('truncated data')
+    if reader.pos != len(reader.data):
+        raise SerializeError('extra data')
+    return expr
@@ -8,11 +8,72 @@ from __future__ import absolute_import
 from six.moves import range
 from six import unichr
 
+import gc
+import importlib
+import pkgutil
 import re
+from contextlib import contextmanager
 
 FORMAT_RE = re.compile(r'\`(\d*)\`')
 
 
+class LazyModule(object):
+    """
+    Stands in for a module that is only imported when one of its attributes
+    is first used, together with the given submodules:
+
+        sympy = LazyModule('sympy')
+        skimage = LazyModule('skimage', 'skimage.io')
+
+    The attributes are then copied, so that later uses cost no more than
+    those of the module itself.
+    """
+
+    def __init__(self, name, *submodules):
+        self._lazy_name = name
+        self._lazy_submodules = submodules
+
+    def __getattr__(self, attr):
+        if attr.startswith('_lazy_'):
+            raise AttributeError(attr)
+        module = importlib.import_module(self._lazy_name)
+        for submodule in self._lazy_submodules:
+            importlib.import_module(submodule)
+        value = getattr(module, attr)
+        setattr(self, attr, value)
+        return value
+
+    def __repr__(self):
+        return '<lazily imported module %r>' % self._lazy_name
+
+
+def have_module(name):
+    "Whether the module with the given name can be found, without importing it."
+
+    try:
+        return pkgutil.find_loader(name) is not None
+    except ImportError:
+        # a parent package is missing
+        return False
+
+
+@contextmanager
+def no_garbage_collection():
+    """
+    Turns the garbage collector off for a while: while many objects are
+    made that all stay alive, such as when loading a large expression,
+    collecting garbage only costs time.
+    """
+
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
 def interpolate_string(text, get_param):
     index = [1]
 
@@ -47,20 +108,43 @@ for a permutation generating algorithm for multisets.
 
 
 def permutations(items, without_duplicates=True):
+    """
+    Yields the permutations of items, starting with items in their given
+    order. With without_duplicates, permutations that only differ by
+    exchanging items that are the same expression are yielded once.
+    """
+
     if not items:
         yield []
-    # already_taken = set()
+        return
     # first yield identical permutation without recursion
     yield items
+    already_taken = []
     for index in range(len(items)):
         item = items[index]
-        # if item not in already_taken:
-        for sub in permutations(items[:index] + items[index + 1:]):
+        if without_duplicates and any(
+                item.same(taken) for taken in already_taken):
+            continue
+        subs = permutations(items[:index] + items[index + 1:],
+                            without_duplicates)
+        if index == 0:
+            next(subs)  # the identical permutation, yielded above
+        for sub in subs:
             yield [item] + sub
-            # already_taken.add(item)
+        already_taken.append(item)
 
 
 def subsets(items, min, max, included=None, less_first=False):
+    """
+    Yields (chosen, ([], not_chosen)) for the sub-multisets of items with
+    between min and max (None: any number of) items.
+
+    Copies of the same expression next to each other, as in the sorted
+    leaves of an Orderless expression, are treated as one item with a
+    multiplicity, so a subset is not yielded again for every way to pick
+    its copies.
+    """
+
     if max is None:
         max = len(items)
     lengths = list(range(min, max + 1))
@@ -84,7 +168,12 @@ def subsets(items, min, max, included=None, less_first=False):
                 for set in decide(chosen + [item], not_chosen, rest[1:],
                                   count - 1):
                     yield set
-            for set in decide(chosen, not_chosen + [item], rest[1:], count):
+            # leaving out item also leaves out its copies directly after it
+            end = 1
+            while end < len(rest) and rest[end].same(item):
+                end += 1
+            for set in decide(chosen, not_chosen + rest[:end], rest[end:],
+                              count):
                 yield set
 
     for length in lengths:
@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+A kernel that stays in memory between runs of the command line interface.
+
+'mathics --daemon' makes the builtin definitions and imports the libraries
+they use once, then listens on a Unix socket. 'mathics --connect ...' sends
+its arguments, working directory and environment over the socket, together
+with its standard streams. The kernel forks a child for each connection,
+which runs the command line with the streams of the client and a
+copy-on-write copy of the definitions, so that what one run defines is not
+seen by the next, and sends back the exit status.
+"""
+
+from __future__ import unicode_literals
+from __future__ import absolute_import
+from __future__ import print_function
+
+import array
+import io
+import json
+import os
+import signal
+import socket
+import struct
+import sys
+import threading
+import traceback
+
+# passing file descriptors over a socket needs socket.sendmsg (Python 3)
+supported = (hasattr(socket, 'AF_UNIX') and hasattr(os, 'fork') and
+             hasattr(socket.socket, 'sendmsg'))
+
+_header = struct.Struct('!i')
+_streams = (0, 1, 2)
+_interrupt = b'i'
+
+
+def _receive_exactly(connection, size):
+    data = b''
+    while len(data) < size:
+        chunk = connection.recv(size - len(data))
+        if not chunk:
+            raise EOFError
+        data += chunk
+    return data
+
+
+def connect(path, argv):
+    """
+    Runs the command line with the arguments argv in the kernel listening at
+    path, and returns its exit status.
+    """
+
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.connect(path)
+    request = json.dumps({
+        'argv': argv,
+        'cwd': os.getcwd(),
+        'env': dict(os.environ),
+    }).encode('utf-8')
+    for stream in (sys.stdout, sys.stderr):
+        stream.flush()
+    client.sendmsg(
+        [_header.pack(len(request))],
+        [(socket.SOL_SOCKET, socket.SCM_RIGHTS, array.array('i', _streams))])
+    client.sendall(request)
+
+    while True:
+        try:
+            return _header.unpack(_receive_exactly(client, _header.size))[0]
+        except KeyboardInterrupt:
+            # the kernel is not in the foreground process group of the
+            # terminal, so pass CONTROL-C on
+            client.sendall(_interrupt)
+        except EOFError:
+            return 1
+
+
+def serve(path, run):
+    """
+    Accepts connections at path and runs the command line of each with
+    run(argv) in a child process, until interrupted.
+    """
+
+    if os.path.exists(path):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+        except socket.error:
+            os.unlink(path)  # left behind by a kernel that was killed
+        else:
+            raise RuntimeError('a kernel is already listening at ' + path)
+        finally:
+            probe.close()
+    if os.path.exists(path + '.new'):
+        os.unlink(path + '.new')
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    umask = os.umask(0o177)  # only the owner may connect
+    try:
+        server.bind(path + '.new')
+    finally:
+        os.umask(umask)
+    server.listen(16)
+    # clients can connect as soon as the socket is there
+    os.rename(path + '.new', path)
+    # the children are reaped automatically
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+
+    try:
+        while True:
+            connection, address = server.accept()
+            if os.fork() == 0:
+                server.close()
+                signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                os._exit(_run_child(connection, run))
+            connection.close()
+    finally:
+        server.close()
+        os.unlink(path)
+
+
+def _run_child(connection, run):
+    size = struct.calcsize('i') * len(_streams)
+    header, ancillary, flags, address = connection.recvmsg(
+        _header.size, socket.CMSG_SPACE(size))
+    fds = array.array('i')
+    for level, kind, data in ancillary:
+        if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+            fds.frombytes(data[:len(data) - len(data) % fds.itemsize])
+    if len(header) != _header.size or len(fds) != len(_streams):
+        return 1
+    request = json.loads(_receive_exactly(
+        connection, _header.unpack(header)[0]).decode('utf-8'))
+
+    for stream in (sys.stdout, sys.stderr):
+        stream.flush()
+    for fd, received in zip(_streams, fds):
+        os.dup2(received, fd)
+        os.close(received)
+    sys.stdin = io.open(0, 'r', encoding=sys.stdin.encoding, closefd=False)
+    sys.stdout = io.open(1, 'w', 1, encoding=sys.stdout.encoding,
+                         closefd=False)
+    sys.stderr = io.open(2, 'w', 1, encoding=sys.stderr.encoding,
+                         closefd=False)
+    os.chdir(request['cwd'])
+    os.environ.clear()
+    os.environ.update(request['env'])
+
+    # even if the kernel was started with CONTROL-C ignored
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+
+    def watch():
+        while True:
+            if connection.recv(1):
+                os.kill(os.getpid(), signal.SIGINT)
+            else:  # the client has gone
+                os._exit(1)
+    watcher = threading.Thread(target=watch)
+    watcher.daemon = True
+    watcher.start()
+
+    try:
+        run(request['argv'])
+        status = 0
+    except SystemExit as exit:
+        if exit.code is None or isinstance(exit.code, int):
+            status = exit.code or 0
+        else:
+            print(exit.code, file=sys.stderr)
+            status = 1
+    except BaseException:
+        traceback.print_exc()
+        status = 1
+    for stream in (sys.stdout, sys.stderr):
+        stream.flush()
+    connection.sendall(_header.pack(status))
+    return status
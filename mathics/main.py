@@ -8,8 +8,12 @@ from __future__ import absolute_import
 import sys
 import os
 import argparse
+import atexit
+import importlib
 import re
 import locale
+import socket
+import time
 
 from mathics.core.definitions import Definitions
 from mathics.core.expression import strip_context
@@ -17,9 +21,10 @@ from mathics.core.evaluation import Evaluation, Output
 from mathics.core.parser import LineFeeder, FileLineFeeder
 from mathics import version_string, license_string, __version__
 from mathics import settings
+from mathics import daemon
 
 import six
-from six.moves import input
+from six.moves import builtins, input
 
 
 class TerminalShell(LineFeeder):
@@ -184,6 +189,64 @@ class TerminalOutput(Output):
         return self.shell.out_callback(out)
 
 
+class ImportProfile(object):
+    """
+    Measures the time taken by the modules imported between start() and
+    stop(). A module's own time leaves out the modules it imports in turn.
+    """
+
+    def __init__(self):
+        self.times = {}
+        self.children = []
+
+    def start(self):
+        self.original_import = builtins.__import__
+        self.original_import_module = importlib.import_module
+        builtins.__import__ = self.timed_import
+        importlib.import_module = self.timed_import_module
+
+    def stop(self):
+        builtins.__import__ = self.original_import
+        importlib.import_module = self.original_import_module
+
+    def timed(self, name, import_function, *args):
+        if name in sys.modules:
+            return import_function(*args)
+        start = time.time()
+        self.children.append(0.)
+        try:
+            return import_function(*args)
+        finally:
+            elapsed = time.time() - start
+            own = elapsed - self.children.pop()
+            if self.children:
+                self.children[-1] += elapsed
+            if name not in self.times:
+                self.times[name] = [0., 0.]
+            self.times[name][0] += own
+            self.times[name][1] += elapsed
+
+    def timed_import(self, name, globals=None, locals=None, fromlist=(),
+                     level=0):
+        if level != 0:
+            # relative imports are counted for the importing module
+            return self.original_import(name, globals, locals, fromlist, level)
+        return self.timed(name, self.original_import, name, globals, locals,
+                          fromlist, level)
+
+    def timed_import_module(self, name, package=None):
+        return self.timed(
+            name, self.original_import_module, name, package)
+
+    def report(self, count=30):
+        print('%d modules imported in %.3f s, the slowest:' % (
+            len(self.times), sum(own for own, total in self.times.values())))
+        print('   own [s]  total [s]  module')
+        items = sorted(six.iteritems(self.times), key=lambda item: -item[1][0])
+        for name, (own, total) in items[:count]:
+            print('%10.3f %10.3f  %s' % (own, total, name))
+
+
 def main():
     argparser = argparse.ArgumentParser(
         prog='mathics',
@@ -228,15 +291,76 @@ def main():
         '--no-readline', help="disable line editing (implies --no-completion)",
         action='store_true')
 
+    argparser.add_argument(
+        '--import-profile', action='store_true',
+        help='report the time taken by the modules imported, on exit')
+
     argparser.add_argument(
         '--version', '-v', action='version',
         version='%(prog)s ' + __version__)
 
+    argparser.add_argument(
+        '--daemon', action='store_true',
+        help='keep a kernel in memory that runs the command lines given with '
+        '--connect, each in a fresh copy of it')
+
+    argparser.add_argument(
+        '--connect', action='store_true',
+        help='run this command line in the kernel started with --daemon')
+
+    argparser.add_argument(
+        '--socket', default=settings.DAEMON_SOCKET, metavar='PATH',
+        help='the Unix socket of --daemon and --connect (default: %(default)s)')
+
     args = argparser.parse_args()
 
-    quit_command = 'CTRL-BREAK' if sys.platform == 'win32' else 'CONTROL-D'
+    if (args.daemon or args.connect) and not daemon.supported:
+        argparser.error('--daemon and --connect need Unix sockets and '
+                        'Python 3')
+
+    if args.connect:
+        try:
+            sys.exit(daemon.connect(args.socket, sys.argv[1:]))
+        except socket.error as error:
+            argparser.error('cannot connect to the kernel at %s (%s); start '
+                            'it with --daemon' % (args.socket, error))
+
+    if args.import_profile:
+        profile = ImportProfile()
+        profile.start()
+
+        def report():
+            profile.stop()
+            profile.report()
+        atexit.register(report)
 
     definitions = Definitions(add_builtin=True)
+
+    if args.daemon:
+        # make everything the children would otherwise make each time
+        for name in list(definitions.pending_builtin):
+            definitions.get_builtin_definition(name)
+        for module in ('sympy', 'mpmath'):
+            importlib.import_module(module)
+        directory = os.path.dirname(args.socket)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        if not args.quiet:
+            print('Listening at %s' % args.socket)
+            sys.stdout.flush()
+        try:
+            daemon.serve(args.socket, lambda argv: run(
+                argparser.parse_args(argv), definitions))
+        except KeyboardInterrupt:
+            pass
+        return
+
+    run(args, definitions)
+
+
+def run(args, definitions):
+    quit_command = 'CTRL-BREAK' if sys.platform == 'win32' else 'CONTROL-D'
+
     definitions.set_line_no(0)
 
     shell = TerminalShell(
@@ -294,5 +418,6 @@ def main():
         finally:
             shell.reset_lineno()
 
+
 if __name__ == '__main__':
     main()
@@ -25,8 +25,32 @@ LOG_QUERIES = False
 # unix only
 TIMEOUT = None
 
+# Either None (no limit) or a positive integer: the number of bytes a single
+# evaluation in the web interface may allocate before it is aborted.
+MEMORY_LIMIT = None
+
 MAX_RECURSION_DEPTH = 512
 
+# Evaluate expressions with an explicit stack of pending evaluations instead
+# of Python recursion (see mathics.core.expression.evaluate_on_stack).
+STACK_EVALUATOR = False
+
+# Store the builtin definitions, including those made by the autoload files,
+# in DATA_DIR and load them from there when Mathics starts again, as long as
+# neither Mathics nor the libraries it uses changed (see
+# mathics.core.definitions.Definitions).
+BUILTIN_SNAPSHOT = True
+
+# Only register the names and attributes of most builtins when Mathics starts
+# and make the rest of their definitions when they are first used (see
+# mathics.builtin.base.Builtin.contribute_lazily).
+LAZY_BUILTIN = True
+
+# Keep the syntax trees of the files read by Get (and so Needs) in
+# DATA_DIR/parsed and reuse them while the files are unchanged (see
+# mathics.core.parser.cache).
+PARSE_CACHE = True
+
 # max pickle.dumps() size for storing results in DB
 # historically 10000 was used on public mathics servers
 MAX_STORED_SIZE = 10000
@@ -44,6 +68,10 @@ else:
 # if not path.exists(DATA_DIR):
 #    os.makedirs(DATA_DIR)
 
+# The Unix socket at which 'mathics --daemon' listens and to which
+# 'mathics --connect' connects, unless another is given with --socket.
+DAEMON_SOCKET = DATA_DIR + 'kernel.sock'
+
 DOC_DIR = ROOT_DIR + 'doc/documentation/'
 DOC_TEX_DATA = ROOT_DIR + 'doc/tex/data'
 DOC_XML_DATA = ROOT_DIR + 'doc/xml/data'
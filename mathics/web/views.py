@@ -117,7 +117,9 @@ def query(request):
                 results.append(Result(evaluation.out, None, None))  # syntax errors
                 evaluation.out = []
                 continue
-            result = evaluation.evaluate(expr, timeout=settings.TIMEOUT)
+            result = evaluation.evaluate(
+                expr, timeout=settings.TIMEOUT,
+                memory_limit=settings.MEMORY_LIMIT)
             if result is not None:
                 results.append(result)
     except Exception as exc:
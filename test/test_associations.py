@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import unittest
+
+from mathics.builtin.associations import Association
+from mathics.core.definitions import Definitions
+from mathics.core.evaluation import Evaluation
+from mathics.core.expression import Expression, Integer, Symbol
+
+
+class AssociationTest(unittest.TestCase):
+    def setUp(self):
+        self.definitions = Definitions(add_builtin=True)
+        self.evaluation = Evaluation(self.definitions, catch_interrupt=False)
+
+    def evaluate(self, s):
+        return self.evaluation.parse_evaluate(s).result
+
+    def rules(self, *items):
+        return [Expression('Rule', Symbol(key), value) for key, value in items]
+
+    def testOldVersions(self):
+        first = Association.from_rules(self.rules(('a', Integer(1))))
+        second = first.updated(self.rules(('b', Integer(2))))
+        third = second.updated(self.rules(('a', Integer(3)), ('c', Integer(4))))
+
+        # the entries were moved on to the newest version
+        self.assertIsNone(first._items)
+        self.assertIsNone(second._items)
+
+        self.assertTrue(first.same(Association.from_rules(
+            self.rules(('a', Integer(1))))))
+        self.assertTrue(second.same(Association.from_rules(
+            self.rules(('a', Integer(1)), ('b', Integer(2))))))
+        self.assertTrue(third.same(Association.from_rules(self.rules(
+            ('a', Integer(3)), ('b', Integer(2)), ('c', Integer(4))))))
+
+    def testSharedValue(self):
+        self.evaluate('a = <|x -> 1|>; b = a; AssociateTo[a, y -> 2]')
+        self.assertEqual(self.evaluate('b'), '<|x -> 1|>')
+        self.assertEqual(self.evaluate('a'), '<|x -> 1, y -> 2|>')
+
+    def testUserDefinitions(self):
+        self.evaluate('a = <|x -> 1, y :> 2|>')
+        definitions = Definitions(add_builtin=True)
+        definitions.set_user_definitions(
+            self.definitions.get_user_definitions())
+        evaluation = Evaluation(definitions, catch_interrupt=False)
+        self.assertEqual(
+            evaluation.parse_evaluate('{a, Lookup[a, y]}').result,
+            '{<|x -> 1, y :> 2|>, 2}')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+from mathics import daemon
+from mathics.benchmark import get_process_environment
+
+
+@unittest.skipUnless(daemon.supported, 'needs Unix sockets and Python 3')
+class DaemonTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        cls.socket = os.path.join(cls.directory, 'kernel.sock')
+        cls.env = get_process_environment()
+        cls.kernel = subprocess.Popen(cls.command(
+            '--daemon', '--quiet', '--socket', cls.socket), env=cls.env)
+        while not os.path.exists(cls.socket):
+            if cls.kernel.poll() is not None:
+                raise RuntimeError('the kernel did not start')
+            time.sleep(0.1)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.kernel.send_signal(signal.SIGINT)
+        cls.kernel.wait()
+        shutil.rmtree(cls.directory)
+
+    @staticmethod
+    def command(*args):
+        return [sys.executable, '-m', 'mathics.main'] + list(args)
+
+    def connect(self, *args):
+        process = subprocess.Popen(
+            self.command('--connect', '--socket', self.socket, *args),
+            stdout=subprocess.PIPE, cwd=self.directory, env=self.env)
+        output = process.communicate()[0].decode('utf-8')
+        return process.returncode, output.split()
+
+    def testExecute(self):
+        self.assertEqual(self.connect('-e', '1 + 2'),
+                         (0, ['In[1]:=', '1', '+', '2', 'Out[1]=', '3']))
+
+    def testFile(self):
+        filename = os.path.join(self.directory, 'script.m')
+        with open(filename, 'w') as script:
+            script.write('x = 5;\nPrint[x ^ 2, Directory[]]\n')
+        # relative to the working directory of the client
+        self.assertEqual(self.connect('script.m'),
+                         (0, ['25' + os.path.realpath(self.directory)]))
+
+    def testNothingLeaks(self):
+        self.connect('-e', 'y = 1')
+        self.assertEqual(self.connect('-e', 'y')[1][-1], 'y')
+
+    def testNoKernel(self):
+        process = subprocess.Popen(
+            self.command('--connect', '--socket', self.socket + '.none',
+                         '-e', '1'), stderr=subprocess.PIPE, env=self.env)
+        process.communicate()
+        self.assertEqual(process.returncode, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from mathics.builtin import contribute
+from mathics.core.definitions import Definitions, get_builtin_snapshot_key
+from mathics.core.evaluation import Evaluation
+
+
+class BuiltinSnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'builtin.pickle')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def evaluate(self, definitions, s):
+        evaluation = Evaluation(definitions, catch_interrupt=False)
+        return evaluation.parse_evaluate(s).result
+
+    def testRoundTrip(self):
+        made = Definitions(add_builtin=True, builtin_filename=self.filename)
+        self.assertTrue(os.path.exists(self.filename))
+        self.assertEqual(os.listdir(self.directory), ['builtin.pickle'])
+
+        loaded = Definitions()
+        self.assertTrue(loaded.load_builtin(
+            self.filename, get_builtin_snapshot_key()))
+        self.assertEqual(loaded.get_builtin_names(), made.get_builtin_names())
+        # definitions made by the autoload files are included
+        self.assertIn('ImportExport`RegisterImport', loaded.builtin)
+        self.assertEqual(
+            self.evaluate(loaded, 'Length[$ImportFormats] > 0'), 'True')
+        self.assertEqual(self.evaluate(loaded, 'f[x_] := x^2; f[3]'), '9')
+
+    def testOtherKey(self):
+        Definitions(add_builtin=True, builtin_filename=self.filename)
+        self.assertFalse(Definitions().load_builtin(self.filename, 'other'))
+
+    def testBrokenSnapshot(self):
+        with open(self.filename, 'wb') as snapshot_file:
+            snapshot_file.write(b'broken')
+        definitions = Definitions(
+            add_builtin=True, builtin_filename=self.filename)
+        self.assertEqual(self.evaluate(definitions, '1 + 2'), '3')
+        # the broken snapshot was replaced
+        self.assertTrue(Definitions().load_builtin(
+            self.filename, get_builtin_snapshot_key()))
+
+
+class LazyBuiltinTest(unittest.TestCase):
+    def rules(self, rules):
+        return [(rule.pattern.expr, getattr(rule, 'replace', None),
+                 getattr(rule, 'function', None)) for rule in rules]
+
+    def assertSameRules(self, first, second):
+        self.assertEqual(len(first), len(second))
+        for (pattern, replace, function), (other_pattern, other_replace,
+                                           other_function) in zip(
+                self.rules(first), self.rules(second)):
+            self.assertTrue(pattern.same(other_pattern))
+            self.assertEqual(function, other_function)
+            if replace is None:
+                self.assertIsNone(other_replace)
+            else:
+                self.assertTrue(replace.same(other_replace))
+
+    def testSameDefinitions(self):
+        eager = Definitions()
+        contribute(eager)
+        lazy = Definitions()
+        contribute(lazy, lazy=True)
+        self.assertTrue(lazy.pending_builtin)
+        self.assertEqual(lazy.get_builtin_names(), eager.get_builtin_names())
+
+        for name, definition in eager.builtin.items():
+            # the attributes are there before the rest of the definition
+            self.assertEqual(lazy.builtin[name].attributes,
+                             definition.attributes)
+            made = lazy.get_builtin_definition(name)
+            self.assertNotIn(name, lazy.pending_builtin)
+            for position in ('own', 'down', 'sub', 'up', 'n', 'default'):
+                self.assertSameRules(
+                    made.get_values_list(position),
+                    definition.get_values_list(position))
+            self.assertSameRules(made.messages, definition.messages)
+            self.assertEqual(sorted(made.formatvalues),
+                             sorted(definition.formatvalues))
+            for form, rules in definition.formatvalues.items():
+                self.assertSameRules(made.formatvalues[form], rules)
+            self.assertEqual(sorted(made.options), sorted(definition.options))
+            for option, value in definition.options.items():
+                self.assertTrue(made.options[option].same(value))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import unittest
+
+from mathics.benchmark import ExpressionCounter
+from mathics.core.expression import Expression, Integer, Symbol
+from mathics.core.definitions import Definitions
+from mathics.core.evaluation import Evaluation
+from mathics.core.rules import Rule
+
+
+definitions = Definitions(add_builtin=True)
+
+
+class EvaluateAllocationTest(unittest.TestCase):
+    def setUp(self):
+        self.evaluation = Evaluation(definitions, catch_interrupt=False)
+
+    def testUnchanged(self):
+        expr = Expression('List', *[Integer(i) for i in range(1000)])
+        with ExpressionCounter() as counter:
+            result = expr.evaluate(self.evaluation)
+        self.assertIs(result.leaves, expr.leaves)
+        self.assertEqual(counter.count, 1)
+
+    def testUnchangedNested(self):
+        expr = Expression('List', *[Expression('f', Symbol('x'), i)
+                                    for i in range(100)])
+        with ExpressionCounter() as counter:
+            result = expr.evaluate(self.evaluation)
+        self.assertIs(result.leaves[0].leaves, expr.leaves[0].leaves)
+        self.assertEqual(counter.count, 101)
+
+    def testChangedLeaf(self):
+        counts = []
+        # make the definition of Plus first, which may not be there yet
+        # (see Builtin.contribute_lazily)
+        Expression('Plus', 1, 2).evaluate(self.evaluation)
+        for size in (10, 1000):
+            leaves = [Integer(i) for i in range(size)]
+            expr = Expression('List', Expression('Plus', 1, 2), *leaves)
+            with ExpressionCounter() as counter:
+                result = expr.evaluate(self.evaluation)
+            counts.append(counter.count)
+            self.assertTrue(result.same(Expression('List', 3, *leaves)))
+            self.assertTrue(expr.leaves[0].has_form('Plus', 2))
+        self.assertEqual(counts[0], counts[1])
+
+    def testSequence(self):
+        expr = Expression('f', 1, Expression('Sequence', 2, 3), 4)
+        result = expr.evaluate(self.evaluation)
+        self.assertTrue(result.same(Expression('f', 1, 2, 3, 4)))
+        self.assertTrue(expr.leaves[1].has_form('Sequence', 2))
+
+    def testOrderless(self):
+        definitions.set_attribute('Global`o', 'System`Orderless')
+        a, b = Symbol('Global`a'), Symbol('Global`b')
+
+        expr = Expression('Global`o', b, a)
+        result = expr.evaluate(self.evaluation)
+        self.assertTrue(result.same(Expression('Global`o', a, b)))
+        self.assertIs(expr.leaves[0], b)
+
+    def testEvaluatedOnce(self):
+        expr = Expression('List', *[Integer(i) for i in range(10)])
+        result = expr.evaluate(self.evaluation)
+        with ExpressionCounter() as counter:
+            self.assertIs(result.evaluate(self.evaluation), result)
+        self.assertEqual(counter.count, 0)
+
+
+class ReplaceAllocationTest(unittest.TestCase):
+    def setUp(self):
+        self.evaluation = Evaluation(definitions, catch_interrupt=False)
+
+    def replace(self, expr, pattern, replacement):
+        rule = Rule(pattern, replacement)
+        with ExpressionCounter() as counter:
+            result, applied = expr.apply_rules([rule], self.evaluation)
+        return result, counter.count
+
+    def testUnchanged(self):
+        expr = Expression('List', *[Expression('f', i) for i in range(100)])
+        result, count = self.replace(expr, Integer(1000), Symbol('x'))
+        self.assertIs(result, expr)
+        self.assertEqual(count, 0)
+
+    def testSharedSubtrees(self):
+        expr = Expression('List', *[Expression('f', i) for i in range(100)])
+        result, count = self.replace(expr, Integer(5), Symbol('x'))
+        self.assertTrue(result.leaves[5].same(Expression('f', Symbol('x'))))
+        self.assertTrue(expr.leaves[5].same(Expression('f', 5)))
+        for index in (0, 4, 6, 99):
+            self.assertIs(result.leaves[index], expr.leaves[index])
+        self.assertEqual(count, 2)
+
+    def testSequence(self):
+        expr = Expression('g', Expression('f', 1, 2), Expression('h', 3))
+        pattern = Expression('f', Expression('Pattern', Symbol('x'),
+                                             Expression('BlankSequence')))
+        replacement = Expression('k', Symbol('x'), Expression('h', Symbol('x')))
+        result, count = self.replace(expr, pattern, replacement)
+        self.assertTrue(result.same(Expression(
+            'g', Expression('k', 1, 2, Expression('h', 1, 2)),
+            Expression('h', 3))))
+        self.assertIs(result.leaves[1], expr.leaves[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import unittest
+
+from mathics.core.definitions import Definitions
+from mathics.core.evaluation import Evaluation
+
+
+definitions = Definitions(add_builtin=True)
+
+
+class NumericSameTestTest(unittest.TestCase):
+    # Equal is recognised as a SameTest and handled without comparing every
+    # pair of elements; (... && True &) hides it and takes the pairwise path.
+
+    def setUp(self):
+        self.evaluation = Evaluation(definitions, catch_interrupt=False)
+        self.evaluate(
+            'x = RandomReal[{-10, 10}, 10]; '
+            'numbers = Join[x, x (1 + 10^-15), x (1 + 10^-12), -x, '
+            'Round[x], Round[x] + 0., Round[x] / 3, {0, 0., -0., 2^-1074.}]')
+
+    def evaluate(self, s):
+        return self.evaluation.parse_evaluate(s).result
+
+    def check(self, expr):
+        fast = self.evaluate(expr % 'Equal')
+        slow = self.evaluate(expr % '(Equal[#1, #2] && True &)')
+        self.assertEqual(fast, slow)
+
+    def testGather(self):
+        self.check('Gather[numbers, %s]')
+        self.check('Tally[numbers, %s]')
+        self.check('DeleteDuplicates[numbers, %s]')
+
+    def testSetOperations(self):
+        self.check('Union[numbers, -numbers, SameTest -> %s]')
+        self.check('Intersection[numbers, Rest[x], SameTest -> %s]')
+        self.check('Complement[numbers, x (1 + 10^-15), SameTest -> %s]')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import io
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from mathics.core.definitions import Definitions
+from mathics.core.evaluation import Evaluation
+from mathics.core.parser import SingleLineFeeder
+from mathics.core.parser.util import parser, parse_cache
+from mathics.core.parser.convert import convert
+from mathics.core.parser.cache import ParseCache, encode, convert_encoded
+from mathics import settings
+
+
+definitions = Definitions(add_builtin=True)
+
+
+class EncodeTests(unittest.TestCase):
+    def check(self, code):
+        node = parser.parse(SingleLineFeeder(code))
+        expected = convert(node, definitions)
+        self.assertTrue(
+            convert_encoded(encode(node), definitions).same(expected))
+
+    def testAtoms(self):
+        self.check('x')
+        self.check('System`Plus')
+        self.check('`a`b')
+        self.check('123')
+        self.check('-1.5`20')
+        self.check('16^^FF')
+        self.check('"a\\"b\\n"')
+        self.check('<< "some/file.m"')
+
+    def testExpressions(self):
+        self.check('f[x_, y_:2] := Module[{t = x^2}, t + y] /; x > 0')
+        self.check('{a, {b, c}} /. {u_?EvenQ :> u / 2, s__ -> {s}}')
+        self.check('#1 + #2 &[a, b]; %')
+
+
+class ParseCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'package.m')
+        with io.open(self.filename, 'w') as package:
+            package.write('f[x_] := x ^ 2\n\ny = f[3]\n')
+        modified = time.time() - 10
+        os.utime(self.filename, (modified, modified))
+        self.cache = ParseCache(os.path.join(self.directory, 'parsed'))
+        self.nodes = [parser.parse(SingleLineFeeder(code))
+                      for code in ('f[x_] := x ^ 2', 'y = f[3]')]
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def testRoundTrip(self):
+        key = self.cache.get_key(self.filename)
+        self.assertIsNone(self.cache.load(key))
+        self.cache.save(key, self.nodes)
+        self.assertEqual(self.cache.load(key),
+                         [encode(node) for node in self.nodes])
+
+    def testChangedFile(self):
+        key = self.cache.get_key(self.filename)
+        self.cache.save(key, [])
+        with io.open(self.filename, 'a') as package:
+            package.write('z = 1\n')
+        self.assertIsNone(self.cache.load(self.cache.get_key(self.filename)))
+
+    def testBrokenFile(self):
+        key = self.cache.get_key(self.filename)
+        os.makedirs(self.cache.directory)
+        with open(self.cache.get_filename(key), 'wb') as cache_file:
+            cache_file.write(b'broken')
+        self.assertIsNone(self.cache.load(key))
+
+    def testJustChanged(self):
+        os.utime(self.filename, None)
+        key = self.cache.get_key(self.filename)
+        self.cache.save(key, self.nodes)
+        self.assertIsNone(self.cache.load(key))
+
+    def testNoFile(self):
+        self.assertIsNone(self.cache.get_key(self.filename + '.none'))
+
+
+class GetTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'Package.m')
+        with io.open(self.filename, 'w') as package:
+            package.write(
+                'BeginPackage["Package`"]\n'
+                'f::usage = "f[x] squares x"\n'
+                'Begin["`Private`"]\n'
+                '(* the square *)\n'
+                'f[x_] := g[x] ^ 2\n'
+                'g[x_] := x\n'
+                'End[]\n'
+                'EndPackage[]\n')
+        modified = time.time() - 10
+        os.utime(self.filename, (modified, modified))
+        self.directory_of_cache = parse_cache.directory
+        parse_cache.directory = os.path.join(self.directory, 'parsed')
+        self.loaded = []
+        parse_cache.load = self.load
+
+    def tearDown(self):
+        parse_cache.directory = self.directory_of_cache
+        del parse_cache.load
+        settings.PARSE_CACHE = True
+        shutil.rmtree(self.directory)
+
+    def load(self, key):
+        trees = ParseCache.load(parse_cache, key)
+        self.loaded.append(trees is not None)
+        return trees
+
+    def get(self):
+        evaluation = Evaluation(Definitions(add_builtin=True),
+                                catch_interrupt=False)
+        evaluation.parse_evaluate('Get["%s"]' % self.filename)
+        return [evaluation.parse_evaluate(code).result for code in (
+            'f[3]', 'Names["Package`*"]', 'Names["Package`Private`*"]',
+            '$Context')]
+
+    def testCached(self):
+        expected = ['9', '{f}', '{g}', 'Global`']
+        self.assertEqual(self.get(), expected)
+        self.assertEqual(self.loaded, [False])
+        self.assertEqual(os.listdir(parse_cache.directory), [
+            os.path.basename(parse_cache.get_filename(
+                parse_cache.get_key(self.filename)))])
+        # the symbols are looked up in the contexts set while loading
+        self.assertEqual(self.get(), expected)
+
+    def testDisabled(self):
+        settings.PARSE_CACHE = False
+        self.assertEqual(self.get()[0], '9')
+        self.assertFalse(os.path.exists(parse_cache.directory))
+        self.assertEqual(self.loaded, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
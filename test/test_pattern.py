@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import unittest
+
+from mathics.core.definitions import Definitions
+from mathics.core.evaluation import Evaluation
+from mathics.core.expression import Symbol
+from mathics.core.parser import parse, SingleLineFeeder
+from mathics.core.pattern import Pattern
+from mathics.core.rules import Rule
+
+
+definitions = Definitions(add_builtin=True)
+
+
+class CompiledMatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.evaluation = Evaluation(definitions, catch_interrupt=False)
+
+    def parse(self, s):
+        return parse(definitions, SingleLineFeeder(s))
+
+    def matches(self, pattern, expr, compiled):
+        pattern = Pattern.create(self.parse(pattern))
+        if not compiled:
+            pattern.compiled = (None, set())
+        results = []
+
+        def yield_func(vars, rest):
+            results.append(sorted(
+                (name, str(value)) for name, value in vars.items()))
+        pattern.match(yield_func, self.parse(expr), {}, self.evaluation)
+        return results[:1]
+
+    def check(self, pattern, expr, expected):
+        compiled = self.matches(pattern, expr, True)
+        self.assertEqual(bool(compiled), expected)
+        self.assertEqual(compiled, self.matches(pattern, expr, False))
+
+    def testFixedArity(self):
+        self.check('f[x_Integer, y_]', 'f[1, a]', True)
+        self.check('f[x_Integer, y_]', 'f[a, 1]', False)
+        self.check('f[x_Integer, y_]', 'f[1]', False)
+        self.check('f[x_, g[x_]]', 'f[1, g[1]]', True)
+        self.check('f[x_, g[x_]]', 'f[1, g[2]]', False)
+        self.check('f[a, _]', 'g[a, b]', False)
+        self.check('f[]', 'f[]', True)
+
+    def testSequences(self):
+        self.check('f[x_, y___, z_]', 'f[1, 2]', True)
+        self.check('f[x_, y___, z_]', 'f[1, 2, 3, 4]', True)
+        self.check('f[x_, y___, z_]', 'f[1]', False)
+        self.check('f[x__Integer]', 'f[1, 2]', True)
+        self.check('f[x__Integer]', 'f[1, a]', False)
+        self.check('f[x__Integer]', 'f[]', False)
+
+    def testTests(self):
+        self.check('f[x_ /; x > 0]', 'f[1]', True)
+        self.check('f[x_ /; x > 0]', 'f[-1]', False)
+        self.check('f[_?EvenQ, a | b]', 'f[2, b]', True)
+        self.check('f[_?EvenQ, a | b]', 'f[2, c]', False)
+
+    def testNotCompiled(self):
+        for pattern in ('f[x_, y___, z__]', 'f[x_.]', 'f[x:(_|a_)]',
+                        'f[x___, OptionsPattern[]]'):
+            self.assertIsNone(
+                Pattern.create(self.parse(pattern)).get_matcher(set()))
+
+    def testAttributes(self):
+        definitions.set_attribute('Global`o', 'System`Orderless')
+        self.check('o[a, x_]', 'o[b, a]', True)
+        self.check('g[o[a, x_]]', 'g[o[b, a]]', True)
+
+
+class RulePrefilterTest(unittest.TestCase):
+    def setUp(self):
+        self.evaluation = Evaluation(definitions, catch_interrupt=False)
+
+    def parse(self, s):
+        return parse(definitions, SingleLineFeeder(s))
+
+    def may_match(self, pattern, expr):
+        rule = Rule(self.parse(pattern), Symbol('x'))
+        return rule.may_match(self.parse(expr), self.evaluation)
+
+    def testSignature(self):
+        pattern = Pattern.create(self.parse('f[a, _, b___, c]'))
+        self.assertEqual(pattern.get_signature()[:3], ('Global`f', 3, None))
+        self.assertEqual(len(pattern.get_signature()[3]), 1)
+        self.assertIsNone(Pattern.create(self.parse('_[a]')).get_signature())
+
+    def testRejected(self):
+        self.assertFalse(self.may_match('f[a, _]', 'g[a, b]'))
+        self.assertFalse(self.may_match('f[a, _]', 'f[a]'))
+        self.assertFalse(self.may_match('f[a, _]', 'f[a, b, c]'))
+        self.assertFalse(self.may_match('f[a, _]', 'f[b, a]'))
+        self.assertFalse(self.may_match('f[_]', 'f'))
+
+    def testAccepted(self):
+        self.assertTrue(self.may_match('f[a, _]', 'f[a, b]'))
+        self.assertTrue(self.may_match('f[__]', 'f[a, b, c]'))
+        self.assertTrue(self.may_match('Plus[a, _]', 'Plus[b, a]'))
+        self.assertTrue(self.may_match('Plus[a, _]', 'Plus[a, b, c]'))
+        self.assertTrue(self.may_match('Times[a, x_.]', 'a'))
+
+
+
+class OrderlessMatchTest(unittest.TestCase):
+    def setUp(self):
+        self.evaluation = Evaluation(definitions, catch_interrupt=False)
+        definitions.set_attribute('Global`o', 'System`Orderless')
+
+    def parse(self, s):
+        return parse(definitions, SingleLineFeeder(s))
+
+    def check(self, expr, expected):
+        result = self.parse(expr).evaluate(self.evaluation)
+        self.assertTrue(result.same(self.parse(expected)), str(result))
+
+    def testRepeatedVariable(self):
+        self.check('MatchQ[o[a, a], o[x_, x_]]', 'True')
+        self.check('MatchQ[o[a, b], o[x_, x_]]', 'False')
+        self.check('o[a, b, a, c] /. o[x_, x_, y__] -> {x, {y}}', '{a, {b, c}}')
+
+    def testNoDuplicateMatches(self):
+        self.check('ReplaceList[o[a, a, b], o[x_, y__] :> {x, {y}}]',
+                   '{{a, {a, b}}, {a, {b, a}}, {b, {a, a}}}')
+
+    def testManyTerms(self):
+        self.check('MatchQ[Plus @@ Array[x, 30], x[1] + x[2] + c_ /; False]',
+                   'False')
+        self.check('Length[ReplaceList[Plus @@ Array[x, 5], a_ + b_ + c_ :> 0]]',
+                   '150')
+
+
+
+class SequenceMatchTest(unittest.TestCase):
+    def setUp(self):
+        self.evaluation = Evaluation(definitions, catch_interrupt=False)
+        definitions.set_attribute('Global`g', 'System`Flat')
+
+    def parse(self, s):
+        return parse(definitions, SingleLineFeeder(s))
+
+    def check(self, expr, expected):
+        result = self.parse(expr).evaluate(self.evaluation)
+        self.assertTrue(result.same(self.parse(expected)), str(result))
+
+    def testAnchors(self):
+        self.check(
+            'ReplaceList[f[1, a, 2, a, 3, 4], f[x__, a, y_, z__] :> {{x}, {y}, {z}}]',
+            '{{{1}, {2}, {a, 3, 4}}, {{1, a, 2}, {3}, {4}}}')
+        self.check('ReplaceList[f[1, a, 2, a, 3], f[x___, a, y___] :> {{x}, {y}}]',
+                   '{{{1}, {2, a, 3}}, {{1, a, 2}, {3}}}')
+        self.check('ReplaceList[g[1, a, 2, a, 3], g[x_, a, y_] :> {x, y}]',
+                   '{{1, g[2, a, 3]}, {g[1, a, 2], 3}}')
+
+    def testLengths(self):
+        self.check('ReplaceList[f[a, b, c, d], f[x__, y_, z_] :> {x}]',
+                   '{{a, b}}')
+        self.check('ReplaceList[f[a, b, c], f[x__:0, y__] :> {{x}, {y}}]',
+                   '{{{a}, {b, c}}, {{0}, {a, b, c}}}')
+        self.check('MatchQ[f @@ Range[1000], f[x___, y_Symbol, z___]]',
+                   'False')
+
+
+if __name__ == '__main__':
+    unittest.main()
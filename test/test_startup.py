@@ -0,0 +1,28 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import subprocess
+import sys
+import unittest
+
+from mathics.benchmark import HEAVY_MODULES, STARTUP_SCRIPT
+
+
+class StartupTest(unittest.TestCase):
+    def imported(self, expression):
+        # in a new process, as this one has imported everything already
+        output = subprocess.check_output(
+            [sys.executable, '-c', STARTUP_SCRIPT, expression] + HEAVY_MODULES)
+        return output.decode('ascii').split()
+
+    def testLazyImports(self):
+        self.assertEqual(self.imported('StringJoin["a", "b"]'), [])
+        self.assertEqual(self.imported('Total[Range[10]] + 1'), [])
+        self.assertIn('sympy', self.imported('Integrate[x ^ 2, x]'))
+
+
+if __name__ == '__main__':
+    unittest.main()